@@ -0,0 +1,53 @@
+"""Time to open and score a roster: cmd.json versus the binary .mroster format.
+
+    python -m benchmarks.binary_roster [N ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.roster import generate_roster
+from power.binary import BinaryRoster, write_binary
+from power.formula import calculate_power_batch
+from power.repository import MageRepository, write_snapshot
+from power.schema import STAT_FIELDS
+
+
+def run(n, directory):
+    records = generate_roster(n)
+    json_path = os.path.join(directory, "roster.json")
+    binary_path = os.path.join(directory, "roster.mroster")
+    write_snapshot(json_path, records)
+    write_binary(records, binary_path)
+    del records
+
+    start = time.perf_counter()
+    mages = MageRepository(json_path).all()
+    json_open = time.perf_counter() - start
+    start = time.perf_counter()
+    calculate_power_batch({stat: [mage[stat] for mage in mages] for stat in STAT_FIELDS})
+    json_score = time.perf_counter() - start
+    del mages
+
+    start = time.perf_counter()
+    roster = BinaryRoster(binary_path)
+    binary_open = time.perf_counter() - start
+    start = time.perf_counter()
+    powers = roster.powers()
+    binary_score = time.perf_counter() - start
+    del powers
+    roster.close()
+
+    print(f"{n:>10,}  json: open {json_open:8.4f}s score {json_score:8.4f}s ({os.path.getsize(json_path) / 2**20:6.1f} MiB)"
+          f"  binary: open {binary_open:8.5f}s score {binary_score:8.4f}s ({os.path.getsize(binary_path) / 2**20:6.1f} MiB)")
+
+
+def main(argv):
+    with tempfile.TemporaryDirectory() as directory:
+        for n in [int(arg) for arg in argv] or [10 ** 4, 10 ** 5, 10 ** 6]:
+            run(n, directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
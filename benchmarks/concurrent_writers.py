@@ -0,0 +1,121 @@
+"""Stress test: N writer processes and R reader processes sharing one roster.
+
+    python -m benchmarks.concurrent_writers [--writers N] [--readers R] [--updates K]
+                                            [--backends json journal sqlite] [--blind]
+
+Every writer does K read-modify-write increments of ``health`` on random
+mages of a small shared roster, retrying on VersionConflict, and inserts a
+mage of its own every tenth step. Readers keep loading the whole roster,
+checking the mage count never goes backwards (no torn or stale snapshot
+after a newer one). Afterwards the roster must hold exactly N*K increments
+and every inserted mage; the run exits with status 1 on any lost update.
+
+``--blind`` updates without ``expected_version``, to show the increments
+that plain last-writer-wins updates lose (not counted as a failure).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.roster import generate_roster
+from power.repository import VersionConflict, open_repository, write_snapshot
+
+MAGES = 20
+INSERT_EVERY = 10
+
+
+def writer(path, backend, number, updates, blind, start_at):
+    rng = random.Random(number)
+    repository = open_repository(path, backend)
+    ids = [record["id"] for record in repository.all()]
+    conflicts = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    for step in range(updates):
+        mage_id = rng.choice(ids)
+        while True:
+            record = repository.get(mage_id)
+            changed = dict(record, health=record["health"] + 1)
+            try:
+                repository.update(changed, expected_version=None if blind else record["version"])
+            except VersionConflict:
+                conflicts += 1
+                continue
+            break
+        if step % INSERT_EVERY == 0:
+            repository.insert(dict(record, id=f"writer{number}-{step}", health=0.0))
+    elapsed = time.perf_counter() - started
+    repository.close()
+    return conflicts, elapsed
+
+
+def reader(path, backend, start_at, stop_path):
+    repository = open_repository(path, backend)
+    time.sleep(max(0.0, start_at - time.time()))
+    reads = 0
+    last = 0
+    while not os.path.exists(stop_path):
+        count = len(repository.all())
+        if count < last:
+            raise AssertionError(f"reader saw {count} mages after {last}")
+        last = count
+        reads += 1
+    repository.close()
+    return reads
+
+
+def run(backend, writers, readers, updates, blind, directory):
+    path = os.path.join(directory, f"{backend}.json")
+    roster = [dict(record, health=0.0) for record in generate_roster(MAGES)]
+    write_snapshot(path, roster)
+    open_repository(path, backend).close()  # Seeds the SQLite database before the workers race to
+
+    stop_path = os.path.join(directory, f"{backend}.stop")
+    start_at = time.time() + 2.0  # Time for every process to start and open the roster
+    with ProcessPoolExecutor(writers + readers, mp_context=get_context("spawn")) as pool:
+        reading = [pool.submit(reader, path, backend, start_at, stop_path) for _ in range(readers)]
+        writing = [pool.submit(writer, path, backend, number, updates, blind, start_at) for number in range(writers)]
+        results = [future.result() for future in writing]
+        open(stop_path, 'w').close()  # Readers run until the writers are done
+        reads = sum(future.result() for future in reading)
+
+    repository = open_repository(path, backend)
+    records = repository.all()
+    repository.close()
+    increments = sum(record["health"] for record in records)
+    inserted = len(records) - MAGES
+    expected = writers * updates
+    expected_inserts = writers * len(range(0, updates, INSERT_EVERY))
+    conflicts = sum(conflict for conflict, _ in results)
+    elapsed = max(seconds for _, seconds in results)
+    lost = expected - increments
+    print(f"  {backend:<8} {expected / elapsed:8.0f} updates/s  {conflicts:6} retries  "
+          f"{reads / max(elapsed, 1e-9):8.0f} reads/s  lost updates {lost:.0f}  "
+          f"inserts {inserted}/{expected_inserts}")
+    return lost == 0 and inserted == expected_inserts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.concurrent_writers")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--updates", type=int, default=200, help="updates per writer")
+    parser.add_argument("--backends", nargs="+", choices=("json", "journal", "sqlite"),
+                        default=["json", "journal", "sqlite"])
+    parser.add_argument("--blind", action="store_true", help="update without version checks")
+    args = parser.parse_args(argv)
+
+    print(f"{args.writers} writers x {args.updates} updates, {args.readers} readers, {MAGES} shared mages")
+    with tempfile.TemporaryDirectory() as directory:
+        safe = [run(backend, args.writers, args.readers, args.updates, args.blind, directory)
+                for backend in args.backends]
+    return 0 if all(safe) or args.blind else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Leaderboard queries and startup versus scanning the roster with calculate_power.
+
+    python -m benchmarks.leaderboard [N ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.roster import generate_roster
+from power.formula import calculate_power
+from power.leaderboard import Leaderboard
+from power.repository import MageRepository, write_snapshot
+from power.schema import STAT_FIELDS
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def scan_top(records, k):
+    scored = sorted(((calculate_power(*(mage[stat] for stat in STAT_FIELDS)), mage["id"]) for mage in records),
+                    key=lambda pair: (-pair[0], pair[1]))
+    return scored[:k]
+
+
+def run(n, directory):
+    path = os.path.join(directory, "cmd.json")
+    write_snapshot(path, generate_roster(n))
+    repository = MageRepository(path)
+    repository.stamp()  # Parse the roster outside the timings
+
+    board, build = timed(lambda: Leaderboard.attach(repository))
+    records = repository.all()
+    _, scan = timed(lambda: scan_top(records, 10))
+    top, top_time = timed(lambda: board.top(10), repeat=1000)
+    assert [mage_id for _, mage_id in top] == [mage_id for _, mage_id in scan_top(records, 10)]
+
+    rng = random.Random(0)
+    ids = [mage["id"] for mage in rng.sample(records, min(n, 1000))]
+    _, rank_time = timed(lambda: [board.rank(mage_id) for mage_id in ids])
+    rank_time /= len(ids)
+
+    def edit():
+        mage = dict(rng.choice(records))
+        mage["speed"] = rng.randrange(1, 300)
+        board.set(mage["id"], calculate_power(*(mage[stat] for stat in STAT_FIELDS)))
+    _, edit_time = timed(edit, repeat=1000)
+
+    board.close()
+    _, load = timed(lambda: Leaderboard.attach(repository))
+
+    print(f"{n:>9,}  scan top-10 {scan * 1e3:9.1f} ms  board: build {build * 1e3:8.1f} ms  load {load * 1e3:7.1f} ms  "
+          f"top-10 {top_time * 1e6:6.1f} us  rank {rank_time * 1e6:5.1f} us  update {edit_time * 1e6:5.1f} us")
+
+
+def main(argv):
+    with tempfile.TemporaryDirectory() as directory:
+        for n in [int(arg) for arg in argv] or [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]:
+            run(n, directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""Time the stat-allocation optimizer on one mage and on whole rosters.
+
+    python -m benchmarks.optimize [N ...]
+
+Single: ``optimize`` on a few random mages, reporting the time per call
+and the power gained. Batch: ``optimize_batch`` on N random mages
+(default 100, 1000 and 5000), each keeping its own total as the budget.
+Every result is checked to stay within budget and bounds and never to lose
+power.
+"""
+import random
+import sys
+import time
+
+from benchmarks.roster import random_mage
+from power.formula import calculate_power, np
+from power.optimize import DEFAULT_BOUNDS, optimize, optimize_batch
+from power.schema import STAT_FIELDS
+
+
+def power_of(stats):
+    return calculate_power(*(stats[stat] for stat in STAT_FIELDS))
+
+
+def check(mage, result):
+    if sum(result.stats.values()) > sum(mage[stat] for stat in STAT_FIELDS):
+        raise AssertionError("allocation exceeds the budget")
+    for stat, value in result.stats.items():
+        low, high = DEFAULT_BOUNDS[stat]
+        if not low <= value <= high:
+            raise AssertionError(f"{stat}={value} is outside {low}..{high}")
+
+
+def single(count=20):
+    rng = random.Random(1)
+    mages = [random_mage(rng) for _ in range(count)]
+    start = time.perf_counter()
+    results = [optimize(mage) for mage in mages]
+    elapsed = (time.perf_counter() - start) / count
+    for mage, result in zip(mages, results):
+        check(mage, result)
+        if result.power < power_of(mage) - 1e-9:
+            raise AssertionError("optimizer lost power")
+    gain = sum(result.power / max(power_of(mage), 1e-9) for mage, result in zip(mages, results)) / count
+    print(f"single  {elapsed * 1000:7.2f} ms per mage  mean power x{gain:.1f}")
+
+
+def batch(n):
+    rng = random.Random(n)
+    mages = [random_mage(rng) for _ in range(n)]
+    start = time.perf_counter()
+    results = optimize_batch(mages)
+    elapsed = time.perf_counter() - start
+    for mage, result in zip(mages, results):
+        check(mage, result)
+    print(f"batch {n:>7,}  {elapsed:7.3f}s  {elapsed / n * 1000:6.3f} ms per mage")
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [100, 1000, 5000]
+    print(f"NumPy: {'yes' if np is not None else 'no'}")
+    single()
+    for n in sizes:
+        batch(n)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
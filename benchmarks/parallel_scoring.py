@@ -0,0 +1,64 @@
+"""Scaling of score_parallel from one worker process to every core.
+
+    python -m benchmarks.parallel_scoring [N] [--format json|jsonl]
+
+Writes an N-mage roster (default 200,000) to a temp file, then times the
+serial CLI path and score_parallel with 1, 2, 4, ... workers up to the core
+count, checking that every run ranks the same top 10.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.roster import generate_roster
+from power.cli import PowerStats, scored, top_k
+from power.formats import iter_records
+from power.parallel import score_parallel
+
+
+def serial(path):
+    stats = PowerStats()
+    pairs = scored(iter_records(path))
+
+    def counted():
+        for power, record in pairs:
+            stats.add(power)
+            yield power, record
+    return top_k(counted(), 10), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", type=int, nargs="?", default=200_000)
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** i for i in range(1, cores.bit_length()) if 2 ** i < cores})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"roster.{args.format}")
+        with open(path, 'w') as file:
+            if args.format == "json":
+                json.dump(generate_roster(args.n), file)
+            else:
+                file.writelines(json.dumps(record) + "\n" for record in generate_roster(args.n))
+        print(f"{args.n:,} mages, {os.path.getsize(path) / 2 ** 20:.1f} MiB {args.format}, {cores} cores")
+
+        start = time.perf_counter()
+        expected, stats = serial(path)
+        baseline = time.perf_counter() - start
+        print(f"  serial      {baseline:8.2f} s")
+
+        for workers in counts:
+            start = time.perf_counter()
+            ranked, parallel_stats = score_parallel(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert [r["id"] for _, r in ranked] == [r["id"] for _, r in expected]
+            assert parallel_stats.count == stats.count
+            print(f"  {workers:>3} workers {elapsed:8.2f} s   speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare calculate_power_batch with a per-mage calculate_power loop.
+
+    python -m benchmarks.power_batch [N ...]
+
+Defaults to 10^4 .. 10^7 mages. The scalar loop is timed on at most
+SCALAR_CAP rows and scaled up, since a 10^7-iteration Python loop adds
+nothing but waiting. Each run also checks the batch results against the
+scalar function.
+"""
+import random
+import sys
+import time
+
+from power.formula import calculate_power, calculate_power_batch, np
+
+SCALAR_CAP = 200_000
+TOLERANCE = 1e-12
+
+
+_UPPER = [200, 200, 200, 200, 20, 20, 200, 200]
+
+
+def random_stats(n, seed=0):
+    """Return n rows of stats, as an (n, 8) array when NumPy is available."""
+    if np is not None:
+        return np.random.default_rng(seed).uniform(0, 1, (n, 8)) * _UPPER
+    rng = random.Random(seed)
+    return [[rng.uniform(0, upper) for upper in _UPPER] for _ in range(n)]
+
+
+def check_parity(rows, batch):
+    worst = 0.0
+    for row, value in zip(rows, batch):
+        expected = calculate_power(*row)
+        worst = max(worst, abs(value - expected) / max(1.0, abs(expected)))
+    if worst > TOLERANCE:
+        raise AssertionError(f"batch result differs from calculate_power by {worst:.3g}")
+    return worst
+
+
+def run(n):
+    stats = random_stats(n)
+    scalar_rows = stats[:SCALAR_CAP].tolist() if np is not None else stats[:SCALAR_CAP]
+
+    start = time.perf_counter()
+    for row in scalar_rows:
+        calculate_power(*row)
+    scalar = (time.perf_counter() - start) * n / len(scalar_rows)
+
+    start = time.perf_counter()
+    batch = calculate_power_batch(stats)
+    vectorized = time.perf_counter() - start
+
+    worst = check_parity(scalar_rows, batch)
+    print(f"{n:>10,}  scalar {scalar:9.4f}s  batch {vectorized:9.4f}s  "
+          f"speedup {scalar / vectorized:7.1f}x  max rel err {worst:.1e}")
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+    print(f"numpy: {np.__version__ if np is not None else 'not installed (pure-Python fallback)'}")
+    for n in sizes:
+        run(n)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
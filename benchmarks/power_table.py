@@ -0,0 +1,92 @@
+"""Compare the PowerTable lookup evaluator with calculate_power.
+
+    python -m benchmarks.power_table [N ...]
+
+Interactive: sliders being dragged, i.e. calculate_power called with one
+stat stepping through whole values (as floats, the way a DoubleVar holds
+them). Bulk: N mages with integer stats scored by a calculate_power
+loop, by calculate_power_batch and by PowerTable.batch; defaults to 10^4 ..
+10^6. Every run checks the table results are bit-for-bit equal to
+calculate_power.
+"""
+import random
+import sys
+import time
+
+from power.formula import PowerTable, calculate_power, calculate_power_batch, np
+from power.schema import STAT_FIELDS
+
+SCALAR_CAP = 200_000
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def interactive(rounds=300):
+    base = [150.0, 120.0, 110.0, 30.0, 12.0, 15.0, 140.0, 160.0]
+    # Drag each slider across 0..200 in turn
+    rows = []
+    for i in range(len(STAT_FIELDS)):
+        for value in range(0, 201):
+            row = list(base)
+            row[i] = float(value)
+            rows.append(row)
+    power = PowerTable().power
+    if any(power(*row) != calculate_power(*row) for row in rows):
+        raise AssertionError("PowerTable differs from calculate_power")
+
+    # Many short interleaved runs, so both see the same machine noise
+    best = {calculate_power: float("inf"), power: float("inf")}
+    for _ in range(rounds):
+        for func in best:
+            start = time.perf_counter()
+            for row in rows:
+                func(*row)
+            best[func] = min(best[func], time.perf_counter() - start)
+    exact, lookup = (best[func] / len(rows) for func in (calculate_power, power))
+    print(f"interactive  calculate_power {exact * 1e9:7.1f} ns  PowerTable {lookup * 1e9:7.1f} ns  "
+          f"speedup {exact / lookup:4.2f}x")
+
+
+def integer_stats(n, seed=0):
+    rng = random.Random(seed)
+    upper = [200, 200, 200, 200, 20, 20, 200, 200]
+    return [[float(rng.randint(0, high)) for high in upper] for _ in range(n)]
+
+
+def bulk(n):
+    rows = integer_stats(n)
+    scalar_rows = rows[:SCALAR_CAP]
+    stats = np.asarray(rows) if np is not None else rows
+    table = PowerTable()
+
+    expected = [calculate_power(*row) for row in scalar_rows]
+    got = table.batch(stats)
+    got = got.tolist() if np is not None else got
+    if got[:len(expected)] != expected:
+        raise AssertionError("PowerTable.batch differs from calculate_power")
+
+    scalar = best_of(lambda: [calculate_power(*row) for row in scalar_rows], 3) * n / len(scalar_rows)
+    table_loop = best_of(lambda: [table.power(*row) for row in scalar_rows], 3) * n / len(scalar_rows)
+    vectorized = best_of(lambda: calculate_power_batch(stats), 3)
+    tabled = best_of(lambda: table.batch(stats), 3)
+    print(f"bulk {n:>10,}  loop {scalar:8.4f}s  table loop {table_loop:8.4f}s  "
+          f"calculate_power_batch {vectorized:8.4f}s  PowerTable.batch {tabled:8.4f}s")
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10 ** 4, 10 ** 5, 10 ** 6]
+    interactive()
+    for n in sizes:
+        bulk(n)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
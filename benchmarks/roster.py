@@ -0,0 +1,35 @@
+"""Seeded synthetic mage rosters for the benchmarks."""
+import random
+import string
+import uuid
+
+PERSONALITIES = ("calm", "fiery", "stoic", "curious", "reckless", "cunning", "gentle", "proud")
+
+
+def _text(rng, low, high):
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(rng.randint(low, high))).strip() or "x"
+
+
+def random_mage(rng):
+    """Return one mage record in the ``Mage.to_dict`` layout."""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "name": _text(rng, 4, 16),
+        "age": rng.randint(16, 400),
+        "description": _text(rng, 10, 80),
+        "years_practicing": rng.randint(0, 300),
+        "personality": rng.choice(PERSONALITIES),
+        "health": float(rng.randint(0, 200)),
+        "mana": float(rng.randint(0, 200)),
+        "stamina": float(rng.randint(0, 200)),
+        "defense": float(rng.randint(0, 200)),
+        "phys_atk": float(rng.randint(0, 20)),
+        "mag_atk": float(rng.randint(0, 20)),
+        "speed": float(rng.randint(0, 200)),
+        "intelligence": float(rng.randint(0, 200)),
+    }
+
+
+def generate_roster(n, seed=0):
+    rng = random.Random(seed)
+    return [random_mage(rng) for _ in range(n)]
@@ -0,0 +1,60 @@
+"""Per-event cost of a stat-slider drag in the stats editor, before and after the slotted Mage.
+
+    python -m benchmarks.scale_event_alloc [EVENTS]
+
+"Before" replays what StatsVisualizerForEdit.on_scale_change used to do per
+<B1-Motion> event (a 14-key record dict for the callback plus an 8-key dict
+for the power label); "after" is the current path, which hands the Mage
+itself to the callback. Tk itself is not involved.
+"""
+import sys
+import time
+import tracemalloc
+
+from power.formula import calculate_power
+from power.mage import Mage
+from power.schema import FIELDS, STAT_FIELDS
+
+
+def legacy_event(mage, stat, value):
+    mage.set_stat(stat, value)
+    stat_values = {name: mage.get_stat(name) for name in STAT_FIELDS}
+    power = calculate_power(*stat_values.values())
+    mage_data = {field: mage.get_id() if field == "id" else getattr(mage, f"_{field}") for field in FIELDS}
+    return power, mage_data
+
+
+def current_event(mage, stat, value):
+    mage.set_stat(stat, value)
+    return mage.power, mage
+
+
+def measure(handler, events):
+    mage = Mage(name="bench")
+    values = [float(i % 200) for i in range(events)]
+
+    start = time.perf_counter()
+    for value in values:
+        handler(mage, "speed", value)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    handler(mage, "speed", 1.0)  # warm up
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    handler(mage, "speed", 2.0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / events, peak - baseline
+
+
+def main(argv):
+    events = int(argv[0]) if argv else 200_000
+    for label, handler in (("before", legacy_event), ("after", current_event)):
+        per_event, peak = measure(handler, events)
+        print(f"{label:>6}: {per_event * 1e6:6.2f} us/event, peak {peak:5d} B allocated per event")
+    print(f"Mage instance: {sys.getsizeof(Mage())} B, no __dict__")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+"""Search-as-you-type latency of SearchIndex versus scanning every record.
+
+    python -m benchmarks.search [N ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.roster import generate_roster
+from power.repository import MageRepository, write_snapshot
+from power.search import SearchIndex, record_matches
+
+SYLLABLES = ("ka", "ri", "mo", "then", "zal", "or", "wyn", "el", "dra", "quen", "sil", "bar", "ith", "u", "fey")
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+
+def wordy_roster(n, seed=0):
+    """generate_roster with names and descriptions drawn from a word-like vocabulary."""
+    rng = random.Random(seed)
+    records = generate_roster(n, seed)
+    for record in records:
+        record["name"] = " ".join(word(rng) for _ in range(2)).title()
+        record["description"] = " ".join(word(rng) for _ in range(rng.randint(3, 15)))
+    return records
+
+
+def typing(query):
+    """Every prefix of ``query``, as a search box sees it while typing."""
+    return [query[:end] for end in range(1, len(query) + 1)]
+
+
+def run(n, directory):
+    path = os.path.join(directory, "cmd.json")
+    records = wordy_roster(n)
+    write_snapshot(path, records)
+    repository = MageRepository(path)
+    repository.stamp()
+
+    start = time.perf_counter()
+    index = SearchIndex.attach(repository)
+    build = time.perf_counter() - start
+    index.close()
+    start = time.perf_counter()
+    index = SearchIndex.attach(repository)
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    index.prepare_fuzzy()
+    fuzzy = time.perf_counter() - start
+    print(f"{n:>9,}  build {build * 1e3:8.1f} ms  load {load * 1e3:8.1f} ms  typo table {fuzzy * 1e3:8.1f} ms")
+
+    sample = records[len(records) // 2]
+    queries = [sample["name"].split()[0].lower(), "zalwyn curious", "draquen silbar", sample["name"].lower()[:-1] + "x"]
+    for query in queries:
+        latencies = []
+        for text in typing(query):
+            start = time.perf_counter()
+            found = index.search(text)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = {record["id"] for record in records if record_matches(record, query)}
+        scan = time.perf_counter() - start
+        assert set(found) == expected, query
+        print(f"           {query!r:<28} {len(found):>7} hits  typing: mean {sum(latencies) / len(latencies) * 1e3:7.2f} ms"
+              f"  worst {max(latencies) * 1e3:7.2f} ms   scan {scan * 1e3:8.1f} ms")
+    index.close()
+
+
+def main(argv):
+    with tempfile.TemporaryDirectory() as directory:
+        for n in [int(arg) for arg in argv] or [10 ** 4, 10 ** 5]:
+            run(n, directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,149 @@
+"""Startup time of the core package, the GUI module and the app's first window, against a budget.
+
+    python -m benchmarks.startup [--frozen PATH] [--runs N] [--no-budget]
+
+Import times are the cumulative ``python -X importtime`` figures of a
+fresh interpreter, the best of ``--runs`` (bytecode is written by a first
+unmeasured run, so compile time never counts). The core import must also
+stay free of tkinter and NumPy. First window is the wall time from
+starting ``python main.py`` (and the frozen app, from ``--frozen`` or
+``dist/``, when one has been built with ``pyinstaller main.spec``) until
+its root window is mapped, reported by the app through
+``MAGE_STARTUP_PROBE``; it needs a display and is skipped without one.
+
+Any figure over its entry in ``BUDGET`` fails the run (exit status 1).
+The budget is for a developer laptop; benchmarks.suite tracks the same
+figures against a per-machine baseline.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = ("power.formula", "power.mage", "power.database", "power.cli")
+GUI_ONLY = ("tkinter", "numpy")  # Must not be imported by the core
+
+# Seconds
+BUDGET = {
+    "startup/import_core": 0.025,
+    "startup/import_main": 0.080,
+    "startup/first_window": 0.500,
+    "startup/first_window_frozen": 1.000,
+}
+
+FROZEN_CANDIDATES = (
+    os.path.join("dist", "main", "main"),
+    os.path.join("dist", "main", "main.exe"),
+    os.path.join("dist", "main.app", "Contents", "MacOS", "main"),
+)
+
+
+def _environment():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.pop("MAGE_TRACE", None)
+    return env
+
+
+def import_times(modules, runs=5):
+    """``({module: best cumulative seconds}, every module imported)`` for importing ``modules`` in a new interpreter."""
+    code = "; ".join(f"import {module}" for module in modules)
+    best = {}
+    imported = set()
+    for run in range(runs + 1):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=_environment(),
+                                capture_output=True, text=True, check=True)
+        if run == 0:
+            continue  # Writes the bytecode caches
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if not cumulative.strip().isdigit():
+                continue  # The header line
+            name = name.strip()
+            imported.add(name)
+            if name in modules:
+                best[name] = min(best.get(name, float("inf")), int(cumulative) / 1e6)
+    return best, imported
+
+
+def first_window_time(command, runs=3, timeout=30):
+    """Best seconds from starting ``command`` until the app maps its root window, or None without a display."""
+    best = None
+    with tempfile.TemporaryDirectory() as directory:
+        probe = os.path.join(directory, "mapped")
+        for _ in range(runs):
+            if os.path.exists(probe):
+                os.remove(probe)
+            start = time.time()
+            process = subprocess.run(command, cwd=directory, env=dict(_environment(), MAGE_STARTUP_PROBE=probe),
+                                     capture_output=True, timeout=timeout)
+            if process.returncode != 0 and b"display" in process.stderr:
+                return None  # Tk could not start
+            if process.returncode != 0 or not os.path.exists(probe):
+                raise RuntimeError(f"{command[-1]} did not start: {process.stderr.decode(errors='replace')[-500:]}")
+            with open(probe) as file:
+                elapsed = float(file.read()) - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def find_frozen(path=None):
+    for candidate in (path,) if path else FROZEN_CANDIDATES:
+        candidate = os.path.join(ROOT, candidate)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+def bench_startup(frozen=None, runs=5):
+    """Yield ``(metric name, seconds)`` for each startup figure that can be measured here."""
+    core, imported = import_times(CORE_MODULES, runs)
+    leaked = [module for module in GUI_ONLY if module in imported]
+    if leaked:
+        raise AssertionError(f"importing the core pulled in {', '.join(leaked)}")
+    yield "startup/import_core", max(core.values())
+
+    gui, _ = import_times(("main",), runs)
+    yield "startup/import_main", gui["main"]
+
+    seconds = first_window_time([sys.executable, os.path.join(ROOT, "main.py")])
+    if seconds is not None:
+        yield "startup/first_window", seconds
+        frozen = find_frozen(frozen)
+        if frozen is not None:
+            seconds = first_window_time([frozen])
+            if seconds is not None:
+                yield "startup/first_window_frozen", seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--frozen", help="the built app's executable (default: looked up under dist/)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-budget", action="store_true", help="report only; never fail")
+    args = parser.parse_args(argv)
+
+    over = []
+    measured = set()
+    for name, seconds in bench_startup(args.frozen, args.runs):
+        measured.add(name)
+        budget = BUDGET[name]
+        verdict = "ok" if seconds <= budget else "OVER"
+        print(f"  {name:<30} {seconds * 1000:8.1f} ms   budget {budget * 1000:6.0f} ms   {verdict}")
+        if seconds > budget:
+            over.append(name)
+    for name in BUDGET:
+        if name not in measured:
+            print(f"  {name:<30} skipped (no display, or no frozen build)")
+    return 1 if over and not args.no_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Stat range filters: StatIndex.query versus scanning every record.
+
+    python -m benchmarks.stat_filter [N ...]
+"""
+import sys
+import time
+
+from benchmarks.roster import generate_roster
+from power.statindex import StatIndex, matches, parse_predicates
+
+QUERIES = [
+    "speed>=150, speed<=200, mag_atk>10",
+    "intelligence>180",
+    "age==30, years_practicing>=5",
+    "health<50, mana>150, defense>=20",
+]
+
+
+def run(n):
+    records = generate_roster(n)
+    index = StatIndex()
+    start = time.perf_counter()
+    index.rebuild(records)
+    build = time.perf_counter() - start
+    print(f"{n:>9,}  build {build * 1e3:9.1f} ms")
+
+    for text in QUERIES:
+        predicates = parse_predicates(text)
+        start = time.perf_counter()
+        expected = [record["id"] for record in records if matches(record, predicates)]
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        found = index.query(predicates)
+        query = time.perf_counter() - start
+        assert found == expected
+        print(f"           {text:<38} {len(found):>8} hits  scan {scan * 1e3:8.2f} ms  index {query * 1e3:8.2f} ms")
+
+
+def main(argv):
+    for n in [int(arg) for arg in argv] or [10 ** 4, 10 ** 5, 10 ** 6]:
+        run(n)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,312 @@
+"""Benchmark suite for the formula, storage, Mage, overview and startup paths, with regression checks.
+
+    python -m benchmarks.suite [--sizes N ...] [--backends json journal sqlite]
+                               [--output results.json] [--baseline PATH] [--threshold 0.25]
+                               [--save-baseline PATH]
+
+Every metric is seconds per operation (lower is better), taken as the best
+of several timed loops. Rosters come from the seeded generator in
+benchmarks.roster, so runs are reproducible; sizes default to 10^2-10^5
+(pass e.g. ``--sizes 100 1000000`` for the full range). Results are written
+as JSON. With ``--baseline`` each metric is compared with that earlier
+run and the suite exits with status 1 when any is slower by more than
+``--threshold``; ``--save-baseline`` stores this run for later
+comparisons. Baselines are machine-specific, so none is committed:
+record one with ``--save-baseline benchmarks/baseline.json`` (ignored by
+git) on the machine that runs the comparison, then pass it as
+``--baseline``.
+
+The overview case needs a display. Without $DISPLAY it starts Xvfb when
+that is installed, and is skipped otherwise; so are the first-window times
+of the startup case (see benchmarks.startup).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import main as app
+from benchmarks.roster import generate_roster, random_mage
+from benchmarks.startup import bench_startup
+from power import database
+from power.formula import calculate_power, calculate_power_batch, np
+from power.mage import Mage
+from power.repository import write_snapshot
+from power.schema import STAT_FIELDS
+
+DEFAULT_SIZES = (100, 1000, 10_000, 100_000)
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def measure(func, min_time=0.2, repeat=5, reset=None):
+    """Seconds per call of ``func()``: the best of ``repeat`` loops, each long enough to time reliably.
+
+    ``reset``, if given, runs after every call outside the timing, e.g. to
+    undo what the call changed.
+    """
+    def run(number):
+        if reset is None:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            return time.perf_counter() - start
+        elapsed = 0.0
+        for _ in range(number):
+            start = time.perf_counter()
+            func()
+            elapsed += time.perf_counter() - start
+            reset()
+        return elapsed
+
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed * repeat >= min_time or elapsed > 0.1:
+            break
+        number *= 10
+    best = elapsed / number
+    for _ in range(repeat - 1 if elapsed < 1 else 2):
+        best = min(best, run(number) / number)
+    return best
+
+
+# Cases; each yields (metric name, seconds per operation)
+
+def bench_formula(sizes):
+    stats = [float(value) for value in (150, 120, 110, 30, 12, 15, 140, 160)]
+    yield "formula/calculate_power", measure(lambda: calculate_power(*stats))
+    for n in sizes:
+        records = generate_roster(n)
+        columns = {stat: [record[stat] for record in records] for stat in STAT_FIELDS}
+        if np is not None:
+            columns = {stat: np.asarray(values) for stat, values in columns.items()}
+        yield f"formula/calculate_power_batch_per_mage[{n}]", measure(lambda: calculate_power_batch(columns)) / n
+
+
+def bench_mage():
+    record = random_mage(random.Random(0))
+    mage = Mage()
+    yield "mage/construct", measure(Mage)
+    yield "mage/to_dict", measure(mage.to_dict)
+    yield "mage/load_completely", measure(lambda: mage.load_completely(record))
+    yield "mage/round_trip", measure(lambda: Mage().load_completely(mage.to_dict()))
+
+
+@contextlib.contextmanager
+def roster_file(directory, n, backend):
+    """Point the CMD file at a fresh ``n``-mage roster for ``backend``."""
+    path = os.path.join(directory, f"{backend}-{n}.json")
+    write_snapshot(path, generate_roster(n))
+    database.CMD_FILENAME, database.STORAGE_BACKEND = path, backend
+    database._repository = None
+    try:
+        yield path
+    finally:
+        database.get_repository().close()
+        database._repository = None
+
+
+def bench_storage(sizes, backends, directory):
+    for backend in backends:
+        for n in sizes:
+            with roster_file(directory, n, backend):
+                def cold_load():
+                    database.get_repository().close()
+                    database._repository = None
+                    database.load_mages_from_cmd()
+
+                # Seeds the SQLite database, so the first cold load is not special
+                database.load_mages_from_cmd()
+                yield f"storage/{backend}/load_cold[{n}]", measure(cold_load, repeat=3)
+                yield f"storage/{backend}/load_warm[{n}]", measure(database.load_mages_from_cmd, repeat=3)
+
+                rng = random.Random(n)
+                existing = database.load_mages_from_cmd()[n // 2]
+                saved = []
+
+                def save():
+                    mage = random_mage(rng)
+                    saved.append(mage["id"])
+                    database.save_mage_to_cmd(mage)
+
+                def unsave():
+                    # Keep the roster at n mages, so every save is timed at the same size
+                    database.get_repository().delete(saved.pop())
+                yield f"storage/{backend}/save[{n}]", measure(save, repeat=3, reset=unsave)
+
+                def update():
+                    record = dict(existing, speed=float(rng.randint(0, 200)))
+                    database.update_mage_in_cmd(record)
+                yield f"storage/{backend}/update[{n}]", measure(update, repeat=3)
+
+
+@contextlib.contextmanager
+def headless_display():
+    """Yield a Tk root, or None when no display is available; starts Xvfb if there is no $DISPLAY."""
+    server = None
+    if not os.environ.get("DISPLAY") and shutil.which("Xvfb"):
+        display = ":97"
+        server = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24"],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ["DISPLAY"] = display
+        time.sleep(0.5)
+    try:
+        root = app.tk.Tk()
+    except app.tk.TclError:
+        root = None
+    try:
+        yield root
+    finally:
+        if root is not None:
+            root.destroy()
+        if server is not None:
+            server.terminate()
+            server.wait()
+            del os.environ["DISPLAY"]
+
+
+def bench_overview(sizes, directory, root):
+    root.withdraw()
+    for n in sizes:
+        with roster_file(directory, n, "json"):
+            repository = database.get_repository()
+            display = app.MageDisplay(root, repository)
+
+            def pump(done, timeout=60):
+                deadline = time.perf_counter() + timeout
+                while not done() and time.perf_counter() < deadline:
+                    root.update()
+                    time.sleep(0.001)
+
+            def first_page():
+                display.refresh_mages()
+                pump(lambda: display.loaded > 0 or display.exhausted)
+
+            # The window and its indexes are built once, outside the timing
+            display.see_mages()
+            pump(lambda: display.loaded > 0 or display.exhausted)
+            # First page end to end: worker fetch, poll and insert
+            yield f"gui/populate_first_page[{n}]", measure(first_page, repeat=3)
+
+            # All rows, fetching pages directly so the worker's poll interval does not count
+            def populate_all():
+                display.load_all()
+                root.update_idletasks()
+            yield f"gui/populate_all_per_mage[{n}]", measure(populate_all, repeat=3) / n
+
+            display.new_window.destroy()
+            app._io_workers.pop(repository).close()
+            for registry in (database._leaderboards, database._stat_indexes, database._search_indexes):
+                index = registry.pop(repository, None)
+                if index is not None:
+                    index.close()
+
+
+# Reporting
+
+def compare(results, baseline, threshold):
+    """Return ``(name, baseline, current, ratio)`` for metrics slower than baseline by more than ``threshold``."""
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference and value / reference > 1 + threshold:
+            regressions.append((name, reference, value, value / reference))
+    return regressions
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", metavar="PATH", help="fail on regressions against this earlier run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio (default: 0.25)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store this run as a baseline")
+    parser.add_argument("--skip-gui", action="store_true")
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.baseline is not None:
+        # Read up front, so a missing baseline fails before the run rather than after it
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)["results"]
+        except (OSError, ValueError, KeyError) as error:
+            parser.error(f"cannot read baseline {args.baseline}: {error}")
+
+    results = {}
+    skipped = []
+
+    def record(cases):
+        for name, seconds in cases:
+            results[name] = seconds
+            print(f"  {name:<52} {format_seconds(seconds)}", flush=True)
+
+    saved = database.CMD_FILENAME, database.STORAGE_BACKEND
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            record(bench_formula(args.sizes))
+            record(bench_mage())
+            record(bench_storage(args.sizes, args.backends, directory))
+            if args.skip_gui:
+                skipped.append("gui")
+                record(bench_startup())
+            else:
+                with headless_display() as root:
+                    if root is None:
+                        skipped.append("gui")
+                        print("  gui/*: skipped, no display (install Xvfb to run headless)")
+                    else:
+                        record(bench_overview(args.sizes, directory, root))
+                    # First-window times need the display too
+                    record(bench_startup())
+        finally:
+            database.CMD_FILENAME, database.STORAGE_BACKEND = saved
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__ if np is not None else None,
+            "sizes": args.sizes,
+            "backends": args.backends,
+            "skipped": skipped,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"wrote {args.output}")
+
+    status = 0
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, reference, value, ratio in regressions:
+            print(f"REGRESSION {name}: {format_seconds(reference)} -> {format_seconds(value)} ({ratio:.2f}x)")
+        if regressions:
+            status = 1
+        else:
+            print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"saved baseline {args.save_baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
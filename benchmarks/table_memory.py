@@ -0,0 +1,41 @@
+"""Memory footprint of a roster as a list of dicts versus a MageTable.
+
+    python -m benchmarks.table_memory [N ...]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.roster import generate_roster
+from power.table import MageTable
+
+
+def measure(build):
+    """Return (result, bytes still allocated by build())."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def run(n):
+    # Round-trip through JSON text so both forms start from freshly parsed data.
+    text = json.dumps(generate_roster(n))
+    dicts, dict_bytes = measure(lambda: json.loads(text))
+    _, table_bytes = measure(lambda: MageTable(json.loads(text)))
+    del dicts
+    print(f"{n:>10,}  list of dicts {dict_bytes / 2**20:8.1f} MiB  MageTable {table_bytes / 2**20:8.1f} MiB  "
+          f"({dict_bytes / table_bytes:4.1f}x smaller, {table_bytes / n:5.0f} B/mage)")
+
+
+def main(argv):
+    for n in [int(arg) for arg in argv] or [10 ** 4, 10 ** 5, 5 * 10 ** 5]:
+        run(n)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,177 +1,171 @@
 import tkinter as tk
 from tkinter import ttk
-import uuid
-import json
+import bisect
+import functools
 import os
-
-CMD_FILENAME = "cmd.json"  # The central mage database
-
-
-def load_mages_from_cmd():
-    if not os.path.exists(CMD_FILENAME):
-        return []
-
-    with open(CMD_FILENAME, 'r') as file:
-        content = file.read()
-        if not content:
-            return []
+import time
+from collections import deque
+
+from power import database, trace
+# The storage functions and Mage lived here before the core moved into ``power``; kept for importers
+from power.database import (get_leaderboard, get_repository, get_search_index, get_stat_index, iter_mages_from_cmd,
+                            load_mages_from_cmd, save_mage_to_cmd, update_mage_in_cmd)
+from power.formula import calculate_power, np, power_table
+from power.mage import Mage
+from power.repository import VersionConflict
+from power.schema import STAT_FIELDS, VERSION_FIELD
+from power.search import record_matches
+from power.statindex import matches, parse_predicates
+from power.worker import IOWorker
+
+__all__ = [
+    "MageCreator", "MageDisplay", "MageEdit", "MageInteractive", "StatsVisualizer", "StatsVisualizerForEdit",
+    # Re-exported from ``power`` for code that imported them from here
+    "Mage", "calculate_power", "iter_mages_from_cmd", "load_mages_from_cmd", "save_mage_to_cmd", "update_mage_in_cmd",
+]
+
+if trace.ENABLED:
+    # Time every Tk event handler, widget command, after() callback and variable trace
+    tk.CallWrapper = trace.instrument_callbacks(tk.CallWrapper)
+
+_io_workers = {}
+
+
+def get_io_worker(repository, widget):
+    """Return the background I/O worker for ``repository``, polled from the app's root window."""
+    worker = _io_workers.get(repository)
+    if worker is None:
+        root = widget.nametowidget(".")
+        worker = _io_workers[repository] = IOWorker(repository, on_save_error=functools.partial(show_save_error, root))
+        worker.attach(root)
+    return worker
+
+
+def show_save_error(root, error):
+    # The window that saved is usually gone by the time the write fails
+    from tkinter import messagebox
+    messagebox.showerror("Save failed", f"Could not save mages: {error}", parent=root)
+
+
+def set_if_changed(var, value):
+    """Set a Tk variable only when its value differs, sparing traces and redraws."""
+    if var.get() != value:
+        var.set(value)
+
+
+class FrameThrottle:
+    """Coalesce bursts of requests into at most one ``callback()`` per frame.
+
+    ``request`` is cheap and can be bound directly to events or variable
+    traces; the callback runs from ``after_idle`` (or ``after`` when the
+    previous run was less than a frame ago). The time from the first request
+    of a burst until Tk has idled after the callback, i.e. until the result
+    is painted, is kept in ``latencies`` (seconds), reported as
+    ``on_latency(count, mean_ms, max_ms)`` if given, and, when tracing is on,
+    recorded as a ``latency:`` span.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, widget, callback, on_latency=None):
+        self.widget = widget
+        self.callback = callback
+        self.on_latency = on_latency
+        self.latencies = deque(maxlen=256)
+        self._scheduled = None
+        self._first_request = None
+        self._last_run = 0.0
+
+    def request(self, *args):
+        now = time.perf_counter()
+        if self._first_request is None:
+            self._first_request = now
+        if self._scheduled is None:
+            wait_ms = int(self.FRAME_MS - (now - self._last_run) * 1000)
+            if wait_ms > 0:
+                self._scheduled = self.widget.after(wait_ms, self._run)
+            else:
+                self._scheduled = self.widget.after_idle(self._run)
+
+    def _run(self):
+        self._scheduled = None
+        self._last_run = time.perf_counter()
+        started, self._first_request = self._first_request, None
+        self.callback()
+        # Idle callbacks run in order, so this one fires after the redraws queued above
+        self.widget.after_idle(self._painted, started)
+
+    def _painted(self, started):
+        latency = time.perf_counter() - started
+        self.latencies.append(latency)
+        if trace.ENABLED:
+            name = getattr(self.callback, "__qualname__", "callback")
+            trace.add_span(f"latency:{name}", int(started * 1e9), int(latency * 1e9))
+        if self.on_latency is not None:
+            self.on_latency(*self.latency_summary())
+
+    def latency_summary(self):
+        """Return (count, mean, max) of the recorded event-to-paint latencies in ms."""
+        if not self.latencies:
+            return 0, 0.0, 0.0
+        return (len(self.latencies), 1000 * sum(self.latencies) / len(self.latencies),
+                1000 * max(self.latencies))
+
+    def cancel(self):
+        if self._scheduled is not None:
+            self.widget.after_cancel(self._scheduled)
+            self._scheduled = None
+            self._first_request = None
+
+
+def show_latency(label, count, mean_ms, max_ms):
+    label.config(text=f"Frame latency: {mean_ms:.1f} ms mean, {max_ms:.1f} ms max ({count} frames)")
+
+
+class OptimizePanel:
+    """Budget entry, per-stat Keep boxes and an Optimize button for a stats window.
+
+    Optimize reallocates the budget (the current total when left empty)
+    across the stats not kept, within each slider's range, to maximize
+    power, and moves the sliders there.
+    """
+
+    def __init__(self, window, variables, scales, row, keep_column):
+        self.variables = variables
+        self.scales = scales
+        self.keep_vars = {stat: tk.BooleanVar(value=False) for stat in variables}
+        for i, stat in enumerate(variables):
+            ttk.Checkbutton(window, text="Keep", variable=self.keep_vars[stat]).grid(row=i, column=keep_column,
+                                                                                     padx=10, pady=5)
+
+        bar = ttk.Frame(window)
+        bar.grid(row=row, column=0, columnspan=keep_column + 1, sticky="ew", padx=10, pady=(0, 10))
+        ttk.Label(bar, text="Budget:").pack(side="left")
+        self.budget_var = tk.StringVar()
+        ttk.Entry(bar, textvariable=self.budget_var, width=8).pack(side="left", padx=5)
+        ttk.Button(bar, text="Optimize", command=self.optimize).pack(side="left")
+        self.status_var = tk.StringVar(value="Leave the budget empty to reuse the current total")
+        ttk.Label(bar, textvariable=self.status_var).pack(side="left", padx=10)
+
+    def optimize(self):
+        from power.optimize import optimize
+        stats = {stat: var.get() for stat, var in self.variables.items()}
+        text = self.budget_var.get().strip()
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            return []
-
-
-def save_mage_to_cmd(mage_data):
-    mages = load_mages_from_cmd()
-
-    # Check if mage with the same ID already exists
-    for i, mage in enumerate(mages):
-        if mage["id"] == mage_data["id"]:
-            # Update the existing mage
-            mages[i] = mage_data
-            break
-    else:
-        # If the loop completes without breaking (i.e., no existing mage found), append the new mage
-        mages.append(mage_data)
-
-    with open(CMD_FILENAME, 'w') as file:
-        json.dump(mages, file)
-
-
-def update_mage_in_cmd(updated_mage_data):
-    mages = load_mages_from_cmd()
-
-    # Find the mage to update and replace it
-    for i, mage in enumerate(mages):
-        if mage["id"] == updated_mage_data["id"]:
-            mages[i] = updated_mage_data
-            break
-
-    # Save the updated list of mages
-    with open(CMD_FILENAME, 'w') as file:
-        json.dump(mages, file)
-
-
-def calculate_power(hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
-    unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * (1.5 ** ((speed / 100) - 1))
-    unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * (1.1 ** (stamina / 100))
-    power = (unified2 * (2 ** ((intelligence - 100) / 20)) - 1) / 10
-    return power
-
-
-class Mage:
-    def __init__(self, name="", age=0, description="", years_practicing=0, personality="",
-                 health=100, mana=100, stamina=100, defense=10, phys_atk=4, mag_atk=0, speed=100, intelligence=100):
-        # Basic attributes
-        self._name = name
-        self._age = age
-        self._description = description
-        self._years_practicing = years_practicing
-        self._personality = personality
-        self.id = str(uuid.uuid4())
-
-        # Stats
-        self._health = health
-        self._mana = mana
-        self._stamina = stamina
-        self._defense = defense
-        self._phys_atk = phys_atk
-        self._mag_atk = mag_atk
-        self._speed = speed
-        self._intelligence = intelligence
-
-    @property
-    def power(self):
-        return calculate_power(self._health, self._mana, self._stamina, self._defense, self._phys_atk, self._mag_atk,
-                               self._speed, self._intelligence)
-
-    # Getters and setters for attributes
-    def get_name(self):
-        return self._name
-
-    def set_name(self, name):
-        self._name = name
-
-    def get_age(self):
-        return self._age
-
-    def set_age(self, age):
-        self._age = age
-
-    def get_description(self):
-        return self._description
-
-    def set_description(self, description):
-        self._description = description
-
-    def get_years_practicing(self):
-        return self._years_practicing
-
-    def set_years_practicing(self, years):
-        self._years_practicing = years
-
-    def get_personality(self):
-        return self._personality
-
-    def set_personality(self, personality):
-        self._personality = personality
-
-    # Getters and setters for stats
-    def get_stat(self, stat_name):
-        return getattr(self, f"_{stat_name}")
-
-    def set_stat(self, stat_name, value):
-        setattr(self, f"_{stat_name}", value)
-
-    def set_stats(self, health, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
-        self.set_stat("health", health)
-        self.set_stat("mana", mana)
-        self.set_stat("stamina", stamina)
-        self.set_stat("defense", defense)
-        self.set_stat("phys_atk", phys_atk)
-        self.set_stat("mag_atk", mag_atk)
-        self.set_stat("speed", speed)
-        self.set_stat("intelligence", intelligence)
-
-    def get_id(self):
-        return self.id
-
-    def load_completely(self, mage_data):
-        self.id = mage_data["id"]
-        self._name = mage_data["name"]
-        self._age = mage_data["age"]
-        self._description = mage_data["description"]
-        self._years_practicing = mage_data["years_practicing"]
-        self._personality = mage_data["personality"]
-
-        self._health = mage_data["health"]
-        self._mana = mage_data["mana"]
-        self._stamina = mage_data["stamina"]
-        self._defense = mage_data["defense"]
-        self._phys_atk = mage_data["phys_atk"]
-        self._mag_atk = mage_data["mag_atk"]
-        self._speed = mage_data["speed"]
-        self._intelligence = mage_data["intelligence"]
-
-    def to_dict(self):
-        """Extract mage data from the GUI to a dictionary format."""
-        mage_data = {
-            "id": self.get_id(),
-            "name": self.get_name(),
-            "age": self.get_age(),
-            "description": self.get_description(),
-            "years_practicing": self.get_years_practicing(),
-            "personality": self.get_personality(),
-            "health": self.get_stat("health"),
-            "mana": self.get_stat("mana"),
-            "stamina": self.get_stat("stamina"),
-            "defense": self.get_stat("defense"),
-            "phys_atk": self.get_stat("phys_atk"),
-            "mag_atk": self.get_stat("mag_atk"),
-            "speed": self.get_stat("speed"),
-            "intelligence": self.get_stat("intelligence"),
-        }
-        return mage_data
+            budget = float(text) if text else None
+        except ValueError:
+            self.status_var.set("The budget must be a number")
+            return
+        try:
+            result = optimize(stats, budget=budget,
+                              bounds={stat: (scale.cget("from"), scale.cget("to")) for stat, scale in self.scales.items()},
+                              fixed=[stat for stat, keep in self.keep_vars.items() if keep.get()])
+        except ValueError as error:
+            self.status_var.set(str(error))
+            return
+        before = calculate_power(*(stats[stat] for stat in STAT_FIELDS))
+        for stat, value in result.stats.items():
+            self.variables[stat].set(value)
+        self.status_var.set(f"Power {before:.2f} \u2192 {result.power:.2f}")
 
 
 class StatsVisualizer:
@@ -201,8 +195,11 @@ class StatsVisualizer:
             self.intelligence_var.set(initial_stats["intelligence"])
 
         # Update the power value and trigger the callback if provided
+        self.last_power = None
+
         def update_power(*args):
-            power = calculate_power(
+            # Slider values are whole numbers, so the exponentials come from the lookup table
+            power = power_table.power(
                 self.hp_var.get(),
                 self.mana_var.get(),
                 self.stamina_var.get(),
@@ -212,10 +209,17 @@ class StatsVisualizer:
                 self.speed_var.get(),
                 self.intelligence_var.get()
             )
+            if power == self.last_power:
+                return
+            self.last_power = power
             self.power_label.config(text=f"Total Power: {power:.2f}")
             if self.update_callback:
                 self.update_callback(power)
 
+        # Slider changes arrive through variable traces and are merged to one recompute per frame
+        self.power_throttle = FrameThrottle(
+            root, update_power, on_latency=lambda *summary: show_latency(self.latency_label, *summary))
+
         def override_value(var, entry, scale):
             try:
                 value = int(entry.get())
@@ -223,7 +227,6 @@ class StatsVisualizer:
                     new_max = 2 * value
                     scale.config(from_=0, to=new_max)
                 var.set(value)
-                update_power()
             except ValueError:
                 pass
 
@@ -237,12 +240,14 @@ class StatsVisualizer:
             ("Speed", self.speed_var),
             ("Intelligence", self.intelligence_var)
         ]
+        scales = {}
         for i, (label, var) in enumerate(stats):
             ttk.Label(root, text=label).grid(row=i, column=0, sticky="w", padx=10, pady=5)
             ttk.Label(root, textvariable=var).grid(row=i, column=1, padx=10, pady=5)
             scale = tk.Scale(root, from_=0, to_=200, orient="horizontal", variable=var, resolution=1)
             scale.grid(row=i, column=2, sticky="ew", padx=10, pady=5)
-            scale.bind("<Motion>", update_power)
+            scales[STAT_FIELDS[i]] = scale
+            var.trace_add("write", self.power_throttle.request)
             entry = ttk.Entry(root, width=5)
             entry.grid(row=i, column=3, padx=10, pady=5)
             button = ttk.Button(root, text="Override",
@@ -251,14 +256,22 @@ class StatsVisualizer:
 
         self.power_label = ttk.Label(root, text="Total Power: 0")
         self.power_label.grid(row=len(stats), column=0, columnspan=5, pady=20)
+        self.latency_label = ttk.Label(root, text="Frame latency: -")
+        self.latency_label.grid(row=len(stats) + 1, column=0, columnspan=5, pady=(0, 10))
+
+        # The stats list follows STAT_FIELDS order
+        self.optimize_panel = OptimizePanel(root, {stat: var for stat, (_, var) in zip(STAT_FIELDS, stats)}, scales,
+                                            row=len(stats) + 2, keep_column=5)
 
         update_power()
 
 
 class MageCreator:
-    def __init__(self, root):
+    def __init__(self, root, repository=None):
         self.root = root
         self.root.title("Mage Creator")
+        self.repository = repository if repository is not None else get_repository()
+        self.io = get_io_worker(self.repository, root)
 
         self.current_mage = Mage()
 
@@ -322,33 +335,22 @@ class MageCreator:
 
     def update_power(self, power):
         rounded_power = round(power, 2)
-        self.power_var.set(rounded_power)
+        set_if_changed(self.power_var, rounded_power)
         # Can also update the Mage's stats if needed
 
     def extract_mage_data(self):
         """Extract mage data from the GUI to a dictionary format."""
-        mage_data = {
-            "name": self.name_var.get(),
-            "age": self.age_var.get(),
-            "description": self.description_var.get(),
-            "years_practicing": self.years_practicing_var.get(),
-            "personality": self.personality_var.get(),
-            "health": self.current_mage.get_stat("health"),
-            "mana": self.current_mage.get_stat("mana"),
-            "stamina": self.current_mage.get_stat("stamina"),
-            "defense": self.current_mage.get_stat("defense"),
-            "phys_atk": self.current_mage.get_stat("phys_atk"),
-            "mag_atk": self.current_mage.get_stat("mag_atk"),
-            "speed": self.current_mage.get_stat("speed"),
-            "intelligence": self.current_mage.get_stat("intelligence"),
-            "id": self.current_mage.get_id(),
-        }
-        return mage_data
+        self.current_mage.set_name(self.name_var.get())
+        self.current_mage.set_age(self.age_var.get())
+        self.current_mage.set_description(self.description_var.get())
+        self.current_mage.set_years_practicing(self.years_practicing_var.get())
+        self.current_mage.set_personality(self.personality_var.get())
+        return self.current_mage.to_dict()
 
     def save_current_mage(self):
         """Save the current mage to the CMD."""
         mage_data = self.extract_mage_data()
-        save_mage_to_cmd(mage_data)
+        self.io.save(mage_data)
         self.root.destroy()
 
     def override_value(self, var, entry, scale):
@@ -362,6 +364,172 @@ class MageCreator:
             pass
 
 
+@functools.cache
+def _heat_palette(steps=256):
+    """Dark blue through green to yellow, as Tk colour strings."""
+    anchors = [(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)]
+    colors = []
+    for i in range(steps):
+        position = i / (steps - 1) * (len(anchors) - 1)
+        k = min(int(position), len(anchors) - 2)
+        t = position - k
+        colors.append("#%02x%02x%02x" % tuple(round(a + (b - a) * t) for a, b in zip(anchors[k], anchors[k + 1])))
+    return colors
+
+
+class SensitivityPanel:
+    """What-if view beside a stats window: power over one or two stats, and each stat's slope.
+
+    With two stats the grid is drawn as a heatmap, otherwise as a curve,
+    over the sliders' ranges with the other stats at their current values.
+    Sweeps run on a SweepWorker thread: each refresh first shows a coarse
+    grid, then the full one, and slider bursts only ever compute the
+    newest state, so dragging stays smooth.
+    """
+    SIZE = 300  # Canvas pixels, and points per axis of the full grid
+    COARSE = 30  # Points per axis of the quick first grid
+    NO_STAT = "(none)"
+
+    def __init__(self, parent, get_stats, scales):
+        from power.sweep import SweepWorker
+        self.get_stats = get_stats
+        self.scales = scales
+        self.window = tk.Toplevel(parent)
+        self.window.title("Power Sensitivity")
+
+        controls = ttk.Frame(self.window)
+        controls.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=5)
+        ttk.Label(controls, text="X:").pack(side="left")
+        self.x_var = tk.StringVar(value="speed")
+        x_box = ttk.Combobox(controls, textvariable=self.x_var, values=STAT_FIELDS, state="readonly", width=12)
+        x_box.pack(side="left", padx=5)
+        ttk.Label(controls, text="Y:").pack(side="left")
+        self.y_var = tk.StringVar(value="intelligence")
+        y_box = ttk.Combobox(controls, textvariable=self.y_var, values=(self.NO_STAT,) + STAT_FIELDS,
+                             state="readonly", width=12)
+        y_box.pack(side="left", padx=5)
+        for box in (x_box, y_box):
+            box.bind("<<ComboboxSelected>>", self.refresh)
+
+        self.canvas = tk.Canvas(self.window, width=self.SIZE, height=self.SIZE, background="white",
+                                highlightthickness=0)
+        self.canvas.grid(row=1, column=0, padx=10, pady=5)
+        self.image = None
+        self.range_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.range_var).grid(row=2, column=0, sticky="w", padx=10, pady=(0, 10))
+
+        slopes = ttk.Frame(self.window)
+        slopes.grid(row=1, column=1, rowspan=2, sticky="n", padx=10, pady=5)
+        ttk.Label(slopes, text="Power per point").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 5))
+        self.slope_vars = {}
+        for i, stat in enumerate(STAT_FIELDS, start=1):
+            ttk.Label(slopes, text=stat).grid(row=i, column=0, sticky="w")
+            self.slope_vars[stat] = tk.StringVar()
+            ttk.Label(slopes, textvariable=self.slope_vars[stat], width=10, anchor="e").grid(row=i, column=1)
+
+        self.worker = SweepWorker()
+        self.worker.attach(self.window)
+        self.window.bind("<Destroy>", self.on_window_destroy)
+
+        # Open to the right of the stats window
+        parent.update_idletasks()
+        self.window.geometry(f"+{parent.winfo_rootx() + parent.winfo_width() + 10}+{parent.winfo_rooty()}")
+        self.refresh()
+
+    def on_window_destroy(self, event):
+        if event.widget is self.window:
+            self.worker.close()
+
+    def exists(self):
+        return self.window.winfo_exists()
+
+    def refresh(self, *args):
+        from power.sweep import sensitivities
+        stats = self.get_stats()
+        for stat, slope in sensitivities(stats).items():
+            set_if_changed(self.slope_vars[stat], f"{slope:+.3f}")
+        x_stat, y_stat = self.x_var.get(), self.y_var.get()
+        x_range = self.stat_range(x_stat)
+        if y_stat in (self.NO_STAT, x_stat):
+            self.worker.request(self.sweep_curve, stats, x_stat, x_range, on_result=self.draw_curve)
+        else:
+            self.worker.request(self.sweep_heatmap, stats, x_stat, y_stat, x_range, self.stat_range(y_stat),
+                                on_result=self.draw_heatmap)
+
+    def stat_range(self, stat):
+        scale = self.scales[stat]
+        return float(scale.cget("from")), float(scale.cget("to"))
+
+    def pixel(self, value, low, high):
+        return (value - low) / (high - low) * (self.SIZE - 1) if high > low else 0.0
+
+    # Sweeps; these run on the worker thread and must not touch Tk
+
+    def sweep_curve(self, stats, stat, stat_range):
+        from power.sweep import sweep_1d
+        values, powers = sweep_1d(stats, stat, *stat_range, points=self.SIZE)
+        powers = list(powers)
+        low, high = min(powers), max(powers)
+        points = []
+        for i, power in enumerate(powers):
+            points += [i, self.SIZE - 1 - self.pixel(power, low, high)]
+        yield stats, stat, stat_range, points, low, high
+
+    def sweep_heatmap(self, stats, x_stat, y_stat, x_range, y_range):
+        from power.sweep import sweep_2d
+        for size in (self.COARSE, self.SIZE):
+            _, _, powers = sweep_2d(stats, x_stat, y_stat, x_range, y_range, shape=(size, size))
+            yield stats, x_stat, y_stat, x_range, y_range, size, *self.heat_rows(powers)
+
+    def heat_rows(self, powers):
+        """Tk photo data for a power grid, highest y at the top, plus the power range."""
+        palette = _heat_palette()
+        top = len(palette) - 1
+        if np is not None:
+            powers = np.asarray(powers)
+            low, high = float(powers.min()), float(powers.max())
+            scale = top / (high - low) if high > low else 0.0
+            indexes = ((powers[::-1] - low) * scale).astype(np.intp)
+            colors = np.array(palette, dtype=object)[indexes]
+            rows = ["{" + " ".join(row) + "}" for row in colors.tolist()]
+        else:
+            low = min(min(row) for row in powers)
+            high = max(max(row) for row in powers)
+            scale = top / (high - low) if high > low else 0.0
+            rows = ["{" + " ".join(palette[int((power - low) * scale)] for power in row) + "}"
+                    for row in reversed(powers)]
+        return " ".join(rows), low, high
+
+    # Drawing, back on the Tk thread
+
+    def draw_curve(self, result):
+        stats, stat, (low, high), points, power_low, power_high = result
+        self.canvas.delete("all")
+        self.image = None
+        self.canvas.create_line(*points, fill="#3b528b", width=2)
+        x = self.pixel(stats[stat], low, high)
+        power = calculate_power(*(stats[name] for name in STAT_FIELDS))
+        y = self.SIZE - 1 - self.pixel(power, power_low, power_high)
+        self.canvas.create_oval(x - 4, y - 4, x + 4, y + 4, outline="#d62728", width=2)
+        self.range_var.set(f"{stat} {low:g}\u2013{high:g}   power {power_low:.1f}\u2013{power_high:.1f}")
+
+    def draw_heatmap(self, result):
+        stats, x_stat, y_stat, (x_low, x_high), (y_low, y_high), size, data, power_low, power_high = result
+        image = tk.PhotoImage(width=size, height=size)
+        image.put(data)
+        if size < self.SIZE:
+            image = image.zoom(-(-self.SIZE // size))
+        self.canvas.delete("all")
+        self.image = image  # Tk drops images that Python no longer references
+        self.canvas.create_image(0, 0, image=image, anchor="nw")
+        x = self.pixel(stats[x_stat], x_low, x_high)
+        y = self.SIZE - 1 - self.pixel(stats[y_stat], y_low, y_high)
+        self.canvas.create_line(x - 6, y, x + 6, y, fill="white", width=2)
+        self.canvas.create_line(x, y - 6, x, y + 6, fill="white", width=2)
+        self.range_var.set(f"{x_stat} {x_low:g}\u2013{x_high:g}, {y_stat} {y_low:g}\u2013{y_high:g}   "
+                           f"power {power_low:.1f}\u2013{power_high:.1f}")
+
+
 class StatsVisualizerForEdit:
 
     def __init__(self, parent, mage, update_callback):
@@ -390,6 +558,11 @@ class StatsVisualizerForEdit:
             "speed": 200,
             "intelligence": 200,
         }
+        # Slider bursts update the mage immediately but repaint and notify at most once per frame
+        self.gui_throttle = FrameThrottle(
+            self.stats_window, self.propagate_changes,
+            on_latency=lambda *summary: show_latency(self.latency_label, *summary))
+        self.sensitivity = None
         self.create_widgets()
         self.update_widgets_from_mage()
 
@@ -401,7 +574,7 @@ class StatsVisualizerForEdit:
             scale_max = self.default_max_values[stat]
             scale = tk.Scale(self.stats_window, from_=0, to=scale_max, orient="horizontal", variable=var, resolution=1)
             scale.grid(row=i, column=2, sticky="ew", padx=10, pady=5)
-            scale.bind("<B1-Motion>", lambda event, s=stat, v=var: self.on_scale_change(s, v.get()))
+            var.trace_add("write", lambda *args, s=stat, v=var: self.on_scale_change(s, v.get()))
 
             entry = ttk.Entry(self.stats_window, width=5, textvariable=self.entry_values[stat])
             entry.grid(row=i, column=3, padx=10, pady=5)
@@ -416,8 +589,17 @@ class StatsVisualizerForEdit:
 
             self.stats_controls[stat] = (scale, entry, button)
 
-        self.power_label = ttk.Label(self.stats_window, text="Total Power: -")
+        self.power_text = "Total Power: -"
+        self.power_label = ttk.Label(self.stats_window, text=self.power_text)
         self.power_label.grid(row=len(self.stats_vars), column=0, columnspan=5, pady=20)
+        self.latency_label = ttk.Label(self.stats_window, text="Frame latency: -")
+        self.latency_label.grid(row=len(self.stats_vars) + 1, column=0, columnspan=5, pady=(0, 10))
+
+        self.optimize_panel = OptimizePanel(
+            self.stats_window, self.stats_vars, {stat: controls[0] for stat, controls in self.stats_controls.items()},
+            row=len(self.stats_vars) + 2, keep_column=6)
+        ttk.Button(self.stats_window, text="What If", command=self.open_sensitivity).grid(
+            row=len(self.stats_vars), column=5, columnspan=2, padx=10, pady=20)
 
     def update_widgets_from_mage(self):
         for stat, var in self.stats_vars.items():
@@ -428,12 +610,24 @@ class StatsVisualizerForEdit:
     def on_scale_change(self, stat_name, value):
         # Update the mage's stat when the scale is changed using the set_stat method
         self.mage.set_stat(stat_name, value)
+        self.gui_throttle.request()
+
+    def open_sensitivity(self):
+        if self.sensitivity is not None and self.sensitivity.exists():
+            self.sensitivity.window.lift()
+            return
+        self.sensitivity = SensitivityPanel(
+            self.stats_window, lambda: {stat: self.mage.get_stat(stat) for stat in STAT_FIELDS},
+            {stat: controls[0] for stat, controls in self.stats_controls.items()})
+
+    def propagate_changes(self):
         self.update_power_label()
+        if self.sensitivity is not None and self.sensitivity.exists():
+            self.sensitivity.refresh()
 
-        # Extract mage data and pass it to the update callback
-        mage_data = self.extract_mage_data_for_update()
+        # Hand the mage itself to the callback; no per-event dict is built
         if self.update_callback:
-            self.update_callback(mage_data)
+            self.update_callback(self.mage)
 
     def reset_stat(self, stat):
         # Reset the stat to the original value
@@ -451,48 +645,13 @@ class StatsVisualizerForEdit:
 
     def extract_mage_data_for_update(self):
         """Extract mage data from the StatsVisualizerForEdit to a dictionary format."""
-        mage_data = {
-            "name": self.mage.get_name(),
-            "age": self.mage.get_age(),
-            "description": self.mage.get_description(),
-            "years_practicing": self.mage.get_years_practicing(),
-            "personality": self.mage.get_personality(),
-            "health": self.mage.get_stat('health'),
-            "mana": self.mage.get_stat('mana'),
-            "stamina": self.mage.get_stat('stamina'),
-            "defense": self.mage.get_stat('defense'),
-            "phys_atk": self.mage.get_stat('phys_atk'),
-            "mag_atk": self.mage.get_stat('mag_atk'),
-            "speed": self.mage.get_stat('speed'),
-            "intelligence": self.mage.get_stat('intelligence'),
-            "id": self.mage.id,
-        }
-        return mage_data
+        return self.mage.to_dict()
 
     def update_power_label(self):
-        stat_values = {
-            'hp': self.mage.get_stat("health"),
-            'mana': self.mage.get_stat("mana"),
-            'stamina': self.mage.get_stat("stamina"),
-            'defense': self.mage.get_stat("defense"),
-            'phys_atk': self.mage.get_stat("phys_atk"),
-            'mag_atk': self.mage.get_stat("mag_atk"),
-            'speed': self.mage.get_stat("speed"),
-            'intelligence': self.mage.get_stat("intelligence"),
-        }
-
-        # Calculate power
-        power = calculate_power(
-            hp=stat_values['hp'],
-            mana=stat_values['mana'],
-            stamina=stat_values['stamina'],
-            defense=stat_values['defense'],
-            phys_atk=stat_values['phys_atk'],
-            mag_atk=stat_values['mag_atk'],
-            speed=stat_values['speed'],
-            intelligence=stat_values['intelligence']
-        )
-        self.power_label.config(text=f"Total Power: {power:.2f}")
+        text = f"Total Power: {self.mage.power:.2f}"
+        if text != self.power_text:
+            self.power_text = text
+            self.power_label.config(text=text)
 
     def override_value(self, var, entry, scale, stat, priority_value=None):
         try:
@@ -517,14 +676,16 @@ class StatsVisualizerForEdit:
 
 
 class MageEdit(MageCreator):
-    def __init__(self, parent, mage_data, on_close_callback=None):
+    def __init__(self, parent, mage_data, on_close_callback=None, repository=None):
 
         self.edit_window = tk.Toplevel(parent)
         self.current_mage = Mage()
 
-        super().__init__(self.edit_window)
+        super().__init__(self.edit_window, repository)
         self.current_mage.load_completely(mage_data)
         self.current_mage.id = mage_data['id']
+        # Saving checks nobody else changed the mage since this version was loaded
+        self.version = mage_data.get(VERSION_FIELD)
 
         # Define all the variables for stats in MageEdit
         self.power_var = tk.DoubleVar(value=self.current_mage.power)
@@ -538,7 +699,7 @@ class MageEdit(MageCreator):
         self.intelligence_var = tk.DoubleVar(value=self.current_mage.get_stat("intelligence"))
 
         self.edit_window.title("Mage Editor")
-        self.update_gui_from_mage(mage_data)
+        self.update_gui_from_mage()
 
         self.adjust_stats_button.destroy()
 
@@ -563,31 +724,25 @@ class MageEdit(MageCreator):
     def update_power_display(self, *args):
         self.power_str_var.set(f"{self.power_var.get():.2f}")
 
-    def update_gui_from_mage(self, mage_data):
-
-        self.name_var.set(mage_data['name'])
-        self.age_var.set(mage_data['age'])
-        self.description_var.set(mage_data['description'])
-        self.years_practicing_var.set(mage_data['years_practicing'])
-        self.personality_var.set(mage_data['personality'])
-        self.power_var.set(calculate_power(
-            mage_data['health'],
-            mage_data['mana'],
-            mage_data['stamina'],
-            mage_data['defense'],
-            mage_data['phys_atk'],
-            mage_data['mag_atk'],
-            mage_data['speed'],
-            mage_data['intelligence']
-        ))
-        self.health_var.set(mage_data['health'])
-        self.mana_var.set(mage_data['mana'])
-        self.stamina_var.set(mage_data['stamina'])
-        self.defense_var.set(mage_data['defense'])
-        self.phys_atk_var.set(mage_data['phys_atk'])
-        self.mag_atk_var.set(mage_data['mag_atk'])
-        self.speed_var.set(mage_data['speed'])
-        self.intelligence_var.set(mage_data['intelligence'])
+    def update_gui_from_mage(self, mage=None):
+        if mage is None:
+            mage = self.current_mage
+
+        # Called once per frame while sliders move, so only touch variables that changed
+        set_if_changed(self.name_var, mage.get_name())
+        set_if_changed(self.age_var, mage.get_age())
+        set_if_changed(self.description_var, mage.get_description())
+        set_if_changed(self.years_practicing_var, mage.get_years_practicing())
+        set_if_changed(self.personality_var, mage.get_personality())
+        set_if_changed(self.power_var, mage.power)
+        set_if_changed(self.health_var, mage.get_stat('health'))
+        set_if_changed(self.mana_var, mage.get_stat('mana'))
+        set_if_changed(self.stamina_var, mage.get_stat('stamina'))
+        set_if_changed(self.defense_var, mage.get_stat('defense'))
+        set_if_changed(self.phys_atk_var, mage.get_stat('phys_atk'))
+        set_if_changed(self.mag_atk_var, mage.get_stat('mag_atk'))
+        set_if_changed(self.speed_var, mage.get_stat('speed'))
+        set_if_changed(self.intelligence_var, mage.get_stat('intelligence'))
 
     def open_stats_visualizer(self):
         self.stats_visualizer = StatsVisualizerForEdit(
@@ -615,10 +770,44 @@ class MageEdit(MageCreator):
     def save_edited_mage(self):
         self.update_mage_from_gui()
         mage_data = self.current_mage.to_dict()
-        update_mage_in_cmd(mage_data)
+        self.save_button.config(state=tk.DISABLED)
+        self.io.submit(self.repository.update, mage_data, self.version, on_done=self.edit_saved,
+                       on_error=self.edit_failed)
 
+    def edit_saved(self, updated):
+        if not self.edit_window.winfo_exists():
+            return
+        if not updated:
+            from tkinter import messagebox
+            messagebox.showerror("Mage deleted", f"{self.current_mage.get_name()} was deleted elsewhere; "
+                                 "the edit was not saved.", parent=self.edit_window)
         self.on_close()
 
+    def edit_failed(self, error):
+        if not self.edit_window.winfo_exists():
+            return
+        self.save_button.config(state=tk.NORMAL)
+        from tkinter import messagebox
+        if not isinstance(error, VersionConflict):
+            messagebox.showerror("Save failed", f"Could not save the mage: {error}", parent=self.edit_window)
+            return
+        # Another window or process saved this mage first; never overwrite its changes
+        if messagebox.askyesno("Mage changed", f"{self.current_mage.get_name()} was changed elsewhere since "
+                               "this editor opened, so the edit was not saved.\n\nLoad the stored mage? "
+                               "Your unsaved changes will be lost.", parent=self.edit_window):
+            self.io.submit(self.repository.get, self.current_mage.id, on_done=self.reload_mage,
+                           on_error=self.edit_failed)
+
+    def reload_mage(self, mage_data):
+        if not self.edit_window.winfo_exists():
+            return
+        if mage_data is None:
+            self.edit_saved(False)
+            return
+        self.current_mage.load_completely(mage_data)
+        self.version = mage_data.get(VERSION_FIELD)
+        self.update_gui_from_mage()
+
     def on_close(self):
         if self.on_close_callback:
             self.on_close_callback()
@@ -628,16 +817,7 @@ class MageEdit(MageCreator):
         pass
 
     def open_stats_visualizer_from_edit(self):
-        mage_stats = {
-            "health": self.current_mage.get_stat("health"),
-            "mana": self.current_mage.get_stat("mana"),
-            "stamina": self.current_mage.get_stat("stamina"),
-            "defense": self.current_mage.get_stat("defense"),
-            "phys_atk": self.current_mage.get_stat("phys_atk"),
-            "mag_atk": self.current_mage.get_stat("mag_atk"),
-            "speed": self.current_mage.get_stat("speed"),
-            "intelligence": self.current_mage.get_stat("intelligence")
-        }
+        mage_stats = self.current_mage.to_dict()
 
         def update_callback(power):
             # This function will be called when the stats are adjusted in StatsVisualizer
@@ -654,22 +834,38 @@ class MageEdit(MageCreator):
 
 
 class MageDisplay:
-    def __init__(self, root):
+    PAGE_SIZE = 100  # Rows fetched from the repository per scroll step
+    SEARCH_DELAY_MS = 150  # Quiet time after a keystroke before the search runs
+    COLUMNS = [
+        ("name", "Name", 150),
+        ("age", "Age", 60),
+        ("description", "Description", 300),
+        ("years_practicing", "Years Practicing", 110),
+        ("personality", "Personality", 150),
+        ("power", "Power", 90),
+    ]
+
+    def __init__(self, root, repository=None):
         self.root = root
-        self.mage_widgets = []
+        self.repository = repository if repository is not None else get_repository()
+        self.io = get_io_worker(self.repository, root)
+        self.leaderboard = None  # Attached on the I/O thread the first time the window opens
+        self.leaderboard_pending = False
         self.mage_edit_windows = {}
         self.new_window = None
-
-    def clear_mage_widgets(self):
-        for widget in self.mage_widgets:
-            widget.destroy()
-        self.mage_widgets.clear()
-
-    def refresh_mages(self):
-        for widget in self.mage_widgets[6:]:
-            widget.destroy()
-        self.mage_widgets = self.mage_widgets[:6]
-        self.populate_mages()
+        self.sort_by_power = False  # Otherwise rows follow roster order
+        self.filters = []  # Ranges from the filter bar
+        self.search_text = ""
+        self.search_after = None
+        self.match_cache = None  # (generation, ids) of the current search/filter, kept by the I/O thread
+        self.tree = None
+        self.loaded = 0
+        self.match_offset = 0  # Position in match_cache of the next page, which skips rows that stopped matching
+        self.exhausted = False
+        self.page_pending = False
+        self.generation = 0  # Bumped on refresh so late pages from the worker are dropped
+        # Writes may happen on the I/O thread; handle their events on the Tk thread
+        self.change_listener = lambda change: self.io.call_soon(self.on_mage_change, change)
 
     def see_mages(self):
         # If the window doesn't exist or has been closed, recreate it
@@ -677,65 +873,391 @@ class MageDisplay:
             self.new_window = tk.Toplevel(self.root)
             self.new_window.title("Mages Overview")
             self.new_window.geometry("1000x600")
-
-            header_labels = ["Name", "Age", "Description", "Years Practicing", "Personality", "Power"]
-            for col, attribute in enumerate(header_labels):
-                header = ttk.Label(self.new_window, text=attribute, font=('Arial', 10, 'bold'))
-                header.grid(row=0, column=col, padx=30, pady=10)
-                self.mage_widgets.append(header)
+            self.new_window.rowconfigure(1, weight=1)
+            self.new_window.columnconfigure(0, weight=1)
+
+            self.search_text = ""
+            self.filters = []
+            filter_bar = ttk.Frame(self.new_window)
+            filter_bar.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=5)
+            filter_bar.columnconfigure(1, weight=1)
+            filter_bar.columnconfigure(3, weight=1)
+            ttk.Label(filter_bar, text="Search:").grid(row=0, column=0, padx=(0, 5))
+            self.search_var = tk.StringVar()
+            ttk.Entry(filter_bar, textvariable=self.search_var).grid(row=0, column=1, sticky="ew")
+            self.search_var.trace_add("write", self.on_search_typed)
+            ttk.Label(filter_bar, text="Filter:").grid(row=0, column=2, padx=(10, 5))
+            self.filter_var = tk.StringVar()
+            filter_entry = ttk.Entry(filter_bar, textvariable=self.filter_var)
+            filter_entry.grid(row=0, column=3, sticky="ew")
+            filter_entry.bind("<Return>", self.apply_filter)
+            ttk.Button(filter_bar, text="Apply", command=self.apply_filter).grid(row=0, column=4, padx=5)
+            ttk.Button(filter_bar, text="Clear", command=self.clear_filter).grid(row=0, column=5)
+
+            # A Treeview keeps one lightweight item per loaded mage instead of seven widgets
+            self.tree = ttk.Treeview(self.new_window, columns=[key for key, _, _ in self.COLUMNS],
+                                     show="headings", selectmode="browse")
+            for key, heading, width in self.COLUMNS:
+                self.tree.heading(key, text=heading)
+                self.tree.column(key, width=width, anchor="w")
+            self.tree.heading("power", command=self.toggle_power_sort)
+            self.update_power_heading()
+            self.tree.grid(row=1, column=0, sticky="nsew")
+
+            self.scrollbar = ttk.Scrollbar(self.new_window, orient="vertical", command=self.tree.yview)
+            self.scrollbar.grid(row=1, column=1, sticky="ns")
+            self.tree.configure(yscrollcommand=self.on_tree_scroll)
+
+            self.tree.bind("<Double-1>", self.on_row_activate)
+            self.tree.bind("<Return>", self.on_row_activate)
+
+            self.status_var = tk.StringVar()
+            ttk.Label(self.new_window, textvariable=self.status_var).grid(row=2, column=0, sticky="w", padx=10, pady=5)
+            ttk.Button(self.new_window, text="Edit", command=self.on_row_activate).grid(
+                row=2, column=0, columnspan=2, sticky="e", padx=10, pady=5)
+
+            # Edits and inserts anywhere in the app patch single rows through change events
+            self.repository.subscribe(self.change_listener)
+            self.new_window.bind("<Destroy>", self.on_window_destroy)
+
+            # Load the search index and its typo table before the first keystroke needs them
+            self.io.submit(lambda: get_search_index(self.repository).prepare_fuzzy())
+            # Power sorting stays off until the leaderboard is loaded or built
+            if self.leaderboard is None and not self.leaderboard_pending:
+                self.leaderboard_pending = True
+                self.io.submit(get_leaderboard, self.repository, on_done=self.leaderboard_ready,
+                               on_error=self.leaderboard_failed)
 
         self.refresh_mages()
 
-    def populate_mages(self):
-        mages = load_mages_from_cmd()
+    def on_window_destroy(self, event):
+        if event.widget is self.new_window:
+            self.repository.unsubscribe(self.change_listener)
+            if self.search_after is not None:
+                self.new_window.after_cancel(self.search_after)
+                self.search_after = None
+
+    def leaderboard_ready(self, leaderboard):
+        self.leaderboard = leaderboard
+        self.leaderboard_pending = False
+        if self.tree is not None and self.tree.winfo_exists():
+            self.update_power_heading()
+
+    def leaderboard_failed(self, error):
+        self.leaderboard_pending = False
+        self.show_load_error(error)
+
+    def toggle_power_sort(self):
+        if self.leaderboard is None:
+            return
+        self.sort_by_power = not self.sort_by_power
+        self.update_power_heading()
+        self.refresh_mages()
 
-        if not mages:
-            label = ttk.Label(self.new_window, text="No mages found.")
-            label.pack(pady=20)
-            self.mage_widgets.append(label)
+    def update_power_heading(self):
+        if self.leaderboard is None:
+            text = "Power (indexing...)"
+        else:
+            text = "Power \u25bc" if self.sort_by_power else "Power"
+        self.tree.heading("power", text=text)
+
+    def on_search_typed(self, *args):
+        # Debounce: only search once typing pauses for SEARCH_DELAY_MS
+        if self.search_after is not None:
+            self.new_window.after_cancel(self.search_after)
+        self.search_after = self.new_window.after(self.SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self.search_after = None
+        text = self.search_var.get().strip()
+        if text != self.search_text:
+            self.search_text = text
+            self.refresh_mages()
+
+    def apply_filter(self, event=None):
+        try:
+            self.filters = parse_predicates(self.filter_var.get())
+        except ValueError as error:
+            self.status_var.set(str(error))
             return
+        self.refresh_mages()
 
-        for row, mage in enumerate(mages, start=1):
-            # Create labels for each attribute
-            name_label = ttk.Label(self.new_window, text=mage["name"])
-            age_label = ttk.Label(self.new_window, text=mage["age"])
-            description_label = ttk.Label(self.new_window, text=mage["description"])
-            years_practicing_label = ttk.Label(self.new_window, text=mage["years_practicing"])
-            personality_label = ttk.Label(self.new_window, text=mage["personality"])
-            power_label = ttk.Label(self.new_window, text=round(
-                calculate_power(
-                    mage["health"], mage["mana"], mage["stamina"],
-                    mage["defense"], mage["phys_atk"], mage["mag_atk"],
-                    mage["speed"], mage["intelligence"]
-                ), 2)
-                                    )
-
-            name_label.grid(row=row, column=0, padx=30, pady=0)
-            age_label.grid(row=row, column=1, padx=5, pady=5)
-            description_label.grid(row=row, column=2, padx=5, pady=5)
-            years_practicing_label.grid(row=row, column=3, padx=5, pady=5)
-            personality_label.grid(row=row, column=4, padx=5, pady=5)
-            power_label.grid(row=row, column=5, padx=5, pady=5)
-
-            edit_button = ttk.Button(
-                self.new_window, text="Edit",
-                command=lambda m=mage: self.open_mage_edit(m)
-            )
-            edit_button.grid(row=row, column=6, padx=5, pady=5)
+    def clear_filter(self):
+        self.filter_var.set("")
+        self.filters = []
+        self.refresh_mages()
 
-            self.mage_widgets.extend([
-                name_label, age_label, description_label, years_practicing_label,
-                personality_label, power_label, edit_button
-            ])
+    def clear_rows(self):
+        # Pages still on their way belong to the old generation and are dropped
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.match_offset = 0
+        self.exhausted = False
+        self.page_pending = False
+        self.generation += 1
+
+    @trace.traced()
+    def refresh_mages(self):
+        self.clear_rows()
+        self.status_var.set("Loading mages...")
+        self.populate_mages()
+
+    def next_offset(self):
+        return self.match_offset if self.search_text or self.filters else self.loaded
+
+    @trace.traced()
+    def populate_mages(self):
+        """Fetch the next page of mages on the I/O thread and append it when it arrives."""
+        if self.exhausted or self.page_pending:
+            return
+        self.page_pending = True
+        offset = self.next_offset()
+        self.io.submit(self.fetch_page, offset, self.PAGE_SIZE, self.sort_by_power, self.search_text, self.filters,
+                       self.generation, on_done=lambda page, generation=self.generation: self.show_page(*page, generation),
+                       on_error=self.show_load_error)
+
+    def load_all(self):
+        """Reload every row now, fetching on the calling thread instead of the I/O worker.
+
+        For benchmarks and tests: the rows end up as scrolling to the end
+        would leave them, without waiting on the worker's poll interval.
+        """
+        self.clear_rows()
+        while not self.exhausted:
+            page = self.fetch_page(self.next_offset(), self.PAGE_SIZE, self.sort_by_power, self.search_text,
+                                   self.filters, self.generation)
+            self.show_page(*page, self.generation)
+
+    @trace.traced()
+    def fetch_page(self, offset, limit, by_power, search_text, filters, generation):
+        """Runs on the I/O thread; pages come off the indexes instead of a scan.
+
+        Returns ``(mages, fetched)``: the rows to show, and how many entries
+        of the source were read for them (rows dropped since the query ran
+        still count, so a short page means the source is used up).
+        """
+        if search_text or filters:
+            if self.match_cache is None or self.match_cache[0] != generation:
+                if search_text:
+                    # Best text matches first, narrowed by the stat filter
+                    ids = get_search_index(self.repository).search(search_text)
+                    if filters:
+                        allowed = set(get_stat_index(self.repository).query(filters))
+                        ids = [mage_id for mage_id in ids if mage_id in allowed]
+                else:
+                    ids = get_stat_index(self.repository).query(filters)
+                if by_power:
+                    ids.sort(key=lambda mage_id: -(self.leaderboard.power_of(mage_id) or 0.0))
+                self.match_cache = generation, ids
+            ids = self.match_cache[1][offset:offset + limit]
+            mages = (self.repository.get(mage_id) for mage_id in ids)
+            # Mages edited since the query may no longer match
+            return [mage for mage in mages if mage is not None and self.row_matches(mage, search_text, filters)], len(ids)
+        if not by_power:
+            mages = self.repository.page(offset, limit)
+            return mages, len(mages)
+        ids = self.leaderboard.ids(offset, limit)
+        mages = (self.repository.get(mage_id) for mage_id in ids)
+        return [mage for mage in mages if mage is not None], len(ids)
+
+    def show_load_error(self, error):
+        self.page_pending = False
+        self.exhausted = True
+        if self.tree.winfo_exists():
+            self.status_var.set(f"Could not load mages: {error}")
+
+    def show_page(self, mages, fetched, generation):
+        if generation != self.generation or not self.tree.winfo_exists():
+            return
+        self.page_pending = False
+        for mage in mages:
+            if not self.tree.exists(mage["id"]):
+                self.tree.insert("", tk.END, iid=mage["id"], values=self.row_values(mage))
+                self.loaded += 1
+        self.match_offset += fetched
+        # Judged on what was read, not what was shown: filtering can shorten a page that is not the last
+        self.exhausted = fetched < self.PAGE_SIZE
+        self.update_status()
+
+    def update_status(self):
+        noun = "matching mages" if self.search_text or self.filters else "mages"
+        if not self.loaded:
+            self.status_var.set(f"No {noun} found.")
+        elif self.exhausted:
+            self.status_var.set(f"{self.loaded} {noun}")
+        else:
+            self.status_var.set(f"Showing {self.loaded} {noun}, scroll for more")
+
+    @staticmethod
+    def row_values(mage):
+        power = calculate_power(*(mage[stat] for stat in STAT_FIELDS))
+        return (mage["name"], mage["age"], mage["description"], mage["years_practicing"], mage["personality"],
+                round(power, 2))
+
+    def on_tree_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Fetch the next page once the view nears the end of what is loaded
+        if float(last) > 0.9:
+            self.populate_mages()
+
+    def on_mage_change(self, change):
+        """Patch the one row affected by a repository write."""
+        if not self.tree.winfo_exists():
+            return
+        if change.kind == "reload":
+            self.refresh_mages()
+            return
+        if (self.search_text or self.filters) and change.kind != "delete":
+            self.place_filtered(change)
+        elif self.sort_by_power and change.kind != "delete":
+            self.place_by_rank(change)
+        elif change.kind == "insert":
+            # Rows not yet paged in will arrive with their page
+            if self.exhausted and not self.tree.exists(change.mage_id):
+                self.tree.insert("", tk.END, iid=change.mage_id, values=self.row_values(change.record))
+                self.loaded += 1
+        elif not self.tree.exists(change.mage_id):
+            return
+        elif change.kind == "update":
+            self.tree.item(change.mage_id, values=self.row_values(change.record))
+        elif change.kind == "delete":
+            self.tree.delete(change.mage_id)
+            self.loaded -= 1
+        self.update_status()
+
+    @staticmethod
+    def row_matches(mage, search_text, filters):
+        return matches(mage, filters) and (not search_text or record_matches(mage, search_text))
+
+    def place_filtered(self, change):
+        """Add, patch or drop the changed row depending on whether it still passes the search and filter."""
+        shown = self.tree.exists(change.mage_id)
+        if not self.row_matches(change.record, self.search_text, self.filters):
+            if shown:
+                self.tree.delete(change.mage_id)
+                self.loaded -= 1
+        elif shown:
+            self.tree.item(change.mage_id, values=self.row_values(change.record))
+            if self.sort_by_power:
+                self.tree.move(change.mage_id, "", self.power_position(change.mage_id))
+        elif self.exhausted:
+            position = self.power_position(change.mage_id) if self.sort_by_power else tk.END
+            self.tree.insert("", position, iid=change.mage_id, values=self.row_values(change.record))
+            self.loaded += 1
+        self.update_status()
+
+    def power_position(self, mage_id):
+        """Where ``mage_id`` goes among the other shown rows, which are sorted strongest first."""
+        rows = [row for row in self.tree.get_children() if row != mage_id]
+
+        def weakness(row):
+            return -(self.leaderboard.power_of(row) or 0.0)
+
+        return bisect.bisect_right(rows, weakness(mage_id), key=weakness)
+
+    def place_by_rank(self, change):
+        """Keep the loaded rows equal to the top of the leaderboard after a write."""
+        rank = self.leaderboard.rank(change.mage_id)
+        shown = self.tree.exists(change.mage_id)
+        if rank is not None and (self.exhausted or rank <= self.loaded):
+            if shown:
+                self.tree.item(change.mage_id, values=self.row_values(change.record))
+                self.tree.move(change.mage_id, "", rank - 1)
+            else:
+                self.tree.insert("", rank - 1, iid=change.mage_id, values=self.row_values(change.record))
+                self.loaded += 1
+        elif shown:
+            # Dropped below the loaded rows; it comes back with a later page
+            self.tree.delete(change.mage_id)
+            self.loaded -= 1
+        self.update_status()
+
+    def on_row_activate(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            mage = self.repository.get(selection[0])
+            if mage is not None:
+                self.open_mage_edit(mage)
 
     def open_mage_edit(self, mage):
         if mage["id"] in self.mage_edit_windows and self.mage_edit_windows[mage["id"]].edit_window.winfo_exists():
             self.mage_edit_windows[mage["id"]].edit_window.lift()
         else:
-            edit_window = MageEdit(self.new_window, mage, self.refresh_mages)
+            edit_window = MageEdit(self.new_window, mage, repository=self.repository)
             self.mage_edit_windows[mage["id"]] = edit_window
 
 
+class TraceStats:
+    """Live table of the spans and call counts recorded while tracing (MAGE_TRACE) is on."""
+    REFRESH_MS = 1000
+    COLUMNS = [
+        ("calls", "Calls", 80),
+        ("total", "Total ms", 90),
+        ("mean", "Mean ms", 90),
+        ("max", "Max ms", 90),
+    ]
+
+    def __init__(self, root):
+        self.window = tk.Toplevel(root)
+        self.window.title("Trace Stats")
+        self.window.geometry("700x450")
+        self.window.rowconfigure(0, weight=1)
+        self.window.columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.window, columns=[key for key, _, _ in self.COLUMNS])
+        self.tree.heading("#0", text="Span")
+        self.tree.column("#0", width=330)
+        for key, heading, width in self.COLUMNS:
+            self.tree.heading(key, text=heading)
+            self.tree.column(key, width=width, anchor="e")
+        self.tree.grid(row=0, column=0, columnspan=4, sticky="nsew", padx=10, pady=(10, 5))
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.status_var).grid(row=1, column=0, sticky="w", padx=10, pady=5)
+        ttk.Button(self.window, text="Refresh", command=self.refresh).grid(row=1, column=1, pady=5)
+        ttk.Button(self.window, text="Reset", command=self.reset).grid(row=1, column=2, padx=5, pady=5)
+        ttk.Button(self.window, text="Export Chrome Trace...", command=self.export).grid(
+            row=1, column=3, padx=(0, 10), pady=5)
+
+        self.refresh_after = None
+        self.window.bind("<Destroy>", self.on_window_destroy)
+        self.refresh()
+
+    def refresh(self):
+        if self.refresh_after is not None:
+            self.window.after_cancel(self.refresh_after)
+        rows, counters = trace.summary()
+        self.tree.delete(*self.tree.get_children())
+        for name, count, total, mean, longest in rows:
+            self.tree.insert("", tk.END, text=name, values=(count, f"{total:.2f}", f"{mean:.3f}", f"{longest:.3f}"))
+        for name, calls in counters.items():
+            self.tree.insert("", tk.END, text=f"{name} (calls)", values=(calls, "", "", ""))
+        self.refresh_after = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        trace.reset()
+        self.status_var.set("")
+        self.refresh()
+
+    def export(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".json",
+                                            initialfile="trace.json", filetypes=[("Trace JSON", "*.json")])
+        if not path:
+            return
+        try:
+            trace.export_chrome(path)
+        except OSError as error:
+            self.status_var.set(f"Could not export: {error}")
+        else:
+            self.status_var.set(f"Wrote {os.path.basename(path)}")
+
+    def on_window_destroy(self, event):
+        if event.widget is self.window and self.refresh_after is not None:
+            self.window.after_cancel(self.refresh_after)
+            self.refresh_after = None
+
+
 class MageInteractive:
     def __init__(self, root):
         self.root = root
@@ -751,6 +1273,9 @@ class MageInteractive:
         self.create_mage_button = ttk.Button(root, text="See Mages", command=self.open_mage_display)
         self.create_mage_button.pack(pady=20)
 
+        if trace.ENABLED:
+            ttk.Button(root, text="Trace Stats", command=self.open_trace_stats).pack(pady=20)
+
     def open_mage_creator(self):
         new_window = tk.Toplevel(self.root)
         MageCreator(new_window)
@@ -759,8 +1284,30 @@ class MageInteractive:
         mage_display = MageDisplay(self.root)
         mage_display.see_mages()
 
+    def open_trace_stats(self):
+        TraceStats(self.root)
+
+
+def report_first_window(root, path):
+    """Write the time the root window is first mapped to ``path``, then quit (for benchmarks.startup)."""
+    def mapped(event):
+        if event.widget is root:
+            with open(path, 'w') as file:
+                file.write(repr(time.time()))
+            root.after_idle(root.destroy)
+    root.bind("<Map>", mapped, add="+")
+
 
 if __name__ == '__main__':
     root = tk.Tk()
     app = MageInteractive(root)
-    root.mainloop()
+    if os.environ.get("MAGE_STARTUP_PROBE"):
+        report_first_window(root, os.environ["MAGE_STARTUP_PROBE"])
+    try:
+        root.mainloop()
+    finally:
+        for worker in _io_workers.values():
+            worker.close()
+        database.close()
+        if trace.EXPORT_PATH:
+            trace.export_chrome(trace.EXPORT_PATH)
@@ -1,4 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
+# One-folder build: a one-file EXE unpacks every library (NumPy included) to a
+# temporary directory on each launch, which dominated cold start. UPX is off
+# for the same reason; compressed libraries are decompressed on every load.
 
 
 a = Analysis(
@@ -6,7 +9,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # power.formula imports NumPy by name on first use, which the analysis cannot see
+    hiddenimports=['numpy'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -18,16 +22,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='main',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,8 +37,17 @@ exe = EXE(
     entitlements_file=None,
     icon=['ff.png'],
 )
-app = BUNDLE(
+coll = COLLECT(
     exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='main',
+)
+app = BUNDLE(
+    coll,
     name='main.app',
     icon='ff.png',
     bundle_identifier=None,
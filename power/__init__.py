@@ -0,0 +1,14 @@
+"""Non-GUI building blocks for the mage tools: the power formula, the Mage model, storage and roster access.
+
+Nothing in this package imports tkinter; see main.py for the GUI.
+"""
+
+__all__ = ["MageRepository", "VersionConflict", "open_repository"]
+
+
+def __getattr__(name):
+    # Imported on first use, so "import power.formula" does not load the storage layer
+    if name in __all__:
+        from power import repository
+        return getattr(repository, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
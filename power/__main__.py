@@ -0,0 +1,5 @@
+import sys
+
+from power.cli import main
+
+sys.exit(main())
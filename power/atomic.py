@@ -0,0 +1,27 @@
+"""Replacing files atomically, so readers and crashes never see half a file."""
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='w', **open_args):
+    """Open a temp file to write in place of ``path``; it replaces ``path`` when the block exits cleanly.
+
+    The temp file is a sibling named after this process, so concurrent
+    writers never share one, and it is fsynced before the rename, so after
+    a crash ``path`` holds either the old contents or the new ones. If the
+    block raises, the temp file is removed and ``path`` is left untouched.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode, **open_args) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,271 @@
+"""Versioned binary roster format, read through mmap without parsing.
+
+Layout (little-endian)::
+
+    header   64 bytes    magic, version, record count/size, section offsets
+    records  N * 156     uuid (16 bytes), the eight stats, age and
+                         years_practicing as float64, a flags word, the
+                         record version (uint64), and (offset, length)
+                         references into the string heap for name,
+                         description, personality and id text
+    index    N * 20      (uuid, row) pairs sorted by uuid, for lookups
+    heap                 UTF-8 string data
+
+The flags word records which numeric fields were integers in JSON and
+whether the id is not a canonical UUID string (its text then lives in the
+heap) or the record had a ``version``, so JSON -> binary -> JSON
+round-trips losslessly.
+"""
+import bisect
+import functools
+import mmap
+import struct
+import uuid
+
+from power.atomic import atomic_write
+from power.formats import BINARY_EXTENSION, iter_records
+from power.formula import calculate_power, calculate_power_batch, np
+from power.repository import write_snapshot
+from power.schema import INFO_FIELDS, STAT_FIELDS, VERSION_FIELD
+
+MAGIC = b"MAGEROST"
+VERSION = 2  # 2 added the record version; version 1 files are rejected
+EXTENSION = BINARY_EXTENSION
+
+NUMERIC_FIELDS = STAT_FIELDS + ("age", "years_practicing")
+STRING_FIELDS = ("name", "description", "personality")
+
+# magic, version, reserved, record size, record count, records offset, index offset, index count,
+# heap offset, heap size
+_HEADER = struct.Struct("<8sHHIQQQQQQ")
+_RECORD = struct.Struct("<16s10dIQ" + "QI" * 4)
+_INDEX = struct.Struct("<16sI")
+_ID_TEXT = 1 << len(NUMERIC_FIELDS)  # flag: id is not a canonical UUID, text is in the heap
+_HAS_VERSION = _ID_TEXT << 1  # flag: the record had a version field
+
+
+@functools.cache
+def record_dtype():
+    """The NumPy structured dtype of one record; built on first use so importing this module skips NumPy."""
+    dtype = np.dtype(
+        [("uuid", "V16")] + [(field, "<f8") for field in NUMERIC_FIELDS] + [("flags", "<u4"), (VERSION_FIELD, "<u8")]
+        + [(f"{field}_ref", [("offset", "<u8"), ("length", "<u4")]) for field in STRING_FIELDS + ("id",)])
+    assert dtype.itemsize == _RECORD.size
+    return dtype
+
+
+class RosterFileError(ValueError):
+    """The file is not a binary roster this version can read."""
+
+
+def _id_bytes(mage_id):
+    try:
+        parsed = uuid.UUID(mage_id)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    return parsed.bytes if str(parsed) == mage_id else None
+
+
+def write_binary(records, path):
+    """Write mage records (any iterable of ``Mage.to_dict`` dicts) to ``path``.
+
+    The file is written with ``atomic_write``. Records must
+    have exactly the ``Mage.to_dict`` fields with numeric stats, plus an
+    optional non-negative integer ``version``, which is kept.
+    """
+    heap = bytearray()
+    index = []
+
+    def store(text):
+        data = text.encode('utf-8')
+        heap.extend(data)
+        return len(heap) - len(data), len(data)
+
+    with atomic_write(path, 'wb') as file:
+        file.write(bytes(_HEADER.size))
+        count = 0
+        for record in records:
+            unknown = record.keys() - set(NUMERIC_FIELDS) - set(STRING_FIELDS) - {"id", VERSION_FIELD}
+            if unknown:
+                raise ValueError(f"mage {record.get('id')!r} has fields the binary format cannot store: {unknown}")
+
+            flags = 0
+            numbers = []
+            for bit, field in enumerate(NUMERIC_FIELDS):
+                value = record[field]
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"mage {record['id']!r}: {field} is not a number")
+                if isinstance(value, int):
+                    flags |= 1 << bit
+                numbers.append(float(value))
+
+            version = record.get(VERSION_FIELD)
+            if version is not None:
+                if isinstance(version, bool) or not isinstance(version, int) or version < 0:
+                    raise ValueError(f"mage {record['id']!r}: {VERSION_FIELD} is not a non-negative integer")
+                flags |= _HAS_VERSION
+
+            refs = [store(record[field]) for field in STRING_FIELDS]
+            id_bytes = _id_bytes(record["id"])
+            if id_bytes is None:
+                flags |= _ID_TEXT
+                id_bytes = bytes(16)
+                refs.append(store(str(record["id"])))
+            else:
+                refs.append((0, 0))
+
+            file.write(_RECORD.pack(id_bytes, *numbers, flags, version or 0, *(part for ref in refs for part in ref)))
+            index.append((id_bytes if not flags & _ID_TEXT else None, count))
+            count += 1
+
+        records_offset = _HEADER.size
+        index_offset = records_offset + count * _RECORD.size
+        # Only canonical UUIDs are indexed; text ids fall back to a scan
+        entries = sorted((key, row) for key, row in index if key is not None)
+        for key, row in entries:
+            file.write(_INDEX.pack(key, row))
+        heap_offset = index_offset + len(entries) * _INDEX.size
+        file.write(heap)
+
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, _RECORD.size, count, records_offset, index_offset, len(entries),
+                                heap_offset, len(heap)))
+    return count
+
+
+class _IndexKeys:
+    """Sequence view of the sorted uuid keys, for bisect over the mapped index."""
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        start = self._offset + position * _INDEX.size
+        return self._buffer[start:start + 16]
+
+
+class BinaryRoster:
+    """Read-only, memory-mapped view of a binary roster file.
+
+    Opening only maps the file and reads the header. ``records()`` exposes
+    the record block as a NumPy structured array over the mapping (no copy),
+    so ``powers()`` scores the roster straight from the page cache. Mage
+    dicts are decoded on demand by ``record(row)``, ``get(id)`` and
+    iteration. Close (or leave the ``with`` block) only after dropping any
+    arrays obtained from it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise RosterFileError(f"{path} is empty") from None
+
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise RosterFileError(f"{path} is not a binary mage roster")
+        (magic, version, _, record_size, self._count, self._records_offset, self._index_offset, self._index_count,
+         self._heap_offset, _) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise RosterFileError(f"{path} is not a binary mage roster")
+        if version != VERSION or record_size != _RECORD.size:
+            self.close()
+            raise RosterFileError(f"{path} uses unsupported roster format version {version}")
+        self._keys = _IndexKeys(self._map, self._index_offset, self._index_count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    # Columnar access
+
+    def records(self):
+        """Return the record block as a zero-copy NumPy structured array."""
+        if np is None:
+            raise RuntimeError("NumPy is required for columnar access to binary rosters")
+        return np.frombuffer(self._map, dtype=record_dtype(), count=self._count, offset=self._records_offset)
+
+    def stat_column(self, field):
+        """Return one numeric column (a strided view into the mapping)."""
+        return self.records()[field]
+
+    def powers(self):
+        """Power of every mage, in file order."""
+        if np is not None:
+            return calculate_power_batch(self.records())
+        return [calculate_power(*(self._unpack(row)[1:9])) for row in range(self._count)]
+
+    # Record access
+
+    def _unpack(self, row):
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        return _RECORD.unpack_from(self._map, self._records_offset + row * _RECORD.size)
+
+    def _text(self, offset, length):
+        start = self._heap_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def record(self, row):
+        """Decode row ``row`` into a ``Mage.to_dict`` record."""
+        fields = self._unpack(row)
+        id_bytes, numbers, flags, version, refs = fields[0], fields[1:11], fields[11], fields[12], fields[13:]
+        texts = [self._text(refs[i], refs[i + 1]) for i in range(0, len(refs), 2)]
+
+        record = {"id": texts[3] if flags & _ID_TEXT else str(uuid.UUID(bytes=id_bytes))}
+        values = dict(zip(STRING_FIELDS, texts))
+        values.update((field, int(value) if flags & (1 << bit) else value)
+                      for bit, (field, value) in enumerate(zip(NUMERIC_FIELDS, numbers)))
+        record.update((field, values[field]) for field in INFO_FIELDS + STAT_FIELDS)
+        if flags & _HAS_VERSION:
+            record[VERSION_FIELD] = version
+        return record
+
+    def __iter__(self):
+        return (self.record(row) for row in range(self._count))
+
+    def row_of(self, mage_id):
+        """Return the row of ``mage_id`` (binary search on the uuid index), or None."""
+        key = _id_bytes(mage_id)
+        if key is None:
+            return next((row for row in range(self._count) if self.record(row)["id"] == mage_id), None)
+        position = bisect.bisect_left(self._keys, key)
+        if position < self._index_count and self._keys[position] == key:
+            return struct.unpack_from("<I", self._map, self._index_offset + position * _INDEX.size + 16)[0]
+        return None
+
+    def get(self, mage_id, default=None):
+        row = self.row_of(mage_id)
+        return default if row is None else self.record(row)
+
+
+# Conversion to and from the JSON roster
+
+def json_to_binary(json_path, binary_path):
+    """Convert a ``cmd.json`` roster to the binary format, streaming; returns the record count."""
+    return write_binary(iter_records(json_path, "json"), binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    """Write a binary roster back out as ``cmd.json``-style JSON, one record at a time."""
+    with BinaryRoster(binary_path) as roster:
+        # Same bytes as the CMD writes, so a CMD roster round-trips byte for byte
+        write_snapshot(json_path, (roster.record(row) for row in range(len(roster))))
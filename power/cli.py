@@ -0,0 +1,279 @@
+"""Headless roster scoring: ``python -m power rank|stats|convert ROSTER``.
+
+Records are streamed from the roster and scored in fixed-size chunks, so
+memory stays bounded by the chunk size, ``--top``, ``--sample`` and the
+number of histogram bins rather than by the roster size. Nothing here
+imports tkinter.
+"""
+import argparse
+import heapq
+import json
+import math
+import operator
+import random
+import re
+import sys
+from itertools import islice
+
+from power.formats import BINARY_EXTENSION, FORMATS, detect_format, iter_records
+from power.formula import calculate_power_batch
+from power.schema import FIELDS, STAT_FIELDS
+
+CHUNK_SIZE = 65536
+
+_OPERATORS = {
+    "<=": operator.le, ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, ">": operator.gt,
+}
+_FILTER = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$")
+_NUMERIC = set(FIELDS) - {"id", "name", "description", "personality"} | {"power"}
+
+
+class Filter:
+    """Predicate over (record, power); a plain object so it can be sent to worker processes."""
+
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def __call__(self, record, power):
+        actual = power if self.field == "power" else record[self.field]
+        return _OPERATORS[self.op](actual, self.value)
+
+
+def parse_filter(text):
+    """Turn ``"intelligence>150"`` into a Filter."""
+    match = _FILTER.match(text)
+    if not match or match.group(1) not in set(FIELDS) | {"power"}:
+        raise argparse.ArgumentTypeError(f"invalid filter {text!r}; expected FIELD OP VALUE, e.g. speed>=150")
+    field, op, value = match.groups()
+    return Filter(field, op, float(value) if field in _NUMERIC else value)
+
+
+def scored(records, filters=()):
+    """Yield ``(power, record)`` for every record that passes all filters."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, CHUNK_SIZE))
+        if not chunk:
+            return
+        powers = calculate_power_batch({stat: [record[stat] for record in chunk] for stat in STAT_FIELDS})
+        for record, power in zip(chunk, powers):
+            power = float(power)
+            if all(keep(record, power) for keep in filters):
+                yield power, record
+
+
+def top_k(pairs, k):
+    """Return the ``k`` highest-power ``(power, record)`` pairs, strongest first."""
+    # The counter breaks power ties in file order and keeps records out of comparisons.
+    heap = heapq.nlargest(k, ((power, -index, record) for index, (power, record) in enumerate(pairs)))
+    return [(power, record) for power, _, record in heap]
+
+
+class PowerStats:
+    """Single-pass summary of a power distribution in bounded memory.
+
+    Count, mean, standard deviation, min and max are exact. Percentiles come
+    from a uniform reservoir sample (exact while the count fits in it). The
+    histogram uses fixed-width bins and stores only the non-empty ones.
+    """
+
+    def __init__(self, sample_size=100_000, bin_width=10.0, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sample_size = sample_size
+        self.sample = []
+        self.bin_width = bin_width
+        self.bins = {}
+        self._random = random.Random(seed)
+
+    def add(self, power):
+        self.count += 1
+        delta = power - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (power - self.mean)
+        self.min = min(self.min, power)
+        self.max = max(self.max, power)
+
+        if len(self.sample) < self.sample_size:
+            self.sample.append(power)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self.sample_size:
+                self.sample[slot] = power
+
+        bin_index = math.floor(power / self.bin_width)
+        self.bins[bin_index] = self.bins.get(bin_index, 0) + 1
+
+    def merge(self, other):
+        """Fold in the summary of a disjoint set of powers, e.g. one computed in another process."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        # Chan et al.'s pairwise update for the mean and sum of squared deviations
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        if len(self.sample) + len(other.sample) <= self.sample_size:
+            self.sample.extend(other.sample)
+        else:
+            # Each slot of the merged sample comes from either side in proportion to its count
+            from_self = sum(self._random.random() * total < self.count for _ in range(self.sample_size))
+            from_self = min(from_self, len(self.sample))
+            from_other = min(self.sample_size - from_self, len(other.sample))
+            self.sample = self._random.sample(self.sample, from_self) + self._random.sample(other.sample, from_other)
+        self.count = total
+
+        for bin_index, count in other.bins.items():
+            self.bins[bin_index] = self.bins.get(bin_index, 0) + count
+
+    @property
+    def stdev(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def percentiles(self, points):
+        ordered = sorted(self.sample)
+        result = {}
+        for point in points:
+            if not ordered:
+                result[point] = None
+                continue
+            # Linear interpolation between closest ranks
+            position = (len(ordered) - 1) * point / 100
+            low = math.floor(position)
+            high = min(low + 1, len(ordered) - 1)
+            result[point] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+        return result
+
+    def histogram(self):
+        return [(index * self.bin_width, (index + 1) * self.bin_width, self.bins[index])
+                for index in sorted(self.bins)]
+
+
+# Commands
+
+def _parallel(args):
+    """Whether to score across processes; only whole JSON/JSONL files can be split."""
+    if args.workers == 1 or args.roster == "-":
+        return False
+    return (args.format or detect_format(args.roster)) in ("json", "jsonl")
+
+
+def command_rank(args, out):
+    if _parallel(args):
+        from power.parallel import score_parallel
+        ranked, _ = score_parallel(args.roster, args.format, args.workers or None, args.where, top=args.top)
+    else:
+        ranked = top_k(scored(iter_records(args.roster, args.format), args.where), args.top)
+    if args.json:
+        json.dump([{"rank": rank, "power": power, **record} for rank, (power, record) in enumerate(ranked, 1)],
+                  out, indent=2)
+        out.write("\n")
+        return
+    out.write(f"{'rank':>6}  {'power':>12}  {'id':<36}  name\n")
+    for rank, (power, record) in enumerate(ranked, start=1):
+        out.write(f"{rank:>6}  {power:>12.2f}  {record.get('id', ''):<36}  {record.get('name', '')}\n")
+
+
+def command_stats(args, out):
+    if _parallel(args):
+        from power.parallel import score_parallel
+        _, stats = score_parallel(args.roster, args.format, args.workers or None, args.where, top=0,
+                                  sample_size=args.sample, bin_width=args.bin_width)
+    else:
+        stats = PowerStats(sample_size=args.sample, bin_width=args.bin_width)
+        for power, _ in scored(iter_records(args.roster, args.format), args.where):
+            stats.add(power)
+
+    summary = {
+        "count": stats.count,
+        "mean": stats.mean if stats.count else None,
+        "stdev": stats.stdev,
+        "min": stats.min if stats.count else None,
+        "max": stats.max if stats.count else None,
+        "percentiles": stats.percentiles(args.percentiles),
+        "histogram": stats.histogram() if args.histogram else None,
+    }
+    if args.json:
+        json.dump(summary, out, indent=2)
+        out.write("\n")
+        return
+
+    out.write(f"count   {stats.count}\n")
+    if not stats.count:
+        return
+    out.write(f"mean    {stats.mean:.2f}\nstdev   {stats.stdev:.2f}\nmin     {stats.min:.2f}\nmax     {stats.max:.2f}\n")
+    for point, value in summary["percentiles"].items():
+        out.write(f"p{point:<6g} {value:.2f}\n")
+    if args.histogram:
+        widest = max(count for _, _, count in summary["histogram"])
+        for low, high, count in summary["histogram"]:
+            bar = "#" * max(1, round(40 * count / widest))
+            out.write(f"[{low:>10.1f}, {high:>10.1f})  {count:>10}  {bar}\n")
+
+
+def command_convert(args, out):
+    from power.binary import binary_to_json, write_binary  # Only converting needs the binary format
+
+    if args.target.endswith(BINARY_EXTENSION):
+        count = write_binary(iter_records(args.roster, args.format), args.target)
+    else:
+        if (args.format or detect_format(args.roster)) != "binary":
+            raise ValueError("convert writes .mroster files, or reads one and writes JSON")
+        binary_to_json(args.roster, args.target)
+        count = None
+    out.write(f"wrote {args.target}" + (f" ({count} mages)\n" if count is not None else "\n"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m power", description="Score and rank mage rosters without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("roster", help="roster file (.json, .jsonl or .csv), or - for stdin")
+        command.add_argument("--format", choices=FORMATS, help="roster format (default: from the file extension)")
+        command.add_argument("--where", action="append", type=parse_filter, default=[], metavar="FILTER",
+                             help="keep mages matching FIELD OP VALUE, e.g. 'speed>=150'; repeatable")
+        command.add_argument("--json", action="store_true", help="emit JSON instead of text")
+        command.add_argument("--workers", type=int, default=1, metavar="N",
+                             help="score JSON/JSONL files in N processes; 0 uses every core (default: 1)")
+
+    rank = commands.add_parser("rank", help="list the strongest mages")
+    add_common(rank)
+    rank.add_argument("--top", type=int, default=10, help="number of mages to list (default: 10)")
+    rank.set_defaults(handler=command_rank)
+
+    stats = commands.add_parser("stats", help="summarize the power distribution")
+    add_common(stats)
+    stats.add_argument("--percentiles", type=lambda text: [float(p) for p in text.split(",")],
+                       default=[50.0, 90.0, 99.0], help="comma-separated percentiles (default: 50,90,99)")
+    stats.add_argument("--histogram", action="store_true", help="include a power histogram")
+    stats.add_argument("--bin-width", type=float, default=10.0, help="histogram bin width (default: 10)")
+    stats.add_argument("--sample", type=int, default=100_000,
+                       help="reservoir size for percentile estimates (default: 100000)")
+    stats.set_defaults(handler=command_stats)
+
+    convert = commands.add_parser("convert", help="convert between JSON/JSONL/CSV and the binary .mroster format")
+    convert.add_argument("roster", help="roster to read")
+    convert.add_argument("target", help=f"file to write; {BINARY_EXTENSION} for binary, otherwise JSON")
+    convert.add_argument("--format", choices=FORMATS, help="format of ROSTER (default: from the file extension)")
+    convert.set_defaults(handler=command_convert)
+    return parser
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args, out or sys.stdout)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,104 @@
+"""The central mage database (CMD) shared by the GUI windows, and its indexes.
+
+``CMD_FILENAME`` and ``STORAGE_BACKEND`` pick the file and backend; the
+repository is opened on first use, and each derived index (leaderboard,
+stat ranges, full-text search) is built the first time a window asks for
+it, so importing this module touches neither the file nor the indexes.
+"""
+import os
+
+from power.repository import open_repository
+from power.trace import traced
+
+CMD_FILENAME = "cmd.json"  # The central mage database
+STORAGE_BACKEND = os.environ.get("MAGE_STORAGE", "json")  # "json", "journal" or "sqlite"
+
+_repository = None
+
+
+def get_repository():
+    """Return the shared repository backing the central mage database."""
+    global _repository
+    if _repository is None or _repository.path != CMD_FILENAME:
+        _repository = open_repository(CMD_FILENAME, STORAGE_BACKEND)
+    return _repository
+
+
+_leaderboards = {}
+
+
+def get_leaderboard(repository):
+    """Return the power leaderboard following ``repository``, loading or building it on first use."""
+    board = _leaderboards.get(repository)
+    if board is None:
+        from power.leaderboard import Leaderboard
+        board = _leaderboards[repository] = Leaderboard.attach(repository)
+    return board
+
+
+_stat_indexes = {}
+
+
+def get_stat_index(repository):
+    """Return the stat range index following ``repository``, building it on first use."""
+    index = _stat_indexes.get(repository)
+    if index is None:
+        from power.statindex import StatIndex
+        index = _stat_indexes[repository] = StatIndex.attach(repository)
+    return index
+
+
+_search_indexes = {}
+
+
+def get_search_index(repository):
+    """Return the full-text index following ``repository``, loading or building it on first use."""
+    index = _search_indexes.get(repository)
+    if index is None:
+        from power.search import SearchIndex
+        index = _search_indexes[repository] = SearchIndex.attach(repository)
+    return index
+
+
+def close():
+    """Flush and close the repository and the indexes following it, if any were opened."""
+    global _repository
+    if _repository is not None:
+        _repository.close()
+        _repository = None
+    for index in (*_leaderboards.values(), *_stat_indexes.values(), *_search_indexes.values()):
+        index.close()
+    _leaderboards.clear()
+    _stat_indexes.clear()
+    _search_indexes.clear()
+
+
+@traced()
+def load_mages_from_cmd():
+    return get_repository().all()
+
+
+def iter_mages_from_cmd():
+    """Iterate over the CMD's mage records through the configured backend.
+
+    Unlike load_mages_from_cmd this never builds a list of the roster: the
+    SQLite backend streams it a batch at a time, and the in-memory backends
+    hand out the records they already hold.
+    """
+    return get_repository().iter()
+
+
+@traced()
+def save_mage_to_cmd(mage_data):
+    get_repository().upsert(mage_data)
+
+
+@traced()
+def update_mage_in_cmd(updated_mage_data, expected_version=None):
+    """Replace a stored mage; returns False if its id is unknown.
+
+    Pass the ``version`` of the record the edit started from as
+    ``expected_version`` to refuse the update (VersionConflict) when another
+    window or process has changed the mage since.
+    """
+    return get_repository().update(updated_mage_data, expected_version)
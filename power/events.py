@@ -0,0 +1,90 @@
+import json
+from collections import namedtuple
+
+# kind is "insert", "update", "delete" or "reload"; record is None for deletes, and
+# both mage_id and record are None for reloads (the whole roster was re-read).
+MageChange = namedtuple("MageChange", ["kind", "mage_id", "record"])
+
+
+class ChangeNotifier:
+    """Mixin that lets views subscribe to per-mage change events.
+
+    Callbacks are invoked synchronously, in the writing thread, with a
+    ``MageChange`` after each successful write.
+    """
+
+    _subscribers = ()
+
+    def subscribe(self, callback):
+        if not self._subscribers:
+            self._subscribers = []
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, kind, mage_id, record=None):
+        change = MageChange(kind, mage_id, record)
+        for callback in list(self._subscribers):
+            callback(change)
+
+
+def comparable_stamp(stamp):
+    """``stamp`` as it reads back from a saved index, where JSON has turned tuples into lists."""
+    return json.loads(json.dumps(stamp))
+
+
+class ChangeFollower:
+    """Mixin for indexes derived from a repository and kept in step with its change events.
+
+    Subclasses implement ``rebuild(records)``, ``set(record)`` and
+    ``discard(mage_id)``. Indexes saved next to the roster also set
+    ``SUFFIX`` (their file name suffix) and implement ``save(stamp)`` and
+    ``load(stamp)``: ``attach`` then reuses a saved index whose stamp still
+    matches the repository instead of rebuilding, and ``close`` saves it.
+    """
+
+    SUFFIX = None
+    _repository = None
+
+    @classmethod
+    def attach(cls, repository, path=None):
+        """Build (or load) the index for ``repository`` and follow its writes."""
+        index = cls() if cls.SUFFIX is None else cls(path or f"{repository.path}{cls.SUFFIX}")
+        # Reading the stamp first lets the repository do its initial load before we subscribe
+        stamp = repository.stamp()
+        index._repository = repository
+        repository.subscribe(index._on_change)
+        if not index.load(stamp):
+            index.rebuild(repository.all())
+        return index
+
+    def close(self):
+        """Stop following the repository, saving the index if it is saved at all.
+
+        Call this after the repository is closed, so the saved stamp matches
+        what the repository left on disk.
+        """
+        if self._repository is None:
+            return
+        self._repository.unsubscribe(self._on_change)
+        if self.SUFFIX is not None:
+            self.save(self._repository.stamp())
+        self._repository = None
+
+    def load(self, stamp):
+        return False
+
+    def apply(self, record):
+        """Bring the index up to date with one inserted or updated record."""
+        self.set(record)
+
+    def _on_change(self, change):
+        if change.kind == "reload":
+            self.rebuild(self._repository.all())
+        elif change.kind == "delete":
+            self.discard(change.mage_id)
+        else:
+            self.apply(change.record)
@@ -0,0 +1,204 @@
+"""Readers that stream mage records out of roster files one at a time."""
+
+import codecs
+import csv
+import json
+import os
+import re
+import sys
+
+FORMATS = ("json", "jsonl", "csv", "binary")
+BINARY_EXTENSION = ".mroster"
+_EXTENSIONS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", BINARY_EXTENSION: "binary"}
+_TEXT_FIELDS = {"id", "name", "description", "personality"}
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class RosterFormatError(ValueError):
+    """A roster file could not be parsed; ``offset`` is the byte position of the problem."""
+
+    def __init__(self, message, offset):
+        super().__init__(f"{message} at byte {offset}")
+        self.offset = offset
+
+
+def detect_format(path):
+    fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the roster format of {path!r}; pass it explicitly")
+    return fmt
+
+
+def _open(path, binary=False):
+    if path == "-":
+        return sys.stdin.buffer if binary else sys.stdin
+    if binary:
+        return open(path, 'rb')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def iter_json_array(file, chunk_size=1 << 16, max_record_size=1 << 24):
+    """Yield the objects of a top-level JSON array from a binary file, one at a time.
+
+    The file is decoded in ``chunk_size`` pieces and consumed text is
+    dropped as parsing moves on, so memory holds roughly one chunk plus one
+    record instead of the whole text and object graph. An empty file is an
+    empty roster. Anything else that is not an array of objects raises
+    RosterFormatError with the byte offset of the offending record.
+    """
+    for _, record in _iter_array(file, 0, False, chunk_size, max_record_size):
+        yield record
+
+
+def iter_json_elements(file, offset, chunk_size=1 << 16, max_record_size=1 << 24):
+    """Yield ``(byte offset, record)`` for array elements, starting mid-array.
+
+    ``file`` must be positioned at byte ``offset``, the opening brace of an
+    element of a top-level JSON array; iteration runs to the closing ``]``.
+    Used to parse one byte range of a roster on its own.
+    """
+    return _iter_array(file, offset, True, chunk_size, max_record_size)
+
+
+def _iter_array(file, base, inside, chunk_size, max_record_size):
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    pos = 0
+    # base is the byte offset of buffer[0] in the file; buffer[:mark] is mark_bytes long
+    mark = mark_bytes = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, base, mark, mark_bytes, eof
+        if pos > chunk_size:
+            base = offset()
+            buffer = buffer[pos:]
+            pos = mark = mark_bytes = 0
+        data = file.read(chunk_size)
+        eof = not data
+        buffer += utf8.decode(data, final=eof)
+        return not eof
+
+    def offset():
+        # Only encode the text consumed since the last call; pos never moves back
+        nonlocal mark, mark_bytes
+        mark_bytes += len(buffer[mark:pos].encode('utf-8'))
+        mark = pos
+        return base + mark_bytes
+
+    def next_char():
+        # Skip whitespace and return the next character, or "" at end of file
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                return ""
+
+    if not inside:
+        char = next_char()
+        if not char:
+            return
+        if char != "[":
+            raise RosterFormatError("expected '[' starting the roster", offset())
+        pos += 1
+
+    char = next_char()
+    while char != "]":
+        if char != "{":
+            raise RosterFormatError("expected a mage object", offset())
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as error:
+                # Usually the record just continues in the next chunk
+                if eof or len(buffer) - pos > max_record_size:
+                    raise RosterFormatError(f"malformed mage record ({error.msg})", offset()) from None
+                read_more()
+        start = offset()
+        pos = end
+        yield start, record
+
+        char = next_char()
+        if char == ",":
+            pos += 1
+            char = next_char()
+            if char == "]":
+                raise RosterFormatError("trailing comma", offset())
+        elif char != "]":
+            raise RosterFormatError("expected ',' or ']' after a mage record", offset())
+    pos += 1
+
+    if next_char():
+        raise RosterFormatError("unexpected data after the roster", offset())
+
+
+def load_json_roster(path):
+    """Return every record of a JSON roster file, parsed in one go.
+
+    About twice as fast as streaming with ``iter_records``, at the cost
+    of holding the whole text and object graph in memory; use it to load a
+    roster that is kept in memory anyway. A malformed file is re-read with
+    the streaming parser, so it raises the same RosterFormatError with the
+    byte offset of the problem.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    try:
+        text = data.decode('utf-8')
+        records = json.loads(text) if text.strip() else []
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        records = None
+    if isinstance(records, list) and all(isinstance(record, dict) for record in records):
+        return records
+    with open(path, 'rb') as file:
+        return list(iter_json_array(file))
+
+
+def _iter_json(file):
+    yield from iter_json_array(file)
+
+
+def _iter_jsonl(file):
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ValueError(f"line {line_number}: {error}") from None
+
+
+def _iter_csv(file):
+    for row in csv.DictReader(file):
+        yield {field: value if field in _TEXT_FIELDS else float(value) for field, value in row.items()}
+
+
+_READERS = {"json": _iter_json, "jsonl": _iter_jsonl, "csv": _iter_csv}
+
+
+def iter_records(path, fmt=None):
+    """Yield mage records from ``path`` ("-" for stdin) in file order.
+
+    ``fmt`` is one of FORMATS and defaults to the file extension. JSON
+    arrays are parsed incrementally, JSONL and CSV read a line at a time and
+    binary rosters (see power.binary) are decoded from a memory map. CSV
+    needs a header row naming the ``Mage.to_dict`` fields, and its numeric
+    columns come back as floats.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "binary":
+        from power.binary import BinaryRoster
+        with BinaryRoster(path) as roster:
+            yield from roster
+        return
+
+    file = _open(path, binary=fmt == "json")
+    try:
+        yield from _READERS[fmt](file)
+    finally:
+        if file not in (sys.stdin, sys.stdin.buffer):
+            file.close()
+
@@ -0,0 +1,250 @@
+import importlib
+import importlib.util
+import math
+import threading
+import types
+
+from power.schema import STAT_FIELDS
+from power.trace import counted, traced
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that is only imported when one of its attributes is first used."""
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)  # Later lookups are plain module attribute reads
+        return getattr(module, attribute)
+
+
+# NumPy is optional; batch scoring falls back to pure Python. Importing it costs
+# more than the rest of the app put together, so it waits for the first batch.
+np = _LazyModule("numpy") if importlib.util.find_spec("numpy") is not None else None
+
+# calculate_power's three exponentials rewritten as exp(k * x).
+_LN_SPEED = math.log(1.5) / 100         # 1.5 ** (speed / 100 - 1) == exp(_LN_SPEED * (speed - 100))
+_LN_STAMINA = math.log(1.1) / 100       # 1.1 ** (stamina / 100)    == exp(_LN_STAMINA * stamina)
+_LN_INTELLIGENCE = math.log(2) / 20     # 2 ** ((int - 100) / 20)   == exp(_LN_INTELLIGENCE * (int - 100))
+
+
+@counted("calculate_power")
+def calculate_power(hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
+    unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * (1.5 ** ((speed / 100) - 1))
+    unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * (1.1 ** (stamina / 100))
+    power = (unified2 * (2 ** ((intelligence - 100) / 20)) - 1) / 10
+    return power
+
+
+# calculate_power split into its three exponential factors and the cheap
+# combining step, for callers that cache factors across stat changes. The
+# operations match calculate_power exactly, so results are bit-for-bit equal.
+
+def speed_factor(speed):
+    return 1.5 ** ((speed / 100) - 1)
+
+
+def stamina_factor(stamina):
+    return 1.1 ** (stamina / 100)
+
+
+def intelligence_factor(intelligence):
+    return 2 ** ((intelligence - 100) / 20)
+
+
+def combine_power(hp, mana, stamina, defense, phys_atk, mag_atk, speed_f, stamina_f, intelligence_f):
+    unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * speed_f
+    unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * stamina_f
+    return (unified2 * intelligence_f - 1) / 10
+
+
+def power_gradient(hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
+    """Partial derivatives of calculate_power, one per stat in STAT_FIELDS order.
+
+    Works elementwise on NumPy arrays as well as on numbers.
+    """
+    speed_f = 1.5 ** ((speed / 100) - 1)
+    stamina_f = 1.1 ** (stamina / 100)
+    intelligence_f = 2 ** ((intelligence - 100) / 20)
+    attack = 5 * mag_atk * (mana / 30) + phys_atk
+    unified1 = attack * speed_f
+    bulk = hp + 3 * defense
+    unified2 = unified1 * (stamina / 100) + bulk * stamina_f
+    scale = intelligence_f / 10
+    # d(unified2)/d(attack), shared by the three attack stats
+    attack_scale = speed_f * (stamina / 100) * scale
+    return (
+        stamina_f * scale,                                                   # health
+        5 * mag_atk / 30 * attack_scale,                                     # mana
+        (unified1 / 100 + bulk * stamina_f * _LN_STAMINA) * scale,          # stamina
+        3 * stamina_f * scale,                                               # defense
+        attack_scale,                                                        # phys_atk
+        5 * (mana / 30) * attack_scale,                                      # mag_atk
+        unified1 * _LN_SPEED * (stamina / 100) * scale,                      # speed
+        unified2 * _LN_INTELLIGENCE * scale,                                 # intelligence
+    )
+
+
+def _columns(stats_array):
+    """Split the input of calculate_power_batch into its eight stat columns."""
+    names = getattr(getattr(stats_array, "dtype", None), "names", None)
+    if names or hasattr(stats_array, "keys"):
+        return [stats_array[stat] for stat in STAT_FIELDS]
+    if np is not None:
+        rows = np.asarray(stats_array, dtype=np.float64).reshape(-1, len(STAT_FIELDS))
+        return rows.T
+    return list(zip(*stats_array)) or [()] * len(STAT_FIELDS)
+
+
+@traced("calculate_power_batch")
+def calculate_power_batch(stats_array):
+    """Compute calculate_power for many mages in one pass.
+
+    ``stats_array`` is either an (N, 8) array/sequence of rows in
+    calculate_power's argument order, or a struct-of-arrays: a mapping (or
+    NumPy structured array) from each name in ``STAT_FIELDS`` to a column.
+
+    With NumPy this returns a float64 array, evaluated column-wise with the
+    exponentials precomputed as ``np.exp(k * x)``; results agree with the
+    scalar function to within float rounding. Without NumPy it returns a list
+    of exactly calculate_power's results, read through the shared PowerTable.
+    """
+    columns = _columns(stats_array)
+    if np is None:
+        power = power_table.power
+        return [power(*row) for row in zip(*columns)]
+
+    hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence = (
+        np.asarray(column, dtype=np.float64) for column in columns)
+    speed_factor = np.exp(_LN_SPEED * (speed - 100))
+    stamina_factor = np.exp(_LN_STAMINA * stamina)
+    intelligence_factor = np.exp(_LN_INTELLIGENCE * (intelligence - 100))
+
+    unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * speed_factor
+    unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * stamina_factor
+    return (unified2 * intelligence_factor - 1) / 10
+
+
+class FactorTable:
+    """One of calculate_power's exponential factors, precomputed at integer stats.
+
+    Sliders move in whole steps, so the factor is nearly always wanted at an
+    integer (possibly held as a float, e.g. 150.0 from a DoubleVar). Those
+    values hit a dict, keyed so that 150 and 150.0 find the same entry; the
+    table covers 0..``limit`` and doubles on demand, up to ``max_limit``,
+    when an override pushes a stat past it. Other values are computed with
+    ``factor`` itself, so every result equals the exact function bit for bit.
+    """
+
+    def __init__(self, factor, limit=200, max_limit=1 << 16):
+        self.factor = factor
+        self.max_limit = max_limit
+        self.limit = -1
+        self.values = {}  # Grown in place, so callers may hold on to values.get
+        self._array = None  # NumPy copy of the table for batch lookups
+        self._lock = threading.Lock()
+        self.grow(limit)
+
+    def grow(self, limit):
+        """Extend the table to cover 0..``limit``."""
+        with self._lock:
+            limit = min(limit, self.max_limit)
+            for stat in range(self.limit + 1, limit + 1):
+                self.values[stat] = self.factor(stat)
+            if limit > self.limit:
+                self.limit = limit
+                self._array = None
+
+    def __call__(self, stat):
+        value = self.values.get(stat)
+        if value is None:
+            value = self.miss(stat)
+        return value
+
+    def miss(self, stat):
+        """The factor for a ``stat`` not in the table, growing the table if it is a whole number."""
+        if 0 <= stat <= self.max_limit and stat == int(stat):
+            self.grow(max(int(stat), 2 * self.limit))
+            return self.values[stat]
+        return self.factor(stat)
+
+    def lookup(self, stats):
+        """Vectorized ``__call__`` over a float64 NumPy array."""
+        if len(stats) and 0 <= stats.min() and stats.max() <= self.max_limit:
+            indexes = stats.astype(np.intp)
+            if (indexes == stats).all():
+                self.grow(int(indexes.max()))
+                return self._table()[indexes]
+
+        factors = np.empty_like(stats)
+        whole = (np.floor(stats) == stats) & (stats >= 0) & (stats <= self.max_limit)
+        if whole.any():
+            indexes = stats[whole].astype(np.intp)
+            self.grow(int(indexes.max()))
+            factors[whole] = self._table()[indexes]
+        if not whole.all():
+            # NumPy's power rounds differently from Python's, so the rest go through factor
+            rest = ~whole
+            factors[rest] = [self.factor(stat) for stat in stats[rest].tolist()]
+        return factors
+
+    def _table(self):
+        array = self._array
+        if array is None or len(array) <= self.limit:
+            array = self._array = np.array([self.values[stat] for stat in range(self.limit + 1)])
+        return array
+
+
+class PowerTable:
+    """calculate_power with its three exponentials read from FactorTables.
+
+    ``power`` takes calculate_power's arguments and returns exactly the same
+    value for every input; it is cheaper whenever speed, stamina and
+    intelligence are whole numbers. ``batch`` does the same for many mages.
+    """
+
+    def __init__(self, limit=200, max_limit=1 << 16):
+        self.speed = FactorTable(speed_factor, limit, max_limit)
+        self.stamina = FactorTable(stamina_factor, limit, max_limit)
+        self.intelligence = FactorTable(intelligence_factor, limit, max_limit)
+        self.power = self._evaluator()
+
+    def _evaluator(self):
+        # A closure over the bound lookups: this runs on every slider frame,
+        # and attribute loads would cost as much as the exponentials saved
+        speed_get, speed_miss = self.speed.values.get, self.speed.miss
+        stamina_get, stamina_miss = self.stamina.values.get, self.stamina.miss
+        intelligence_get, intelligence_miss = self.intelligence.values.get, self.intelligence.miss
+
+        def power(hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
+            speed_f = speed_get(speed)
+            if speed_f is None:
+                speed_f = speed_miss(speed)
+            stamina_f = stamina_get(stamina)
+            if stamina_f is None:
+                stamina_f = stamina_miss(stamina)
+            intelligence_f = intelligence_get(intelligence)
+            if intelligence_f is None:
+                intelligence_f = intelligence_miss(intelligence)
+            unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * speed_f
+            unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * stamina_f
+            return (unified2 * intelligence_f - 1) / 10
+        return power
+
+    def batch(self, stats_array):
+        """calculate_power_batch's inputs, calculate_power's exact results.
+
+        Returns a float64 array with NumPy, a list without.
+        """
+        columns = _columns(stats_array)
+        if np is None:
+            return [self.power(*row) for row in zip(*columns)]
+
+        hp, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence = (
+            np.asarray(column, dtype=np.float64) for column in columns)
+        unified1 = (5 * mag_atk * (mana / 30) + phys_atk) * self.speed.lookup(speed)
+        unified2 = unified1 * (stamina / 100) + (hp + 3 * defense) * self.stamina.lookup(stamina)
+        return (unified2 * self.intelligence.lookup(intelligence) - 1) / 10
+
+
+# Shared by the GUI; grows as overrides raise stats past the slider range
+power_table = PowerTable()
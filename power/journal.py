@@ -0,0 +1,185 @@
+import json
+import os
+
+from power.formats import RosterFormatError
+from power.repository import MageRepository, write_snapshot
+from power.schema import VERSION_FIELD
+from power.trace import traced
+
+
+class JournalRepository(MageRepository):
+    """Repository that logs single-mage writes to an append-only journal.
+
+    The roster lives in two files: the regular JSON snapshot at ``path`` and a
+    JSON-lines journal at ``path + ".journal"`` holding ``upsert``/``delete``
+    records written since the last compaction. Saving one mage appends one
+    line instead of rewriting the whole roster.
+
+    Appends are fsynced in batches of ``sync_every`` records (and always on
+    ``sync``/``close``). Once the journal holds ``compact_every`` records it
+    is folded back into the snapshot, which is replaced atomically.
+
+    On load the snapshot is read and the journal replayed on top of it. A
+    torn final line is skipped; a writer, holding the file lock, also trims
+    it from the file, since it can only be left by a crash (to a reader it
+    may be another process's append in progress). A complete line that is
+    not an upsert or delete entry raises RosterFormatError.
+    """
+
+    def __init__(self, path, sync_every=32, compact_every=1000):
+        super().__init__(path)
+        self.journal_path = f"{path}.journal"
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._journal = None
+        self._journal_records = 0
+        self._unsynced = 0
+        self._torn_tail = False  # The last load saw a partial line it could not trim
+
+    # Loading
+
+    def _file_stamp(self):
+        snapshot = super()._file_stamp()
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            journal = None
+        else:
+            journal = st.st_mtime_ns, st.st_size
+        if snapshot is None and journal is None:
+            return None
+        return snapshot, journal
+
+    def _ensure_fresh(self):
+        super()._ensure_fresh()
+        if self._torn_tail and self._file_lock.held:
+            # Seen without the lock it might have been an append in progress; a writer
+            # must trim it, or its own append would land on the end of the partial line
+            self.reload()
+
+    def _snapshot_identity(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    @traced("repository.reload")
+    def reload(self):
+        self._close_journal()
+        while True:
+            stamp = self._file_stamp()
+            snapshot = self._snapshot_identity()
+            records = self._load_records()
+            applied = self._replay(records)
+            # Appends during the read only make it newer, but a compaction in another
+            # process swaps the snapshot and drops the journal under us; read again.
+            if self._file_lock.held or self._snapshot_identity() == snapshot:
+                break
+        self._journal_records = applied
+        self._records = records
+        self._stamp = stamp
+        self._publish("reload", None)
+
+    def _replay(self, records):
+        """Apply the journal to ``records``; return the number of entries applied."""
+        self._torn_tail = False
+        try:
+            file = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        good_end = 0
+        with file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                op = entry.get("op") if isinstance(entry, dict) else None
+                if op == "upsert" and isinstance(entry.get("mage"), dict) and "id" in entry["mage"]:
+                    mage = entry["mage"]
+                    mage.setdefault(VERSION_FIELD, 0)
+                    records[mage["id"]] = mage
+                elif op == "delete" and "id" in entry:
+                    records.pop(entry["id"], None)
+                else:
+                    raise RosterFormatError(f"malformed entry in {self.journal_path}", good_end)
+                applied += 1
+                good_end += len(line)
+            size = os.fstat(file.fileno()).st_size
+
+        self._torn_tail = good_end < size
+        if self._torn_tail and self._file_lock.held:
+            # Everything after the last complete record is a partial write.
+            with open(self.journal_path, 'r+b') as file:
+                file.truncate(good_end)
+            self._torn_tail = False
+        return applied
+
+    # Journal writes
+
+    def _append(self, entries):
+        """Append ``entries`` to the journal as one commit."""
+        if not entries:
+            return
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        for entry in entries:
+            self._journal.write(json.dumps(entry) + "\n")
+        self._journal_records += len(entries)
+        self._unsynced += len(entries)
+
+        if self._unsynced >= self.sync_every:
+            self.sync()
+        else:
+            self._journal.flush()
+        self._committed()
+        if self._journal_records >= self.compact_every:
+            self.compact()
+
+    def _persist_upsert(self, mage_data):
+        self._append([{"op": "upsert", "mage": mage_data}])
+
+    def _persist_delete(self, mage_id):
+        self._append([{"op": "delete", "id": mage_id}])
+
+    def _persist_many(self, records):
+        self._append([{"op": "upsert", "mage": record} for record in records])
+
+    @traced("journal.sync")
+    def sync(self):
+        """Force all appended records to stable storage."""
+        with self._lock:
+            if self._journal is not None and self._unsynced:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start an empty journal."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()  # Include what other processes appended
+            self._close_journal()
+            write_snapshot(self.path, self._records.values())
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_records = 0
+            self._committed()
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
+
+    def close(self):
+        with self._lock:
+            if self._journal_records:
+                self.compact()
+            else:
+                self._close_journal()
+            super().close()
@@ -0,0 +1,167 @@
+import json
+import math
+import sys
+import threading
+from array import array
+
+from power.atomic import atomic_write
+from power.events import ChangeFollower, comparable_stamp
+from power.formula import calculate_power, calculate_power_batch
+from power.schema import STAT_FIELDS
+from power.sortedlist import SortedList
+
+_MAGIC = "mage-leaderboard"
+_VERSION = 1
+
+
+class Leaderboard(ChangeFollower):
+    """Mages ordered by power, kept in step with a repository's change events.
+
+    Entries are ``(-power, id)`` keys in a SortedList, so the strongest mage
+    comes first, ties go by id, and top-K, rank-of-mage and power-range
+    queries take logarithmic time instead of a scan with ``calculate_power``
+    per row. Every write the repository publishes moves one entry; a
+    ``reload`` event rebuilds from scratch.
+
+    The board is saved next to the roster (``path + ".leaderboard"``) along
+    with the repository's stamp, and reused on the next start when the
+    roster has not changed since, so startup skips scoring every mage.
+    Methods are thread-safe: writes usually arrive on the I/O thread.
+    """
+
+    SUFFIX = ".leaderboard"
+
+    def __init__(self, path=None):
+        self.path = path
+        self._keys = SortedList()
+        self._powers = {}
+        self._lock = threading.Lock()
+
+    # Maintenance
+
+    def apply(self, record):
+        self.set(record["id"], calculate_power(*(record[stat] for stat in STAT_FIELDS)))
+
+    def rebuild(self, records):
+        """Replace the board with the powers of ``records`` (scored in one batch)."""
+        records = list(records)
+        powers = calculate_power_batch({stat: [record[stat] for record in records] for stat in STAT_FIELDS})
+        powers = powers.tolist() if hasattr(powers, "tolist") else powers
+        self._replace({record["id"]: power for record, power in zip(records, powers)})
+
+    def _replace(self, powers, keys=None):
+        if keys is None:
+            keys = sorted((-power, mage_id) for mage_id, power in powers.items())
+        with self._lock:
+            self._powers = powers
+            self._keys = SortedList(keys, presorted=True)
+
+    def set(self, mage_id, power):
+        with self._lock:
+            old = self._powers.get(mage_id)
+            if old == power:
+                return
+            if old is not None:
+                self._keys.remove((-old, mage_id))
+            self._powers[mage_id] = power
+            self._keys.add((-power, mage_id))
+
+    def discard(self, mage_id):
+        with self._lock:
+            old = self._powers.pop(mage_id, None)
+            if old is not None:
+                self._keys.remove((-old, mage_id))
+
+    # Queries
+
+    def __len__(self):
+        return len(self._powers)
+
+    def __contains__(self, mage_id):
+        return mage_id in self._powers
+
+    def power_of(self, mage_id):
+        return self._powers.get(mage_id)
+
+    def top(self, k):
+        """The ``k`` strongest mages as ``(power, id)`` pairs, strongest first."""
+        return self.slice(0, k)
+
+    def slice(self, offset, limit):
+        """``(power, id)`` pairs ranked ``offset + 1`` to ``offset + limit``."""
+        with self._lock:
+            return [(-key, mage_id) for key, mage_id in self._keys.islice(offset, offset + limit)]
+
+    def ids(self, offset, limit):
+        """Mage ids ranked ``offset + 1`` to ``offset + limit``, e.g. one page of the overview."""
+        return [mage_id for _, mage_id in self.slice(offset, limit)]
+
+    def rank(self, mage_id):
+        """1-based rank of ``mage_id`` (1 is the strongest), or None if unknown."""
+        with self._lock:
+            power = self._powers.get(mage_id)
+            if power is None:
+                return None
+            return self._keys.index((-power, mage_id)) + 1
+
+    def in_range(self, low=float("-inf"), high=float("inf")):
+        """``(power, id)`` pairs with ``low <= power <= high``, strongest first."""
+        with self._lock:
+            keys = self._keys.islice(*self._range_positions(low, high))
+            return [(-key, mage_id) for key, mage_id in keys]
+
+    def _range_positions(self, low, high):
+        # Power is negated in the keys, so the bounds swap. A 1-tuple sorts before
+        # every (key, id) with the same key, which makes both ends inclusive.
+        return self._keys.bisect_left((-high,)), self._keys.bisect_left((math.nextafter(-low, math.inf),))
+
+    def count_range(self, low=float("-inf"), high=float("inf")):
+        """Number of mages with ``low <= power <= high``."""
+        with self._lock:
+            start, stop = self._range_positions(low, high)
+            return stop - start
+
+    # Persistence
+
+    def save(self, stamp, path=None):
+        """Write the board, tagged with the roster ``stamp`` it reflects.
+
+        Layout: one JSON header line, then the powers as float64 in rank
+        order, then the ids in the same order as newline-separated UTF-8.
+        """
+        path = path or self.path
+        with self._lock:
+            keys = list(self._keys)
+        powers = array('d', (-key for key, _ in keys))
+        ids = "\n".join(mage_id for _, mage_id in keys).encode('utf-8')
+        header = {"format": _MAGIC, "version": _VERSION, "stamp": stamp, "count": len(keys),
+                  "byteorder": sys.byteorder}
+
+        with atomic_write(path, 'wb') as file:
+            file.write(json.dumps(header).encode('utf-8') + b"\n")
+            file.write(powers.tobytes())
+            file.write(ids)
+
+    def load(self, stamp, path=None):
+        """Load a saved board if it was written for ``stamp``; return whether it was."""
+        path = path or self.path
+        try:
+            with open(path, 'rb') as file:
+                header = json.loads(file.readline())
+                data = file.read()
+        except (OSError, ValueError):
+            return False
+        if (not isinstance(header, dict) or header.get("format") != _MAGIC or header.get("version") != _VERSION
+                or header.get("stamp") is None or header["stamp"] != comparable_stamp(stamp)):
+            return False
+
+        count = header["count"]
+        powers = array('d')
+        powers.frombytes(data[:count * powers.itemsize])
+        if header["byteorder"] != sys.byteorder:
+            powers.byteswap()
+        ids = data[count * powers.itemsize:].decode('utf-8').split("\n") if count else []
+        if len(powers) != count or len(ids) != count:
+            return False
+        self._replace(dict(zip(ids, powers)), [(-power, mage_id) for power, mage_id in zip(powers, ids)])
+        return True
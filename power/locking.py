@@ -0,0 +1,90 @@
+"""Advisory locking between processes sharing a roster file.
+
+Writers hold a ``FileLock`` for the whole read-check-write of a commit, so
+two app instances (or the GUI and a batch job) never write over each
+other. Readers do not take it: commits replace files atomically, so a
+reader always sees a whole roster, old or new.
+
+The lock is ``fcntl.flock`` on a sidecar file, which also holds a commit
+counter. Every commit bumps it, so a process can tell the roster changed
+even when the file's mtime and size did not (mtimes are only as fine as
+the kernel's clock tick). Without ``fcntl`` (Windows) the lock only
+serializes threads of this process and the counter stays at 0.
+"""
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; locking is then per process only
+    fcntl = None
+
+_GENERATION = struct.Struct("<Q")
+
+
+class FileLock:
+    """Reentrant exclusive lock on ``path`` (created if missing), shared by this process's threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+        self._owner = threading.RLock()
+
+    def _open(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        return self._fd
+
+    def acquire(self):
+        self._owner.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                fcntl.flock(self._open(), fcntl.LOCK_EX)
+            except BaseException:
+                self._owner.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._owner.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @property
+    def held(self):
+        """Whether a thread of this process holds the lock."""
+        return self._depth > 0
+
+    def generation(self):
+        """The commit counter. Read without the lock, it may lag the roster by the commit in progress."""
+        if fcntl is None:
+            return 0
+        try:
+            data = os.pread(self._open(), _GENERATION.size, 0)
+        except OSError:
+            return None  # e.g. a read-only directory; callers fall back to file stats
+        return _GENERATION.unpack(data)[0] if len(data) == _GENERATION.size else 0
+
+    def bump(self):
+        """Count a commit; call it with the lock held, once the new data is in place."""
+        if fcntl is None:
+            return
+        generation = self.generation()
+        if generation is not None:  # None: the counter is unreadable and readers go by file stats
+            os.pwrite(self._fd, _GENERATION.pack(generation + 1), 0)
+
+    def close(self):
+        with self._owner:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
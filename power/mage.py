@@ -0,0 +1,126 @@
+"""The mage model: a record's fields plus a power cached per stat change."""
+import uuid
+
+from power.formula import combine_power, intelligence_factor, speed_factor, stamina_factor
+from power.schema import FIELDS
+
+
+class Mage:
+    __slots__ = ("id",) + tuple(f"_{field}" for field in FIELDS[1:]) + (
+        "_power", "_speed_factor", "_stamina_factor", "_intelligence_factor")
+    # (record key, attribute) pairs in to_dict order; drives all serialization.
+    _SCHEMA = tuple(zip(FIELDS, __slots__))
+
+    def __init__(self, name="", age=0, description="", years_practicing=0, personality="",
+                 health=100, mana=100, stamina=100, defense=10, phys_atk=4, mag_atk=0, speed=100, intelligence=100):
+        # Basic attributes
+        self._name = name
+        self._age = age
+        self._description = description
+        self._years_practicing = years_practicing
+        self._personality = personality
+        self.id = str(uuid.uuid4())
+
+        # Stats
+        self._health = health
+        self._mana = mana
+        self._stamina = stamina
+        self._defense = defense
+        self._phys_atk = phys_atk
+        self._mag_atk = mag_atk
+        self._speed = speed
+        self._intelligence = intelligence
+
+        self._invalidate_power()
+
+    def _invalidate_power(self):
+        self._power = None
+        self._speed_factor = None
+        self._stamina_factor = None
+        self._intelligence_factor = None
+
+    @property
+    def power(self):
+        # Cached; set_stat only drops the pieces that depend on the changed stat,
+        # so e.g. a health change reuses all three exponential factors.
+        if self._power is None:
+            if self._speed_factor is None:
+                self._speed_factor = speed_factor(self._speed)
+            if self._stamina_factor is None:
+                self._stamina_factor = stamina_factor(self._stamina)
+            if self._intelligence_factor is None:
+                self._intelligence_factor = intelligence_factor(self._intelligence)
+            self._power = combine_power(self._health, self._mana, self._stamina, self._defense, self._phys_atk,
+                                        self._mag_atk, self._speed_factor, self._stamina_factor,
+                                        self._intelligence_factor)
+        return self._power
+
+    # Getters and setters for attributes
+    def get_name(self):
+        return self._name
+
+    def set_name(self, name):
+        self._name = name
+
+    def get_age(self):
+        return self._age
+
+    def set_age(self, age):
+        self._age = age
+
+    def get_description(self):
+        return self._description
+
+    def set_description(self, description):
+        self._description = description
+
+    def get_years_practicing(self):
+        return self._years_practicing
+
+    def set_years_practicing(self, years):
+        self._years_practicing = years
+
+    def get_personality(self):
+        return self._personality
+
+    def set_personality(self, personality):
+        self._personality = personality
+
+    # Getters and setters for stats
+    def get_stat(self, stat_name):
+        return getattr(self, f"_{stat_name}")
+
+    def set_stat(self, stat_name, value):
+        attribute = f"_{stat_name}"
+        if getattr(self, attribute) == value:
+            return
+        setattr(self, attribute, value)
+        self._power = None
+        if stat_name == "speed":
+            self._speed_factor = None
+        elif stat_name == "stamina":
+            self._stamina_factor = None
+        elif stat_name == "intelligence":
+            self._intelligence_factor = None
+
+    def set_stats(self, health, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
+        self.set_stat("health", health)
+        self.set_stat("mana", mana)
+        self.set_stat("stamina", stamina)
+        self.set_stat("defense", defense)
+        self.set_stat("phys_atk", phys_atk)
+        self.set_stat("mag_atk", mag_atk)
+        self.set_stat("speed", speed)
+        self.set_stat("intelligence", intelligence)
+
+    def get_id(self):
+        return self.id
+
+    def load_completely(self, mage_data):
+        for key, attribute in self._SCHEMA:
+            setattr(self, attribute, mage_data[key])
+        self._invalidate_power()
+
+    def to_dict(self):
+        """Serialize the mage to the record format stored in the CMD."""
+        return {key: getattr(self, attribute) for key, attribute in self._SCHEMA}
@@ -0,0 +1,317 @@
+"""Find the stat allocation that maximizes calculate_power under a budget.
+
+The search space is every allocation of the eight stats whose total equals
+the budget, with each stat inside its bounds (a fixed stat has both bounds
+at its current value). Power rises with every stat but mixes exponential
+and multiplicative terms, so there can be several local optima:
+
+1. Candidate search: a few hundred allocations (the current one, an even
+   split, "everything into one stat" corners and random splits) are scored
+   in one vectorized pass, and the best few become starting points.
+2. Projected gradient ascent from each start, using the closed-form
+   ``power_gradient``; after every step the allocation is projected back
+   onto the budget and bounds.
+3. Optionally the result is rounded to whole numbers (sliders move in
+   steps of 1) and polished by moving single points between stats while
+   that helps.
+
+With NumPy every candidate, start and mage is processed at once, which is
+what ``optimize_batch`` relies on to handle thousands of mages. Without it
+the same steps run per allocation in pure Python, with fewer candidates.
+"""
+import math
+import random
+from collections import namedtuple
+
+from power.formula import calculate_power, np, power_gradient
+from power.schema import STAT_FIELDS
+
+# The visualizers' default slider ranges
+DEFAULT_BOUNDS = {stat: (0, 20) if stat in ("phys_atk", "mag_atk") else (0, 200) for stat in STAT_FIELDS}
+
+CANDIDATES = 256
+STARTS = 8
+STEPS = 120
+MAX_CLIMB = 200  # Unit moves tried after rounding
+
+Allocation = namedtuple("Allocation", ["stats", "power"])
+
+_N = len(STAT_FIELDS)
+_MOVES = [(i, j) for i in range(_N) for j in range(_N) if i != j]  # One point from stat j to stat i
+
+
+def _limits(stats, bounds, fixed, budget, integer):
+    """Resolve bounds, fixed stats and budget for one mage to (lows, highs, budget) in STAT_FIELDS order."""
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+    unknown = (set(bounds) | set(fixed)) - set(STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown stats: {', '.join(sorted(unknown))}")
+    lows, highs = [], []
+    for stat in STAT_FIELDS:
+        if stat in fixed:
+            low = high = stats[stat]
+        else:
+            low, high = bounds[stat]
+            if integer:
+                low, high = math.ceil(low), math.floor(high)
+        if low > high:
+            raise ValueError(f"Empty range for {stat}: {low}..{high}")
+        lows.append(low)
+        highs.append(high)
+    if budget is None:
+        budget = sum(stats[stat] for stat in STAT_FIELDS)
+    if integer:
+        budget = math.floor(budget)
+    if budget < sum(lows):
+        raise ValueError(f"Budget {budget} is below the minimum total of {sum(lows)}")
+    # Power never falls when a stat rises, so a budget above every maximum is just every maximum
+    return lows, highs, min(budget, sum(highs))
+
+
+def optimize(stats, budget=None, bounds=None, fixed=(), integer=True, seed=0):
+    """Best allocation of ``budget`` stat points for one mage.
+
+    ``stats`` maps each name in STAT_FIELDS to its current value (a mage
+    record will do); ``budget`` defaults to their current total.
+    ``bounds`` maps stats to ``(low, high)``, defaulting to DEFAULT_BOUNDS,
+    and stats named in ``fixed`` keep their current value. With
+    ``integer`` the result is whole numbers. Returns an Allocation of a
+    ``{stat: value}`` dict and its power.
+    """
+    return optimize_batch([stats], budget, bounds, fixed, integer, seed)[0]
+
+
+def optimize_batch(mages, budget=None, bounds=None, fixed=(), integer=True, seed=0):
+    """``optimize`` for many mages at once; returns one Allocation per mage.
+
+    ``budget`` may be a single number or one per mage (default: each mage's
+    own total). Bounds and fixed stats apply to every mage.
+    """
+    mages = list(mages)
+    budgets = budget if isinstance(budget, (list, tuple)) or hasattr(budget, "shape") else [budget] * len(mages)
+    if len(budgets) != len(mages):
+        raise ValueError(f"Got {len(budgets)} budgets for {len(mages)} mages")
+    limits = [_limits(mage, bounds, fixed, mage_budget, integer) for mage, mage_budget in zip(mages, budgets)]
+    if not mages:
+        return []
+    if np is None:
+        rng = random.Random(seed)
+        return [_optimize_row([mage[stat] for stat in STAT_FIELDS], *limit, integer, rng)
+                for mage, limit in zip(mages, limits)]
+
+    current = np.array([[mage[stat] for stat in STAT_FIELDS] for mage in mages], dtype=np.float64)
+    lows = np.array([limit[0] for limit in limits], dtype=np.float64)
+    highs = np.array([limit[1] for limit in limits], dtype=np.float64)
+    totals = np.array([limit[2] for limit in limits], dtype=np.float64)
+    best, powers = _optimize_array(current, lows, highs, totals, integer, np.random.default_rng(seed))
+    results = []
+    for row, power in zip(best.tolist(), powers.tolist()):
+        # Fixed stats may hold fractions even in integer mode
+        values = [int(value) if integer and value.is_integer() else value for value in row]
+        results.append(Allocation(dict(zip(STAT_FIELDS, values)), power))
+    return results
+
+
+# NumPy path: rows are allocations, shape (rows, 8)
+
+def _powers(x):
+    return calculate_power(*x.T)
+
+
+def _project(y, lows, highs, totals):
+    """Closest point to each row of ``y`` with the row summing to ``totals`` inside the bounds.
+
+    That point is ``clip(y - tau, lows, highs)`` for the one ``tau`` giving
+    the right total. The total falls piecewise linearly as ``tau`` grows,
+    bending only where a stat reaches a bound, so ``tau`` is interpolated
+    between the two bend points around ``totals``.
+    """
+    bends = np.concatenate([y - highs, y - lows], axis=1)
+    order = np.argsort(bends, axis=1)
+    bends = np.take_along_axis(bends, order, 1)
+    # Past a y - high bend a stat leaves its high and the total falls one faster; past y - low it stops
+    slopes = np.cumsum(np.where(order < _N, -1.0, 1.0), axis=1)
+    sums = np.empty_like(bends)
+    sums[:, 0] = highs.sum(axis=1)
+    np.cumsum(slopes[:, :-1] * np.diff(bends, axis=1), axis=1, out=sums[:, 1:])
+    sums[:, 1:] += sums[:, :1]
+    # Last bend whose total is still at least the budget (sums fall left to right)
+    k = np.minimum((sums >= totals[:, None]).sum(axis=1) - 1, bends.shape[1] - 2)
+    k = np.maximum(k, 0)[:, None]
+    left, right = np.take_along_axis(bends, k, 1)[:, 0], np.take_along_axis(bends, k + 1, 1)[:, 0]
+    left_sum, right_sum = np.take_along_axis(sums, k, 1)[:, 0], np.take_along_axis(sums, k + 1, 1)[:, 0]
+    drop = left_sum - right_sum
+    tau = left + np.divide((left_sum - totals) * (right - left), drop, out=np.zeros_like(drop), where=drop > 0)
+    return np.clip(y - tau[:, None], lows, highs)
+
+
+def _ascend(x, lows, highs, totals):
+    """Projected gradient ascent from every row of ``x``; returns the best point seen and its power."""
+    best, best_powers = x, _powers(x)
+    first = (totals / _N)[:, None]  # Step lengths shrink geometrically from here to 1/1000 of it
+    for step in range(STEPS):
+        gradient = np.stack(power_gradient(*x.T), axis=1)
+        # Only differences between slopes move points once the budget is fixed, and stats at a bound
+        # cannot go further; scaling by that spread keeps step lengths comparable across mages
+        rising = np.where(x < highs, gradient, -np.inf).max(axis=1)
+        falling = np.where(x > lows, gradient, np.inf).min(axis=1)
+        spread = np.where(rising > falling, rising - falling, 1.0)[:, None]
+        x = _project(x + first * 1e-3 ** (step / STEPS) * gradient / spread, lows, highs, totals)
+        powers = _powers(x)
+        better = powers > best_powers
+        best = np.where(better[:, None], x, best)
+        best_powers = np.where(better, powers, best_powers)
+    return best, best_powers
+
+
+def _round(x, lows, highs, totals):
+    """Round rows to whole numbers that still sum to ``totals`` and stay in bounds."""
+    floors = np.clip(np.floor(x), lows, highs)
+    missing = (totals - floors.sum(axis=1)).astype(np.intp)
+    # Largest fractional parts first; stats already at their high go last
+    room = floors < highs
+    priority = np.where(room, x - floors, -1.0)
+    order = np.argsort(-priority, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(_N)[None, :].repeat(len(x), axis=0), axis=1)
+    return floors + ((ranks < missing[:, None]) & room)
+
+
+def _climb(x, lows, highs):
+    """Move single points between stats while that raises power."""
+    powers = _powers(x)
+    gain, loss = np.array(_MOVES).T
+    active = np.arange(len(x))
+    for _ in range(MAX_CLIMB):
+        if not len(active):
+            break
+        rows = x[active]
+        moved = np.repeat(rows[:, None, :], len(_MOVES), axis=1)
+        moved[:, np.arange(len(_MOVES)), gain] += 1
+        moved[:, np.arange(len(_MOVES)), loss] -= 1
+        valid = ((moved <= highs[active, None, :]) & (moved >= lows[active, None, :])).all(axis=2)
+        candidates = np.where(valid, _powers(moved.reshape(-1, _N)).reshape(len(rows), -1), -np.inf)
+        choice = candidates.argmax(axis=1)
+        best = candidates[np.arange(len(rows)), choice]
+        improved = best > powers[active]
+        if not improved.any():
+            break
+        winners = active[improved]
+        x[winners] = moved[improved, choice[improved]]
+        powers[winners] = best[improved]
+        active = winners
+    return x, powers
+
+
+def _optimize_array(current, lows, highs, totals, integer, rng):
+    mages = len(current)
+    spare = totals - lows.sum(axis=1)
+    # Candidates per mage: current, even split, one corner per stat, random splits
+    shares = rng.exponential(size=(mages, CANDIDATES, _N))
+    shares[:, 0] = current - lows
+    shares[:, 1] = 1.0
+    shares[:, 2:2 + _N] = np.eye(_N)
+    shares /= np.maximum(shares.sum(axis=2, keepdims=True), 1e-300)
+    candidates = lows[:, None, :] + shares * spare[:, None, None]
+
+    def repeat(values, times):
+        return np.repeat(values, times, axis=0)
+
+    flat = _project(candidates.reshape(-1, _N), repeat(lows, CANDIDATES), repeat(highs, CANDIDATES),
+                    repeat(totals, CANDIDATES))
+    scores = _powers(flat).reshape(mages, CANDIDATES)
+    chosen = np.argsort(-scores, axis=1)[:, :STARTS]
+    starts = flat.reshape(mages, CANDIDATES, _N)[np.arange(mages)[:, None], chosen].reshape(-1, _N)
+
+    best, powers = _ascend(starts, repeat(lows, STARTS), repeat(highs, STARTS), repeat(totals, STARTS))
+    winner = powers.reshape(mages, STARTS).argmax(axis=1)
+    best = best.reshape(mages, STARTS, _N)[np.arange(mages), winner]
+    if not integer:
+        return best, _powers(best)
+    return _climb(_round(best, lows, highs, totals), lows, highs)
+
+
+# Pure-Python path: one allocation as a list of eight numbers
+
+_ROW_CANDIDATES = 48
+_ROW_STARTS = 3
+
+
+def _project_row(y, lows, highs, total):
+    def clipped_sum(tau):
+        return sum(min(max(value - tau, low), high) for value, low, high in zip(y, lows, highs))
+
+    bends = sorted([value - high for value, high in zip(y, highs)] + [value - low for value, low in zip(y, lows)])
+    left, left_sum = bends[0], clipped_sum(bends[0])
+    tau = left
+    for right in bends[1:]:
+        right_sum = clipped_sum(right)
+        if right_sum < total:
+            drop = left_sum - right_sum
+            tau = left + (left_sum - total) * (right - left) / drop if drop > 0 else left
+            break
+        left, left_sum, tau = right, right_sum, right
+    return [min(max(value - tau, low), high) for value, low, high in zip(y, lows, highs)]
+
+
+def _ascend_row(x, lows, highs, total):
+    best, best_power = x, calculate_power(*x)
+    first = total / _N
+    for step in range(STEPS):
+        gradient = power_gradient(*x)
+        rising = max((slope for slope, value, high in zip(gradient, x, highs) if value < high), default=0.0)
+        falling = min((slope for slope, value, low in zip(gradient, x, lows) if value > low), default=0.0)
+        length = first * 1e-3 ** (step / STEPS) / (rising - falling if rising > falling else 1.0)
+        x = _project_row([value + length * slope for value, slope in zip(x, gradient)], lows, highs, total)
+        power = calculate_power(*x)
+        if power > best_power:
+            best, best_power = x, power
+    return best, best_power
+
+
+def _round_row(x, lows, highs, total):
+    floors = [min(max(math.floor(value), low), high) for value, low, high in zip(x, lows, highs)]
+    missing = int(total - sum(floors))
+    order = sorted((i for i in range(_N) if floors[i] < highs[i]), key=lambda i: floors[i] - x[i])
+    for i in order[:missing]:
+        floors[i] += 1
+    return floors
+
+
+def _climb_row(x, lows, highs):
+    power = calculate_power(*x)
+    for _ in range(MAX_CLIMB):
+        best = None
+        for i, j in _MOVES:
+            if x[i] + 1 > highs[i] or x[j] - 1 < lows[j]:
+                continue
+            moved = list(x)
+            moved[i] += 1
+            moved[j] -= 1
+            moved_power = calculate_power(*moved)
+            if moved_power > power:
+                best, power = moved, moved_power
+        if best is None:
+            break
+        x = best
+    return x, power
+
+
+def _optimize_row(current, lows, highs, total, integer, rng):
+    spare = total - sum(lows)
+    shares = [[value - low for value, low in zip(current, lows)], [1.0] * _N]
+    shares += [[float(i == j) for j in range(_N)] for i in range(_N)]
+    shares += [[rng.expovariate(1.0) for _ in range(_N)] for _ in range(_ROW_CANDIDATES - len(shares))]
+    candidates = []
+    for share in shares:
+        weight = sum(share) or 1.0
+        point = _project_row([low + value / weight * spare for value, low in zip(share, lows)], lows, highs, total)
+        candidates.append((calculate_power(*point), point))
+    candidates.sort(key=lambda candidate: -candidate[0])
+
+    best, power = max((_ascend_row(point, lows, highs, total) for _, point in candidates[:_ROW_STARTS]),
+                      key=lambda result: result[1])
+    if integer:
+        best, power = _climb_row(_round_row(best, lows, highs, total), lows, highs)
+        best = [int(value) if value == int(value) else value for value in best]
+    return Allocation(dict(zip(STAT_FIELDS, best)), power)
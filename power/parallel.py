@@ -0,0 +1,163 @@
+"""Score one large roster file across several processes.
+
+The file is cut into byte ranges without reading it. Each worker process
+finds the first record that starts inside its range, parses and scores
+records until the next one would start past the range end, and sends back
+only a top-K list and a PowerStats summary, which the parent merges. A
+record therefore belongs to exactly the range holding its first byte.
+"""
+import heapq
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from power.cli import PowerStats, scored
+from power.formats import RosterFormatError, detect_format, iter_json_elements
+
+PARALLEL_FORMATS = ("json", "jsonl")
+MIN_CHUNK_BYTES = 1 << 20
+CHUNKS_PER_WORKER = 4  # Smaller pieces even out the load when records vary in size
+
+# Between two array elements: the end of one object, a comma, the start of the next
+_SEPARATOR = re.compile(rb"\}\s*,\s*\{")
+_SCAN_BYTES = 1 << 16
+_CHECK_BYTES = 1 << 12
+_LOOKBACK = 4096  # How far before a range start the separator's "}" may be
+_WHITESPACE = b" \t\r\n"
+
+
+def split_ranges(path, parts, min_chunk=MIN_CHUNK_BYTES):
+    """Cut ``path`` into up to ``parts`` contiguous ``(start, end)`` byte ranges."""
+    size = os.path.getsize(path)
+    parts = max(1, min(parts, size // min_chunk))
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+# Finding records inside a byte range
+
+def _is_element(file, offset):
+    """Whether a mage object really starts at ``offset`` of the open ``file``.
+
+    Text inside a JSON string cannot pass for a record: any quote in it is
+    escaped, so it cannot hold an object with an "id" key.
+    """
+    file.seek(offset)
+    try:
+        # Small chunks: a candidate needs one record, not a full 64 KiB read
+        _, record = next(iter_json_elements(file, offset, chunk_size=_CHECK_BYTES))
+    except (RosterFormatError, StopIteration, UnicodeDecodeError):
+        return False
+    return isinstance(record, dict) and "id" in record
+
+
+def _first_element(file, start, end):
+    """Offset of the first array element whose "{" lies in ``[start, end)``, or None."""
+    if start == 0:
+        head = file.read(_SCAN_BYTES)
+        pos = len(head) - len(head.lstrip(_WHITESPACE))
+        if pos == len(head) < _SCAN_BYTES:
+            return None  # An empty file is an empty roster, as for iter_records
+        if head[pos:pos + 1] != b"[":
+            raise RosterFormatError("expected '[' starting the roster", pos)
+        pos += 1
+        pos += len(head[pos:]) - len(head[pos:].lstrip(_WHITESPACE))
+        return pos if head[pos:pos + 1] == b"{" and pos < end else None
+
+    scan_from = max(0, start - _LOOKBACK)
+    while scan_from < end:
+        file.seek(scan_from)
+        block = file.read(_SCAN_BYTES + _LOOKBACK)
+        if not block:
+            return None
+        for match in _SEPARATOR.finditer(block):
+            brace = scan_from + match.end() - 1
+            if brace >= end:
+                return None
+            if brace >= start and _is_element(file, brace):
+                return brace
+        # Blocks overlap so a separator split across two of them is still seen
+        scan_from += _SCAN_BYTES
+    return None
+
+
+def _json_records(file, start, end):
+    offset = _first_element(file, start, end)
+    if offset is None:
+        return
+    file.seek(offset)
+    for record_offset, record in iter_json_elements(file, offset):
+        if record_offset >= end:
+            return
+        yield record
+
+
+def _jsonl_records(file, start, end):
+    if start:
+        # Skip the line already under way at start; it belongs to the previous range
+        file.seek(start - 1)
+        file.readline()
+    offset = file.tell()
+    while offset < end:
+        line = file.readline()
+        if not line:
+            return
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise RosterFormatError(f"malformed mage record ({error.msg})", offset) from None
+        offset += len(line)
+
+
+def score_range(path, fmt, start, end, chunk_index, filters=(), top=10, sample_size=100_000, bin_width=10.0):
+    """Score the records starting in ``[start, end)``; runs in a worker process.
+
+    Returns ``(best, stats)``: up to ``top`` ``(power, -chunk_index,
+    -position, record)`` tuples (the extra fields keep file order as the
+    tie-break across chunks) and a PowerStats for the range.
+    """
+    stats = PowerStats(sample_size=sample_size, bin_width=bin_width, seed=chunk_index)
+    best = []
+    with open(path, 'rb') as file:
+        records = _json_records(file, start, end) if fmt == "json" else _jsonl_records(file, start, end)
+        for position, (power, record) in enumerate(scored(records, filters)):
+            stats.add(power)
+            if top:
+                item = (power, -chunk_index, -position, record)
+                if len(best) < top:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+    return best, stats
+
+
+def score_parallel(path, fmt=None, workers=None, filters=(), top=10, sample_size=100_000, bin_width=10.0):
+    """Rank and summarize a JSON or JSONL roster using ``workers`` processes (default: every core).
+
+    Returns ``(ranked, stats)`` like ``top_k`` and ``PowerStats`` would for
+    the whole file: ``ranked`` holds the ``top`` strongest ``(power,
+    record)`` pairs, ties in file order. ``filters`` must be picklable, such
+    as the Filter objects from ``parse_filter``. With one worker everything
+    runs in this process.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in PARALLEL_FORMATS:
+        raise ValueError(f"Parallel scoring needs a JSON or JSONL file, not {fmt}")
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(path, workers * CHUNKS_PER_WORKER if workers > 1 else 1)
+    jobs = [(path, fmt, start, end, index, tuple(filters), top, sample_size, bin_width)
+            for index, (start, end) in enumerate(ranges)]
+
+    if workers == 1:
+        results = [score_range(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(score_range, *zip(*jobs)))
+
+    stats = PowerStats(sample_size=sample_size, bin_width=bin_width)
+    for _, part in results:
+        stats.merge(part)
+    ranked = heapq.nlargest(top, (item for best, _ in results for item in best)) if top else []
+    return [(power, record) for power, _, _, record in ranked], stats
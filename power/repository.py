@@ -0,0 +1,283 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from power.atomic import atomic_write
+from power.events import ChangeNotifier
+from power.formats import load_json_roster
+from power.locking import FileLock
+from power.schema import VERSION_FIELD
+from power.trace import traced
+
+
+class VersionConflict(Exception):
+    """The stored mage changed since the caller read it, so its update was refused."""
+
+    def __init__(self, mage_id, expected, actual):
+        super().__init__(f"mage {mage_id!r} is at version {actual}, not {expected}")
+        self.mage_id = mage_id
+        self.expected = expected
+        self.actual = actual
+
+
+@traced("write_snapshot")
+def write_snapshot(path, records):
+    """Atomically replace ``path`` with a JSON array of ``records``.
+
+    The data goes through ``atomic_write``, so a crash mid-write never leaves
+    a truncated roster behind, and a reader opening ``path`` gets either the
+    old roster or the new one.
+    ``records`` may be any iterable; it is encoded one record at a time
+    (the same bytes ``json.dump`` of the list would write).
+    """
+    encode = json.JSONEncoder().encode
+    with atomic_write(path) as file:
+        file.write("[")
+        for count, record in enumerate(records):
+            if count:
+                file.write(", ")
+            file.write(encode(record))
+        file.write("]")
+
+
+class MageRepository(ChangeNotifier):
+    """In-memory, id-indexed view of a mage roster file.
+
+    The roster is parsed once and kept as an ``id -> record`` dict, whose
+    insertion order doubles as the on-disk order. The file is only re-read
+    when its mtime or size changes underneath us (e.g. another process wrote
+    it), so lookups and edits no longer pay for a full parse and scan.
+
+    Records handed out by ``get``/``all`` are the stored dicts themselves and
+    should be treated as read-only; pass a new dict to ``update`` instead.
+    Every write publishes a ``MageChange`` to subscribers. All public
+    methods are serialized by a lock, so the repository can be shared with a
+    background I/O thread.
+
+    Several processes can share the file. A write holds the roster's
+    ``FileLock`` while it re-reads anything another process committed,
+    applies the change and commits, so no process's mages are lost. Reads
+    take no file lock. Each stored record carries a ``version``, bumped on
+    every write; ``update`` can require the version it read, so edits made
+    elsewhere in the meantime are refused rather than overwritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = {}
+        self._stamp = None
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{path}.lock")
+
+    # Loading
+
+    def _file_stamp(self):
+        # The commit counter first: the files read after it are at least that new
+        generation = self._file_lock.generation()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return generation, st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_file(self):
+        """Read every record of the roster file; raises RosterFormatError if it is malformed."""
+        if not os.path.exists(self.path):
+            return []
+        return load_json_roster(self.path)
+
+    def _load_records(self):
+        records = {}
+        for mage in self._read_file():
+            mage.setdefault(VERSION_FIELD, 0)  # Written before records were versioned
+            records[mage["id"]] = mage
+        return records
+
+    @traced("repository.reload")
+    def reload(self):
+        """Re-read the roster file unconditionally."""
+        with self._lock:
+            stamp = self._file_stamp()
+            self._records = self._load_records()
+            self._stamp = stamp
+            self._publish("reload", None)
+
+    def _ensure_fresh(self):
+        if self._file_stamp() != self._stamp or self._stamp is None:
+            self.reload()
+
+    def stamp(self):
+        """Identify the on-disk state the in-memory roster matches, e.g. to validate caches."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._stamp
+
+    def _flush(self):
+        write_snapshot(self.path, self._records.values())
+        self._committed()
+
+    def _committed(self):
+        """Count a commit for the other processes and note the files now match memory."""
+        self._file_lock.bump()
+        self._stamp = self._file_stamp()
+
+    def _next_version(self, mage_data):
+        """A copy of ``mage_data`` at the version after the stored mage's (1 for a new mage)."""
+        current = self._records.get(mage_data["id"])
+        record = dict(mage_data)
+        record[VERSION_FIELD] = current[VERSION_FIELD] + 1 if current is not None else 1
+        return record
+
+    @contextmanager
+    def _persisting(self):
+        """Roll memory back to storage if the wrapped persistence hook fails.
+
+        Writes change ``_records`` before storing them; on failure the stamp
+        is cleared, so the next access reloads what storage actually holds.
+        """
+        try:
+            yield
+        except BaseException:
+            self._stamp = None
+            raise
+
+    # Persistence hooks; subclasses can store single-record changes more cheaply.
+
+    def _persist_upsert(self, mage_data):
+        self._flush()
+
+    def _persist_delete(self, mage_id):
+        self._flush()
+
+    def _persist_many(self, records):
+        self._flush()
+
+    def close(self):
+        """Release any resources held by the backend."""
+        self._file_lock.close()
+
+    # Queries
+
+    def all(self):
+        """Return every mage record in on-disk order."""
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._records.values())
+
+    def page(self, offset, limit):
+        """Return up to ``limit`` records starting at position ``offset``."""
+        with self._lock:
+            self._ensure_fresh()
+            return list(islice(self._records.values(), offset, offset + limit))
+
+    def get(self, mage_id, default=None):
+        with self._lock:
+            self._ensure_fresh()
+            return self._records.get(mage_id, default)
+
+    def __contains__(self, mage_id):
+        with self._lock:
+            self._ensure_fresh()
+            return mage_id in self._records
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._records)
+
+    def iter(self):
+        """Iterate over every mage record in on-disk order.
+
+        The roster is already in memory, so this only snapshots the record
+        references; backends that are not (SQLite) stream from storage.
+        """
+        return iter(self.all())
+
+    def __iter__(self):
+        return self.iter()
+
+    # Writes
+
+    # Each write holds the file lock from the freshness check to the commit,
+    # so it always applies to what the other processes last committed.
+
+    def insert(self, mage_data):
+        """Add a new mage; raises KeyError if the id is already taken."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            if mage_data["id"] in self._records:
+                raise KeyError(mage_data["id"])
+            self._records[mage_data["id"]] = record = self._next_version(mage_data)
+            with self._persisting():
+                self._persist_upsert(record)
+            self._publish("insert", record["id"], record)
+
+    def update(self, mage_data, expected_version=None):
+        """Replace an existing mage in place. Unknown ids are ignored.
+
+        With ``expected_version`` (the ``version`` of the record the edit
+        started from) the update only happens if the stored mage is still at
+        that version; otherwise VersionConflict is raised and nothing is
+        written, so the caller can re-read and retry.
+        """
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            current = self._records.get(mage_data["id"])
+            if current is None:
+                return False
+            if expected_version is not None and current[VERSION_FIELD] != expected_version:
+                raise VersionConflict(mage_data["id"], expected_version, current[VERSION_FIELD])
+            self._records[mage_data["id"]] = record = self._next_version(mage_data)
+            with self._persisting():
+                self._persist_upsert(record)
+            self._publish("update", record["id"], record)
+            return True
+
+    def upsert(self, mage_data):
+        """Replace the mage with the same id, or append it if it is new."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            kind = "update" if mage_data["id"] in self._records else "insert"
+            self._records[mage_data["id"]] = record = self._next_version(mage_data)
+            with self._persisting():
+                self._persist_upsert(record)
+            self._publish(kind, record["id"], record)
+
+    def upsert_many(self, records):
+        """Upsert several mages with a single write to storage."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            changes = []
+            for mage_data in records:
+                kind = "update" if mage_data["id"] in self._records else "insert"
+                self._records[mage_data["id"]] = record = self._next_version(mage_data)
+                changes.append((kind, record))
+            with self._persisting():
+                self._persist_many([record for _, record in changes])
+            for kind, record in changes:
+                self._publish(kind, record["id"], record)
+
+    def delete(self, mage_id):
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            if self._records.pop(mage_id, None) is None:
+                return False
+            with self._persisting():
+                self._persist_delete(mage_id)
+            self._publish("delete", mage_id)
+            return True
+
+
+def open_repository(path, backend="json", **options):
+    """Create the repository for ``path`` using the named storage backend."""
+    if backend == "json":
+        return MageRepository(path)
+    if backend == "journal":
+        from power.journal import JournalRepository
+        return JournalRepository(path, **options)
+    if backend == "sqlite":
+        from power.sqlite import SqliteRepository
+        return SqliteRepository(path, **options)
+    raise ValueError(f"Unknown storage backend: {backend!r}")
@@ -0,0 +1,12 @@
+"""Field layout of a serialized mage record, in ``Mage.to_dict`` order."""
+
+INFO_FIELDS = ("name", "age", "description", "years_practicing", "personality")
+
+# The eight inputs of calculate_power, in its positional order ("health" is its ``hp``).
+STAT_FIELDS = ("health", "mana", "stamina", "defense", "phys_atk", "mag_atk", "speed", "intelligence")
+
+FIELDS = ("id",) + INFO_FIELDS + STAT_FIELDS
+
+# Bookkeeping stored with each record but not part of the mage: bumped on every
+# write, so an update can check nobody changed the mage since it was read.
+VERSION_FIELD = "version"
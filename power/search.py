@@ -0,0 +1,296 @@
+import json
+import re
+import threading
+
+from power.atomic import atomic_write
+from power.events import ChangeFollower, comparable_stamp
+from power.sortedlist import SortedList
+
+TEXT_FIELDS = ("name", "description", "personality")
+MIN_FUZZY_LENGTH = 4  # Shorter query words only match exactly or by prefix
+
+_TOKEN = re.compile(r"\w+")
+_MAGIC = "mage-search"
+_VERSION = 1
+
+# Match quality of a query word against an indexed term, used for ranking
+_EXACT, _PREFIX, _FUZZY = 3, 2, 1
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a, b):
+    """Whether ``a`` becomes ``b`` with at most one insert, delete, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2]
+                                      and a[i + 2:] == b[i + 2:])
+
+
+def _quality(term, word, fuzzy):
+    if term == word:
+        return _EXACT
+    if term.startswith(word):
+        return _PREFIX
+    if fuzzy and len(word) >= MIN_FUZZY_LENGTH and _within_one_edit(term, word):
+        return _FUZZY
+    return 0
+
+
+def record_matches(record, query, fuzzy=True):
+    """Whether one mage record matches ``query`` the way ``SearchIndex.search`` would."""
+    terms = {term for field in TEXT_FIELDS for term in tokenize(record[field])}
+    return all(any(_quality(term, word, fuzzy) for term in terms) for word in tokenize(query))
+
+
+class SearchIndex(ChangeFollower):
+    """Inverted index over mage name, description and personality text.
+
+    Text is lowercased and split into words. Each term maps to the set of
+    document numbers containing it (document numbers follow roster order,
+    and ``_ids`` maps them back to mage ids). A sorted vocabulary answers
+    prefix queries with a bisect. Typos are caught by a deletion
+    neighbourhood: every term is also filed under each way of dropping one
+    of its characters. That table is the slowest part to build, so it is
+    made by ``prepare_fuzzy`` (or the first fuzzy query) and kept up to date
+    from then on.
+
+    Deleting a mage leaves a gap in the document numbers; once gaps make up
+    half of them, and whenever the index is saved, documents are renumbered.
+    The index is written to ``path + ".search"`` with the repository stamp
+    it matches, so a later start can load it instead of tokenizing every
+    mage again.
+    """
+
+    SUFFIX = ".search"
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._ids = []  # doc number -> mage id, None once deleted
+        self._docs = {}  # mage id -> doc number
+        self._terms = {}  # doc number -> tuple of its terms
+        self._postings = {}  # term -> set of doc numbers
+        self._vocabulary = SortedList()
+        self._variants = None  # term with one character deleted -> set of terms
+
+    # Maintenance
+
+    def rebuild(self, records):
+        with self._lock:
+            self._clear()
+            for record in records:
+                doc = self._new_doc(record["id"])
+                self._terms[doc] = terms = self._record_terms(record)
+                for term in terms:
+                    self._postings.setdefault(term, set()).add(doc)
+            self._index_vocabulary()
+
+    def _index_vocabulary(self):
+        self._vocabulary = SortedList(self._postings)
+        self._variants = None
+
+    @staticmethod
+    def _record_terms(record):
+        return tuple({term: None for field in TEXT_FIELDS for term in tokenize(record[field])})
+
+    def _new_doc(self, mage_id):
+        doc = self._docs[mage_id] = len(self._ids)
+        self._ids.append(mage_id)
+        return doc
+
+    def _link(self, term, doc):
+        docs = self._postings.get(term)
+        if docs is None:
+            docs = self._postings[term] = set()
+            self._vocabulary.add(term)
+            if self._variants is not None:
+                self._add_variants(term)
+        docs.add(doc)
+
+    def _unlink(self, term, doc):
+        docs = self._postings[term]
+        docs.discard(doc)
+        if not docs:
+            del self._postings[term]
+            self._vocabulary.remove(term)
+            if self._variants is not None and len(term) >= MIN_FUZZY_LENGTH:
+                for deletion in _deletions(term):
+                    self._variants[deletion].discard(term)
+
+    def set(self, record):
+        terms = self._record_terms(record)
+        with self._lock:
+            doc = self._docs.get(record["id"])
+            if doc is None:
+                doc = self._new_doc(record["id"])
+                old = ()
+            else:
+                old = self._terms[doc]
+                if old == terms:
+                    return
+            for term in set(old).difference(terms):
+                self._unlink(term, doc)
+            for term in set(terms).difference(old):
+                self._link(term, doc)
+            self._terms[doc] = terms
+
+    def discard(self, mage_id):
+        with self._lock:
+            doc = self._docs.pop(mage_id, None)
+            if doc is None:
+                return
+            self._ids[doc] = None
+            for term in self._terms.pop(doc):
+                self._unlink(term, doc)
+            if len(self._docs) * 2 < len(self._ids):
+                self._compact()
+
+    def _compact(self):
+        """Renumber the documents in roster order, dropping the slots of deleted mages."""
+        if len(self._ids) == len(self._docs):
+            return
+        self._ids = [mage_id for mage_id in self._ids if mage_id is not None]
+        renumbered = {self._docs[mage_id]: doc for doc, mage_id in enumerate(self._ids)}
+        self._docs = {mage_id: doc for doc, mage_id in enumerate(self._ids)}
+        self._terms = {renumbered[doc]: terms for doc, terms in self._terms.items()}
+        self._postings = {term: {renumbered[doc] for doc in docs} for term, docs in self._postings.items()}
+
+    def _add_variants(self, term):
+        if len(term) >= MIN_FUZZY_LENGTH:
+            for deletion in _deletions(term):
+                self._variants.setdefault(deletion, set()).add(term)
+
+    def prepare_fuzzy(self):
+        """Build the typo table now, e.g. on a background thread, instead of on the first fuzzy query."""
+        with self._lock:
+            self._ensure_variants()
+
+    def _ensure_variants(self):
+        if self._variants is None:
+            self._variants = {}
+            for term in self._postings:
+                self._add_variants(term)
+
+    # Queries
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _matching_terms(self, word, fuzzy):
+        """Yield ``(term, quality)`` for every indexed term that ``word`` matches."""
+        for term in self._vocabulary.islice(self._vocabulary.bisect_left(word)):
+            if not term.startswith(word):
+                break
+            yield term, _EXACT if term == word else _PREFIX
+        if not fuzzy or len(word) < MIN_FUZZY_LENGTH:
+            return
+        self._ensure_variants()
+        candidates = set(self._variants.get(word, ()))
+        for deletion in _deletions(word):
+            candidates.update(self._variants.get(deletion, ()))
+            if deletion in self._postings:
+                candidates.add(deletion)
+        for term in candidates:
+            if not term.startswith(word) and _within_one_edit(term, word):
+                yield term, _FUZZY
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Ids of mages whose text matches every word of ``query``, best matches first.
+
+        A word matches a term exactly, as a prefix of it (so the last word
+        can still be half typed) or, if ``fuzzy`` and the word is at least
+        MIN_FUZZY_LENGTH long, within one typo. Mages score the best match
+        quality per word; ties keep roster order. An empty query matches
+        nothing.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            # Per word, the docs it matches at each quality, best quality first
+            tiers = []
+            candidates = None
+            for word in dict.fromkeys(words):
+                by_quality = {_EXACT: [], _PREFIX: [], _FUZZY: []}
+                for term, quality in self._matching_terms(word, fuzzy):
+                    by_quality[quality].append(self._postings[term])
+                word_tiers = []
+                seen = set()
+                for quality, postings in by_quality.items():
+                    docs = set().union(*postings) - seen
+                    seen |= docs
+                    word_tiers.append((quality, docs))
+                candidates = seen if candidates is None else candidates & seen
+                if not candidates:
+                    return []
+                tiers.append(word_tiers)
+
+            if len(tiers) == 1:
+                # One word: the tiers are already the ranking
+                ranked = [doc for _, docs in tiers[0] for doc in sorted(docs & candidates)]
+            else:
+                scores = dict.fromkeys(candidates, 0)
+                for word_tiers in tiers:
+                    for quality, docs in word_tiers:
+                        for doc in docs & candidates:
+                            scores[doc] += quality
+                ranked = sorted(candidates, key=lambda doc: (-scores[doc], doc))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [self._ids[doc] for doc in ranked]
+
+    # Persistence
+
+    def save(self, stamp, path=None):
+        """Write the index as JSON, tagged with the roster ``stamp`` it reflects."""
+        path = path or self.path
+        with self._lock:
+            self._compact()
+            data = {"format": _MAGIC, "version": _VERSION, "stamp": stamp, "ids": self._ids,
+                    "postings": {term: sorted(docs) for term, docs in self._postings.items()}}
+            with atomic_write(path, encoding='utf-8') as file:
+                json.dump(data, file, separators=(",", ":"))
+
+    def load(self, stamp, path=None):
+        """Load a saved index if it was written for ``stamp``; return whether it was."""
+        path = path or self.path
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if (not isinstance(data, dict) or data.get("format") != _MAGIC or data.get("version") != _VERSION
+                or data.get("stamp") is None or data["stamp"] != comparable_stamp(stamp)):
+            return False
+
+        with self._lock:
+            self._clear()
+            self._ids = data["ids"]
+            self._docs = {mage_id: doc for doc, mage_id in enumerate(self._ids) if mage_id is not None}
+            terms = {doc: [] for doc in self._docs.values()}
+            for term, docs in data["postings"].items():
+                self._postings[term] = set(docs)
+                for doc in docs:
+                    terms[doc].append(term)
+            self._terms = {doc: tuple(doc_terms) for doc, doc_terms in terms.items()}
+            self._index_vocabulary()
+        return True
@@ -0,0 +1,172 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class SortedList:
+    """Sorted sequence of comparable keys with logarithmic updates and lookups.
+
+    Keys live in a list of sorted buckets of roughly ``load`` items, so an
+    insert or removal only shifts one bucket. A Fenwick tree over the bucket
+    lengths turns positions into buckets and back, so ``index`` and
+    positional slicing are logarithmic as well. Keys must be unique.
+    """
+
+    def __init__(self, keys=(), load=512, presorted=False):
+        keys = list(keys) if presorted else sorted(keys)
+        self._load = load
+        self._buckets = [keys[start:start + load] for start in range(0, len(keys), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+        self._tree = None
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __contains__(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return False
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        return bucket[j] == key
+
+    # Fenwick tree over bucket lengths; rebuilt lazily after buckets split or vanish
+
+    def _fenwick(self):
+        if self._tree is None:
+            tree = [0] * (len(self._buckets) + 1)
+            for i, bucket in enumerate(self._buckets, start=1):
+                tree[i] += len(bucket)
+                parent = i + (i & -i)
+                if parent < len(tree):
+                    tree[parent] += tree[i]
+            self._tree = tree
+        return self._tree
+
+    def _grow(self, bucket_index, delta):
+        if self._tree is None:
+            return
+        i = bucket_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket_index):
+        """Number of keys in the buckets before ``bucket_index``."""
+        tree = self._fenwick()
+        total = 0
+        i = bucket_index
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """Return ``(bucket index, offset)`` of the key at ``position``."""
+        tree = self._fenwick()
+        bucket_index = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = bucket_index + step
+            if nxt < len(tree) and tree[nxt] <= position:
+                bucket_index = nxt
+                position -= tree[nxt]
+            step >>= 1
+        return bucket_index, position
+
+    # Updates
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._tree = None
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._buckets[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._buckets[i], key)
+        self._len += 1
+        bucket = self._buckets[i]
+        if len(bucket) > 2 * self._load:
+            self._buckets[i:i + 1] = [bucket[:self._load], bucket[self._load:]]
+            self._maxes[i:i + 1] = [bucket[self._load - 1], bucket[-1]]
+            self._tree = None
+        else:
+            self._grow(i, 1)
+
+    def remove(self, key):
+        """Remove ``key``; raises KeyError if it is not present."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise KeyError(key)
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if bucket[j] != key:
+            raise KeyError(key)
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._tree = None
+        else:
+            self._maxes[i] = bucket[-1]
+            self._grow(i, -1)
+
+    # Positional queries
+
+    def index(self, key):
+        """Position of ``key``; raises KeyError if it is not present."""
+        i = bisect_left(self._maxes, key)
+        if i < len(self._maxes):
+            bucket = self._buckets[i]
+            j = bisect_left(bucket, key)
+            if bucket[j] == key:
+                return self._prefix(i) + j
+        raise KeyError(key)
+
+    def bisect_left(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._prefix(i) + bisect_left(self._buckets[i], key)
+
+    def bisect_right(self, key):
+        i = bisect_right(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._prefix(i) + bisect_right(self._buckets[i], key)
+
+    def islice(self, start=0, stop=None):
+        """Yield the keys at positions ``start`` up to ``stop``."""
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return
+        bucket_index, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._buckets[bucket_index][offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            bucket_index += 1
+            offset = 0
+
+    def irange(self, low, high):
+        """Yield the keys ``k`` with ``low <= k <= high`` in order."""
+        yield from self.islice(self.bisect_left(low), self.bisect_right(high))
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._len
+        if not 0 <= position < self._len:
+            raise IndexError(position)
+        bucket_index, offset = self._locate(position)
+        return self._buckets[bucket_index][offset]
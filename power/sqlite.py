@@ -0,0 +1,342 @@
+import os
+import sqlite3
+import threading
+
+from power.events import ChangeNotifier
+from power.formats import iter_records
+from power.formula import calculate_power
+from power.locking import FileLock
+from power.repository import VersionConflict, write_snapshot
+from power.schema import FIELDS, STAT_FIELDS, VERSION_FIELD
+
+# Columns other than id/name are declared without a type so SQLite keeps the
+# exact Python value (100 vs 100.0) and JSON export stays lossless.
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS mages (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    {untyped},
+    power REAL NOT NULL,
+    {version} INTEGER NOT NULL DEFAULT 0
+)
+""".format(untyped=",\n    ".join(FIELDS[2:]), version=VERSION_FIELD)
+
+_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS mages_power ON mages (power)",
+    "CREATE INDEX IF NOT EXISTS mages_name ON mages (name)",
+)
+
+_COLUMNS = ", ".join(FIELDS)
+_RECORD_FIELDS = FIELDS + (VERSION_FIELD,)
+_SELECT = "SELECT {} FROM mages".format(", ".join(_RECORD_FIELDS))
+_SELECT_AFTER = "SELECT rowid, {} FROM mages WHERE rowid > ? ORDER BY rowid LIMIT ?".format(", ".join(_RECORD_FIELDS))
+_UPSERT = ("INSERT INTO mages ({cols}, power, {version}) VALUES ({marks}, ?, 1) "
+           "ON CONFLICT(id) DO UPDATE SET {sets}, {version} = {version} + 1").format(
+    cols=_COLUMNS,
+    marks=", ".join("?" * len(FIELDS)),
+    sets=", ".join(f"{field} = excluded.{field}" for field in FIELDS[1:] + ("power",)),
+    version=VERSION_FIELD,
+)
+
+ITER_BATCH = 1000  # Rows fetched per query by ``iter``
+_SEEDED = 1  # PRAGMA user_version once the database has been seeded from the JSON roster
+
+_QUERYABLE = frozenset(FIELDS) | {"power"}
+_OPERATORS = frozenset({"<", "<=", "=", ">=", ">", "!="})
+
+
+def _row_values(mage_data):
+    power = calculate_power(*(mage_data[stat] for stat in STAT_FIELDS))
+    return tuple(mage_data[field] for field in FIELDS) + (power,)
+
+
+def _check_column(column):
+    if column not in _QUERYABLE:
+        raise ValueError(f"Unknown mage column: {column!r}")
+    return column
+
+
+class SqliteRepository(ChangeNotifier):
+    """Mage roster stored in an SQLite database.
+
+    Every field of ``Mage.to_dict`` is a column, and a ``power`` column is
+    computed with ``calculate_power`` on each write, so "top N by power" or
+    "intelligence > 150" run as indexed queries instead of Python scans.
+    It offers the same record API as ``MageRepository`` plus ``find``, and
+    like it serializes access with a lock so a worker thread can share it.
+    SQLite's own locking and transactions make it safe across processes;
+    records carry the same ``version`` column for optimistic updates.
+    Writers also hold a ``FileLock`` on the database and bump its commit
+    counter, so every instance notices commits made by the others: the
+    first read after one publishes a ``reload``, as ``MageRepository``
+    does when its file changes.
+
+    ``path`` is the JSON roster the database was created from; the database
+    itself defaults to the same name with a ``.db`` suffix. A new database is
+    seeded from ``path`` once, if that file exists (a database emptied by
+    deletes stays empty). From then on the database is the roster: writes
+    never reach ``path`` unless ``export_json`` is called.
+    """
+
+    def __init__(self, path, db_path=None):
+        self.path = path
+        self.db_path = db_path or os.path.splitext(path)[0] + ".db"
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(f"{self.db_path}.lock")
+        self._stamp = None
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._file_lock, self._conn:
+            # Immediate, so processes opening a new database together seed it only once
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(_CREATE_TABLE)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(mages)")}
+            if VERSION_FIELD not in columns:  # A database from before records were versioned
+                self._conn.execute(f"ALTER TABLE mages ADD COLUMN {VERSION_FIELD} INTEGER NOT NULL DEFAULT 0")
+            for statement in _CREATE_INDEXES:
+                self._conn.execute(statement)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SEEDED:
+                # Databases from before the marker count as seeded unless they are still empty
+                if not self._conn.execute("SELECT COUNT(*) FROM mages").fetchone()[0] and os.path.exists(path):
+                    self._import(path)
+                self._conn.execute(f"PRAGMA user_version = {_SEEDED}")
+                self._file_lock.bump()
+
+    def _file_stamp(self):
+        # The commit counter first: the database read after it is at least that new
+        generation = self._file_lock.generation()
+        st = os.stat(self.db_path)
+        return generation, st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _ensure_fresh(self):
+        """Publish a ``reload`` if another instance committed since we last looked."""
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._publish("reload", None)
+
+    def _committed(self):
+        """Count a commit for the other instances; call with the file lock held."""
+        self._file_lock.bump()
+        self._stamp = self._file_stamp()
+
+    def _exists(self, mage_id):
+        return self._conn.execute("SELECT 1 FROM mages WHERE id = ?", (mage_id,)).fetchone() is not None
+
+    @staticmethod
+    def _to_record(row):
+        return dict(zip(_RECORD_FIELDS, row))
+
+    def _stored(self, mage_data):
+        """``mage_data`` with the version just written; call inside the writing transaction."""
+        record = dict(mage_data)
+        record[VERSION_FIELD] = self._conn.execute(
+            f"SELECT {VERSION_FIELD} FROM mages WHERE id = ?", (mage_data["id"],)).fetchone()[0]
+        return record
+
+    # Queries
+
+    def all(self):
+        """Return every mage record in insertion order."""
+        with self._lock:
+            self._ensure_fresh()
+            rows = self._conn.execute(f"{_SELECT} ORDER BY rowid")
+            return [self._to_record(row) for row in rows]
+
+    def get(self, mage_id, default=None):
+        with self._lock:
+            self._ensure_fresh()
+            row = self._conn.execute(f"{_SELECT} WHERE id = ?", (mage_id,)).fetchone()
+            return self._to_record(row) if row else default
+
+    def find(self, where=(), order_by=None, descending=False, limit=None, offset=0):
+        """Return mage records matching every ``(column, op, value)`` in ``where``.
+
+        ``order_by`` may be any field or ``"power"``; the default is insertion
+        order. ``limit``/``offset`` select one page of the sorted result, e.g.
+        ``find(order_by="power", descending=True, limit=100)`` for the top 100.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            clauses = []
+            params = []
+            for column, op, value in where:
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported operator: {op!r}")
+                clauses.append(f"{_check_column(column)} {op} ?")
+                params.append(value)
+
+            sql = _SELECT
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY {_check_column(order_by) if order_by else 'rowid'}"
+            if descending:
+                sql += " DESC"
+            if limit is not None or offset:
+                sql += " LIMIT ? OFFSET ?"
+                params.extend([-1 if limit is None else limit, offset])
+            return [self._to_record(row) for row in self._conn.execute(sql, params)]
+
+    def page(self, offset, limit):
+        """Return up to ``limit`` records starting at position ``offset``."""
+        return self.find(limit=limit, offset=offset)
+
+    def stamp(self):
+        """Identify the current state of the database file, e.g. to validate caches."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._stamp
+
+    def __contains__(self, mage_id):
+        with self._lock:
+            self._ensure_fresh()
+            return self._exists(mage_id)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_fresh()
+            return self._conn.execute("SELECT COUNT(*) FROM mages").fetchone()[0]
+
+    def iter(self, batch_size=ITER_BATCH):
+        """Yield every mage record in insertion order, fetching ``batch_size`` rows per query.
+
+        Only one batch is in memory at a time, and the lock is released
+        between batches, so writers are not held up by a long scan.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(_SELECT_AFTER, (last, batch_size)).fetchall()
+            for row in rows:
+                yield self._to_record(row[1:])
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def __iter__(self):
+        return self.iter()
+
+    # Writes
+
+    # Each write holds the file lock from the freshness check to the bump, so
+    # the counter accounts for every commit before it.
+
+    def insert(self, mage_data):
+        """Add a new mage; raises KeyError if the id is already taken."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        f"INSERT INTO mages ({_COLUMNS}, power, {VERSION_FIELD}) "
+                        f"VALUES ({', '.join('?' * (len(FIELDS) + 1))}, 1)",
+                        _row_values(mage_data))
+            except sqlite3.IntegrityError:
+                raise KeyError(mage_data["id"]) from None
+            self._committed()
+            record = dict(mage_data)
+            record[VERSION_FIELD] = 1
+            self._publish("insert", record["id"], record)
+
+    def update(self, mage_data, expected_version=None):
+        """Replace an existing mage in place. Unknown ids are ignored.
+
+        With ``expected_version`` the row is only written if it is still at
+        that version; otherwise VersionConflict is raised, as in MageRepository.
+        """
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            values = _row_values(mage_data)
+            sql = "UPDATE mages SET {}, {version} = {version} + 1 WHERE id = ?".format(
+                ", ".join(f"{field} = ?" for field in FIELDS[1:] + ("power",)), version=VERSION_FIELD)
+            params = values[1:] + values[:1]
+            if expected_version is not None:
+                sql += f" AND {VERSION_FIELD} = ?"
+                params += (expected_version,)
+            with self._conn:
+                if self._conn.execute(sql, params).rowcount:
+                    record = self._stored(mage_data)
+                else:
+                    record = None
+                    current = self._conn.execute(
+                        f"SELECT {VERSION_FIELD} FROM mages WHERE id = ?", (mage_data["id"],)).fetchone()
+            if record is None:
+                if current is None:
+                    return False
+                raise VersionConflict(mage_data["id"], expected_version, current[0])
+            self._committed()
+            self._publish("update", record["id"], record)
+            return True
+
+    def upsert(self, mage_data):
+        """Replace the mage with the same id, or append it if it is new."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            with self._conn:
+                # Immediate, so the insert/update check sees the row the upsert writes over
+                self._conn.execute("BEGIN IMMEDIATE")
+                kind = "update" if self._exists(mage_data["id"]) else "insert"
+                self._conn.execute(_UPSERT, _row_values(mage_data))
+                record = self._stored(mage_data)
+            self._committed()
+            self._publish(kind, record["id"], record)
+
+    def upsert_many(self, records):
+        """Upsert several mages in a single transaction."""
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            records = [dict(mage_data) for mage_data in records]
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                kinds = ["update" if self._exists(record["id"]) else "insert" for record in records]
+                self._conn.executemany(_UPSERT, map(_row_values, records))
+                records = [self._stored(record) for record in records]
+            self._committed()
+            for kind, record in zip(kinds, records):
+                self._publish(kind, record["id"], record)
+
+    def delete(self, mage_id):
+        with self._lock, self._file_lock:
+            self._ensure_fresh()
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM mages WHERE id = ?", (mage_id,))
+            if not cursor.rowcount:
+                return False
+            self._committed()
+            self._publish("delete", mage_id)
+            return True
+
+    # Bulk import/export
+
+    def _import(self, path):
+        mages = iter_records(path, "json")
+        count = 0
+
+        def rows():
+            nonlocal count
+            for count, mage in enumerate(mages, start=1):
+                yield _row_values(mage)
+
+        self._conn.executemany(_UPSERT, rows())
+        return count
+
+    def import_json(self, path=None):
+        """Stream every mage from a JSON roster file into the database in a single transaction."""
+        with self._lock, self._file_lock:
+            with self._conn:
+                count = self._import(path or self.path)
+            self._file_lock.bump()  # Left for _ensure_fresh, so our own views reload too
+            return count
+
+    def export_json(self, path=None):
+        """Write the whole roster as a JSON file in the ``cmd.json`` format.
+
+        The database never writes the JSON roster by itself; call this to
+        bring ``path`` (default: the roster the database was seeded from) up
+        to date, e.g. before switching back to the json backend.
+        """
+        write_snapshot(path or self.path, self.iter())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._file_lock.close()
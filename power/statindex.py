@@ -0,0 +1,171 @@
+import math
+import re
+import threading
+from collections import namedtuple
+
+from power.events import ChangeFollower
+from power.schema import STAT_FIELDS
+from power.sortedlist import SortedList
+
+INDEXED_FIELDS = STAT_FIELDS + ("age", "years_practicing")
+
+# Bounds are None when open; include_* say whether the bound itself matches.
+Range = namedtuple("Range", ["field", "low", "high", "include_low", "include_high"], defaults=[None, None, True, True])
+
+_PREDICATE = re.compile(r"(\w+)\s*(<=|>=|==|=|<|>)\s*(-?[\d.]+(?:e-?\d+)?)", re.IGNORECASE)
+
+
+def parse_predicates(text):
+    """Parse filter text like ``"speed>=150, speed<=200, mag_atk>10"`` into Ranges."""
+    predicates = []
+    position = 0
+    for match in _PREDICATE.finditer(text):
+        if text[position:match.start()].strip(" ,;"):
+            break
+        field, op, value = match.group(1).lower(), match.group(2), float(match.group(3))
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot filter on {field!r}; use one of {', '.join(INDEXED_FIELDS)}")
+        if op in ("==", "="):
+            predicates.append(Range(field, value, value))
+        elif op.startswith(">"):
+            predicates.append(Range(field, low=value, include_low=op == ">="))
+        else:
+            predicates.append(Range(field, high=value, include_high=op == "<="))
+        position = match.end()
+    if text[position:].strip(" ,;"):
+        raise ValueError(f"Cannot parse filter near {text[position:].strip()!r}; expected e.g. speed>=150")
+    return predicates
+
+
+def _within(value, predicate):
+    _, low, high, include_low, include_high = predicate
+    if low is not None and (value < low if include_low else value <= low):
+        return False
+    if high is not None and (value > high if include_high else value >= high):
+        return False
+    return True
+
+
+def merge(predicates):
+    """Combine predicates on the same field into one Range with the tightest bounds."""
+    merged = {}
+    for predicate in predicates:
+        current = merged.get(predicate.field)
+        if current is None:
+            merged[predicate.field] = predicate
+            continue
+        low, include_low = current.low, current.include_low
+        if predicate.low is not None and (low is None or predicate.low > low or
+                                          (predicate.low == low and not predicate.include_low)):
+            low, include_low = predicate.low, predicate.include_low
+        high, include_high = current.high, current.include_high
+        if predicate.high is not None and (high is None or predicate.high < high or
+                                           (predicate.high == high and not predicate.include_high)):
+            high, include_high = predicate.high, predicate.include_high
+        merged[predicate.field] = Range(predicate.field, low, high, include_low, include_high)
+    return list(merged.values())
+
+
+def matches(record, predicates):
+    """Whether ``record`` satisfies every predicate (used to re-check a single changed mage)."""
+    return all(_within(record[predicate.field], predicate) for predicate in predicates)
+
+
+class StatIndex(ChangeFollower):
+    """Secondary range index over the power stats plus age and years_practicing.
+
+    Each column is a SortedList of ``(value, id)`` keys, so the number of
+    mages inside a range is two bisects. ``query`` counts every predicate,
+    walks only the most selective one and checks the rest against the
+    stored values, then returns ids in roster order. Each published write
+    moves only that mage's keys, so queries stay exact without rebuilding.
+    """
+
+    def __init__(self):
+        self._columns = {field: SortedList() for field in INDEXED_FIELDS}
+        self._values = {}  # id -> tuple of INDEXED_FIELDS values
+        self._order = {}  # id -> roster position, for sorting results
+        self._next_order = 0
+        self._lock = threading.Lock()
+
+    # Maintenance
+
+    def rebuild(self, records):
+        values = {record["id"]: tuple(record[field] for field in INDEXED_FIELDS) for record in records}
+        columns = {field: SortedList((row[i], mage_id) for mage_id, row in values.items())
+                   for i, field in enumerate(INDEXED_FIELDS)}
+        with self._lock:
+            self._values = values
+            self._columns = columns
+            self._order = {mage_id: position for position, mage_id in enumerate(values)}
+            self._next_order = len(values)
+
+    def set(self, record):
+        mage_id = record["id"]
+        row = tuple(record[field] for field in INDEXED_FIELDS)
+        with self._lock:
+            old = self._values.get(mage_id)
+            if old == row:
+                return
+            for i, field in enumerate(INDEXED_FIELDS):
+                if old is None or old[i] != row[i]:
+                    if old is not None:
+                        self._columns[field].remove((old[i], mage_id))
+                    self._columns[field].add((row[i], mage_id))
+            self._values[mage_id] = row
+            if mage_id not in self._order:
+                self._order[mage_id] = self._next_order
+                self._next_order += 1
+
+    def discard(self, mage_id):
+        with self._lock:
+            old = self._values.pop(mage_id, None)
+            if old is None:
+                return
+            for i, field in enumerate(INDEXED_FIELDS):
+                self._columns[field].remove((old[i], mage_id))
+            del self._order[mage_id]
+
+    # Queries
+
+    def __len__(self):
+        return len(self._values)
+
+    def _positions(self, predicate):
+        column = self._columns[predicate.field]
+        if predicate.low is None:
+            start = 0
+        else:
+            # (v,) sorts before every (v, id), so this is "first key with value >= / > low"
+            low = predicate.low if predicate.include_low else math.nextafter(predicate.low, math.inf)
+            start = column.bisect_left((low,))
+        if predicate.high is None:
+            stop = len(column)
+        else:
+            high = math.nextafter(predicate.high, math.inf) if predicate.include_high else predicate.high
+            stop = column.bisect_left((high,))
+        return start, max(start, stop)
+
+    def count(self, predicate):
+        """Number of mages satisfying one Range."""
+        with self._lock:
+            start, stop = self._positions(predicate)
+            return stop - start
+
+    def query(self, predicates):
+        """Ids of the mages satisfying every Range in ``predicates``, in roster order."""
+        with self._lock:
+            if not predicates:
+                return sorted(self._values, key=self._order.__getitem__)
+            spans = [(self._positions(predicate), predicate) for predicate in merge(predicates)]
+            (start, stop), driver = min(spans, key=lambda span: span[0][1] - span[0][0])
+            rest = [predicate for _, predicate in spans if predicate is not driver]
+            checks = [(INDEXED_FIELDS.index(predicate.field), predicate) for predicate in rest]
+
+            found = []
+            for _, mage_id in self._columns[driver.field].islice(start, stop):
+                row = self._values[mage_id]
+                if all(_within(row[i], predicate) for i, predicate in checks):
+                    found.append(mage_id)
+            found.sort(key=self._order.__getitem__)
+            return found
@@ -0,0 +1,150 @@
+"""What-if sweeps: power over a range of one or two stats, and its slopes.
+
+``sweep_1d`` and ``sweep_2d`` hold every stat but the swept ones at a
+mage's current values and score the whole grid in one pass (with NumPy,
+calculate_power broadcasts over the axes, so a 500x500 grid is a single
+vectorized evaluation). ``sensitivities`` gives the partial derivative of
+power with respect to each stat. ``SweepWorker`` runs sweeps off the GUI
+thread, always working on the newest request.
+"""
+import queue
+import sys
+import threading
+import traceback
+
+from power.formula import calculate_power, np, power_gradient
+from power.schema import STAT_FIELDS
+
+
+def axis(low, high, points):
+    """``points`` evenly spaced values from ``low`` to ``high`` inclusive."""
+    if np is not None:
+        return np.linspace(low, high, points)
+    if points == 1:
+        return [float(low)]
+    step = (high - low) / (points - 1)
+    return [low + i * step for i in range(points)]
+
+
+def sweep_1d(stats, stat, low, high, points=500):
+    """Power as ``stat`` runs from ``low`` to ``high``, the other stats held; returns ``(values, powers)``."""
+    values = axis(low, high, points)
+    if np is not None:
+        args = [values if name == stat else stats[name] for name in STAT_FIELDS]
+        return values, np.broadcast_to(calculate_power(*args), values.shape)
+    args = [stats[name] for name in STAT_FIELDS]
+    index = STAT_FIELDS.index(stat)
+    powers = []
+    for value in values:
+        args[index] = value
+        powers.append(calculate_power(*args))
+    return values, powers
+
+
+def sweep_2d(stats, x_stat, y_stat, x_range, y_range, shape=(500, 500)):
+    """Power over a grid of two stats, the others held at ``stats``.
+
+    ``x_range`` and ``y_range`` are ``(low, high)`` pairs and ``shape`` is
+    ``(x points, y points)``. Returns ``(xs, ys, powers)`` where
+    ``powers[j][i]`` is the power at ``xs[i]``, ``ys[j]``.
+    """
+    if x_stat == y_stat:
+        raise ValueError("Sweep two different stats")
+    xs, ys = axis(*x_range, shape[0]), axis(*y_range, shape[1])
+    if np is not None:
+        grid_x, grid_y = xs[None, :], ys[:, None]
+        args = [grid_x if name == x_stat else grid_y if name == y_stat else stats[name] for name in STAT_FIELDS]
+        return xs, ys, np.broadcast_to(calculate_power(*args), (len(ys), len(xs)))
+    args = [stats[name] for name in STAT_FIELDS]
+    x_index, y_index = STAT_FIELDS.index(x_stat), STAT_FIELDS.index(y_stat)
+    rows = []
+    for y in ys:
+        args[y_index] = y
+        row = []
+        for x in xs:
+            args[x_index] = x
+            row.append(calculate_power(*args))
+        rows.append(row)
+    return xs, ys, rows
+
+
+def sensitivities(stats):
+    """``{stat: d(power)/d(stat)}`` at ``stats``: the power gained per extra point of each stat."""
+    return dict(zip(STAT_FIELDS, power_gradient(*(stats[stat] for stat in STAT_FIELDS))))
+
+
+class SweepWorker:
+    """Runs sweep jobs on a background thread, newest request first.
+
+    A job is a generator function; each value it yields (e.g. a coarse grid,
+    then the full one) is passed to ``on_result`` on the GUI thread, picked
+    up by ``root.after`` polling like the IOWorker. ``request`` replaces any
+    job that has not started, and a running job stops after its current
+    yield once a newer one is waiting, so a burst of slider moves never
+    queues up stale work. Results older than one already delivered are
+    dropped; newer partial results are still shown while dragging.
+    """
+
+    POLL_MS = 20
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None
+        self._latest = 0
+        self._delivered = 0
+        self._closed = False
+        self._results = queue.Queue()
+        self._root = None
+        self._after = None
+        self._thread = threading.Thread(target=self._run, name="mage-sweep", daemon=True)
+        self._thread.start()
+
+    def attach(self, root):
+        """Start delivering results through ``root.after`` polling."""
+        if self._root is None:
+            self._root = root
+            self._poll()
+
+    def _poll(self):
+        while True:
+            try:
+                job_id, on_result, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if job_id >= self._delivered:
+                self._delivered = job_id
+                on_result(result)
+        if self._root is not None:
+            self._after = self._root.after(self.POLL_MS, self._poll)
+
+    def request(self, job, *args, on_result):
+        with self._condition:
+            self._latest += 1
+            self._pending = (self._latest, job, args, on_result)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                job_id, job, args, on_result = self._pending
+                self._pending = None
+            try:
+                for result in job(*args):
+                    self._results.put((job_id, on_result, result))
+                    if self._pending is not None:
+                        break  # A newer request is waiting
+            except Exception as error:
+                traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    def close(self):
+        """Stop polling and end the worker thread once its current job step is done."""
+        if self._root is not None and self._after is not None:
+            self._root.after_cancel(self._after)
+        self._root = None
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
@@ -0,0 +1,305 @@
+from array import array
+
+from power.formula import calculate_power, calculate_power_batch, np
+from power.schema import FIELDS, STAT_FIELDS
+
+NUMERIC_FIELDS = STAT_FIELDS + ("age", "years_practicing")
+_INT_BITS = {field: 1 << bit for bit, field in enumerate(NUMERIC_FIELDS)}  # Per-row flag: the value was an int
+
+
+def _number(mage_id, field, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"mage {mage_id!r}: {field} is not a number")
+    return float(value)
+
+
+class InternedColumn:
+    """String column for low-cardinality text: each distinct value is stored once."""
+
+    def __init__(self):
+        self._values = []
+        self._codes = {}
+        self._rows = array('I')
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def append(self, value):
+        self._rows.append(self._code(value))
+
+    def __getitem__(self, row):
+        return self._values[self._rows[row]]
+
+    def __setitem__(self, row, value):
+        self._rows[row] = self._code(value)
+
+    def remove(self, row):
+        """Drop ``row`` by moving the last row into its place."""
+        last = self._rows.pop()
+        if row < len(self._rows):
+            self._rows[row] = last
+
+    def nbytes(self):
+        return self._rows.itemsize * len(self._rows) + sum(len(value) for value in self._values)
+
+
+class HeapColumn:
+    """String column stored as UTF-8 in one shared heap, addressed by (offset, length).
+
+    Overwriting a value appends the new bytes and leaves the old ones as
+    garbage; ``compact`` rewrites the heap once that matters.
+    """
+
+    def __init__(self):
+        self._heap = bytearray()
+        self._offsets = array('Q')
+        self._lengths = array('I')
+
+    def _store(self, value):
+        data = value.encode('utf-8')
+        offset = len(self._heap)
+        self._heap += data
+        return offset, len(data)
+
+    def append(self, value):
+        offset, length = self._store(value)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+
+    def __getitem__(self, row):
+        offset = self._offsets[row]
+        return self._heap[offset:offset + self._lengths[row]].decode('utf-8')
+
+    def __setitem__(self, row, value):
+        self._offsets[row], self._lengths[row] = self._store(value)
+
+    def remove(self, row):
+        """Drop ``row`` by moving the last row into its place."""
+        offset, length = self._offsets.pop(), self._lengths.pop()
+        if row < len(self._offsets):
+            self._offsets[row], self._lengths[row] = offset, length
+
+    def compact(self):
+        values = [self[row] for row in range(len(self._offsets))]
+        self.__init__()
+        for value in values:
+            self.append(value)
+
+    def nbytes(self):
+        return len(self._heap) + self._offsets.itemsize * len(self._offsets) + self._lengths.itemsize * len(
+            self._lengths)
+
+
+class MageRow:
+    """Lightweight view of one MageTable row with the ``Mage`` getter/setter API.
+
+    The view holds only the table and the mage id, so it stays valid while
+    other rows are added or deleted.
+    """
+
+    __slots__ = ("_table", "id")
+
+    def __init__(self, table, mage_id):
+        self._table = table
+        self.id = mage_id
+
+    def _get(self, field):
+        return self._table.get_value(self.id, field)
+
+    def _set(self, field, value):
+        self._table.set_value(self.id, field, value)
+
+    @property
+    def power(self):
+        return calculate_power(*(self._get(stat) for stat in STAT_FIELDS))
+
+    def get_name(self):
+        return self._get("name")
+
+    def set_name(self, name):
+        self._set("name", name)
+
+    def get_age(self):
+        return self._get("age")
+
+    def set_age(self, age):
+        self._set("age", age)
+
+    def get_description(self):
+        return self._get("description")
+
+    def set_description(self, description):
+        self._set("description", description)
+
+    def get_years_practicing(self):
+        return self._get("years_practicing")
+
+    def set_years_practicing(self, years):
+        self._set("years_practicing", years)
+
+    def get_personality(self):
+        return self._get("personality")
+
+    def set_personality(self, personality):
+        self._set("personality", personality)
+
+    def get_stat(self, stat_name):
+        return self._get(stat_name)
+
+    def set_stat(self, stat_name, value):
+        self._set(stat_name, value)
+
+    def set_stats(self, health, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence):
+        for stat, value in zip(STAT_FIELDS, (health, mana, stamina, defense, phys_atk, mag_atk, speed, intelligence)):
+            self._set(stat, value)
+
+    def get_id(self):
+        return self.id
+
+    def to_dict(self):
+        return self._table.record(self.id)
+
+
+class MageTable:
+    """Column-oriented store for large rosters.
+
+    The eight stats, age and years_practicing live in contiguous
+    ``array('d')`` columns, with a per-row bit mask recording which values
+    were ints (as in the binary roster format), so ``record`` returns exactly
+    what was stored; a mage costs a few dozen bytes instead of a ``Mage``
+    object or record dict. Names and descriptions are
+    kept in UTF-8 heaps and personalities are interned. ``row(id)`` returns
+    a ``MageRow`` view exposing the usual ``Mage`` accessors.
+
+    Deleting a mage moves the last row into its slot, so row order is only
+    the insertion order until the first delete.
+    """
+
+    def __init__(self, records=()):
+        self._ids = []
+        self._rows = {}
+        self._numbers = {field: array('d') for field in NUMERIC_FIELDS}
+        self._int_flags = array('H')
+        self._texts = {
+            "name": HeapColumn(),
+            "description": HeapColumn(),
+            "personality": InternedColumn(),
+        }
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, mage_id):
+        return mage_id in self._rows
+
+    def __iter__(self):
+        return (MageRow(self, mage_id) for mage_id in self._ids)
+
+    def ids(self):
+        return list(self._ids)
+
+    def row(self, mage_id):
+        if mage_id not in self._rows:
+            raise KeyError(mage_id)
+        return MageRow(self, mage_id)
+
+    # Cell access
+
+    def _cell(self, row, field):
+        column = self._numbers.get(field)
+        if column is None:
+            return self._texts[field][row]
+        value = column[row]
+        return int(value) if self._int_flags[row] & _INT_BITS[field] else value
+
+    def get_value(self, mage_id, field):
+        if field == "id":
+            return mage_id
+        return self._cell(self._rows[mage_id], field)
+
+    def set_value(self, mage_id, field, value):
+        row = self._rows[mage_id]
+        column = self._numbers.get(field)
+        if column is None:
+            self._texts[field][row] = value
+            return
+        column[row] = _number(mage_id, field, value)
+        if isinstance(value, int):
+            self._int_flags[row] |= _INT_BITS[field]
+        else:
+            self._int_flags[row] &= ~_INT_BITS[field]
+
+    def record(self, mage_id):
+        """Return the mage as a dict in the ``Mage.to_dict`` layout."""
+        row = self._rows[mage_id]
+        return {field: mage_id if field == "id" else self._cell(row, field) for field in FIELDS}
+
+    def records(self):
+        return [self.record(mage_id) for mage_id in self._ids]
+
+    # Row changes
+
+    def append(self, record):
+        mage_id = record["id"]
+        if mage_id in self._rows:
+            raise KeyError(mage_id)
+        numbers = [_number(mage_id, field, record[field]) for field in NUMERIC_FIELDS]
+        self._rows[mage_id] = len(self._ids)
+        self._ids.append(mage_id)
+        for column, value in zip(self._numbers.values(), numbers):
+            column.append(value)
+        self._int_flags.append(sum(bit for field, bit in _INT_BITS.items() if isinstance(record[field], int)))
+        for field, column in self._texts.items():
+            column.append(record[field])
+
+    def update(self, record):
+        for field in FIELDS[1:]:
+            self.set_value(record["id"], field, record[field])
+
+    def upsert(self, record):
+        if record["id"] in self._rows:
+            self.update(record)
+        else:
+            self.append(record)
+
+    def delete(self, mage_id):
+        row = self._rows.pop(mage_id)
+        last_id = self._ids.pop()
+        if last_id != mage_id:
+            # Move the last row into the freed slot.
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+        for column in (*self._numbers.values(), self._int_flags):
+            last = column.pop()
+            if row < len(column):
+                column[row] = last
+        for column in self._texts.values():
+            column.remove(row)
+
+    # Column access
+
+    def stat_column(self, stat):
+        """Return a zero-copy view of a numeric column (NumPy array if available).
+
+        The view pins the underlying array: drop it before appending or
+        deleting rows, or the resize fails with BufferError.
+        """
+        column = self._numbers[stat]
+        if np is not None:
+            return np.frombuffer(column, dtype=np.float64)
+        return memoryview(column)
+
+    def powers(self):
+        """Return the power of every row, in row order, via calculate_power_batch."""
+        return calculate_power_batch({stat: self.stat_column(stat) for stat in STAT_FIELDS})
+
+    def nbytes(self):
+        """Approximate payload size of the columns, excluding the id index."""
+        return sum(column.itemsize * len(column) for column in (*self._numbers.values(), self._int_flags)) + sum(
+            column.nbytes() for column in self._texts.values())
@@ -0,0 +1,169 @@
+"""Lightweight timing spans and call counters for finding where the time goes.
+
+Tracing is switched on by the ``MAGE_TRACE`` environment variable, read
+once at import: ``MAGE_TRACE=1`` records spans in memory, and any other
+value is also taken as a file name the Chrome trace is written to on exit
+(see ``export_chrome``; open it in chrome://tracing or Perfetto). When it
+is off, ``traced`` and ``counted`` return the function itself and ``span``
+returns a shared no-op context manager, so instrumented code runs at full
+speed.
+
+Spans are timed with ``perf_counter_ns`` and kept both as a bounded list of
+events, for the flame view, and as per-name totals for ``summary``.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+from power.atomic import atomic_write
+
+_SETTING = os.environ.get("MAGE_TRACE", "")
+ENABLED = _SETTING not in ("", "0")
+EXPORT_PATH = _SETTING if ENABLED and _SETTING != "1" else None
+MAX_EVENTS = 200_000  # Oldest spans are dropped from the event list past this; totals stay exact
+
+_events = deque(maxlen=MAX_EVENTS)  # (name, start_ns, duration_ns, thread id)
+_totals = {}  # name -> [count, total_ns, max_ns]
+_counters = {}  # name -> calls
+_thread_names = {}
+_lock = threading.Lock()
+_origin_ns = time.perf_counter_ns()
+_NULL_SPAN = nullcontext()
+
+
+def add_span(name, start_ns, duration_ns):
+    """Record a span measured elsewhere, e.g. a latency that starts in one callback and ends in another."""
+    thread = threading.get_ident()
+    with _lock:
+        _events.append((name, start_ns, duration_ns, thread))
+        total = _totals.get(name)
+        if total is None:
+            _totals[name] = [1, duration_ns, duration_ns]
+        else:
+            total[0] += 1
+            total[1] += duration_ns
+            if duration_ns > total[2]:
+                total[2] = duration_ns
+        if thread not in _thread_names:
+            _thread_names[thread] = threading.current_thread().name
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_span(self.name, self.start, time.perf_counter_ns() - self.start)
+
+
+def span(name):
+    """Context manager timing its block as ``name``."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+
+def traced(name=None):
+    """Decorator timing every call of the function (named after its qualname by default)."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_span(label, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def counted(name=None):
+    """Decorator counting calls without timing them, for functions too cheap to time individually."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+        _counters[label] = 0
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Unlocked: a lost increment under thread contention is acceptable for a counter
+            _counters[label] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_callbacks(call_wrapper):
+    """Subclass tkinter's ``CallWrapper`` so every Tk callback is timed.
+
+    Assign the result back to ``tkinter.CallWrapper`` before widgets are
+    created; event bindings, widget commands, ``after`` callbacks and
+    variable traces then each record a ``tk:<handler>`` span.
+    """
+    class TimedCallWrapper(call_wrapper):
+        def __init__(self, func, subst, widget):
+            super().__init__(func, subst, widget)
+            self.span_name = "tk:" + getattr(func, "__qualname__", type(func).__name__)
+
+        def __call__(self, *args):
+            start = time.perf_counter_ns()
+            try:
+                return super().__call__(*args)
+            finally:
+                add_span(self.span_name, start, time.perf_counter_ns() - start)
+    return TimedCallWrapper
+
+
+# Reporting
+
+def summary():
+    """Per-span ``(name, count, total_ms, mean_ms, max_ms)`` rows, most total time first, and the call counters."""
+    with _lock:
+        rows = [(name, count, total / 1e6, total / count / 1e6, longest / 1e6)
+                for name, (count, total, longest) in _totals.items()]
+        counters = dict(_counters)
+    rows.sort(key=lambda row: -row[2])
+    return rows, counters
+
+
+def reset():
+    """Forget every recorded span and zero the counters."""
+    with _lock:
+        _events.clear()
+        _totals.clear()
+        for name in _counters:
+            _counters[name] = 0
+
+
+def export_chrome(path):
+    """Write the recorded spans as Chrome trace-event JSON (complete "X" events, times in microseconds)."""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+        thread_names = dict(_thread_names)
+    trace_events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+                    for thread, name in thread_names.items()]
+    trace_events.extend({"name": name, "cat": name.partition(":")[0] if ":" in name else "app", "ph": "X",
+                         "ts": (start - _origin_ns) / 1000, "dur": duration / 1000, "pid": pid, "tid": thread}
+                        for name, start, duration, thread in events)
+    if counters:
+        # Totals at export time; per-call counter events would cost more than the calls they count
+        now = (time.perf_counter_ns() - _origin_ns) / 1000
+        trace_events.append({"name": "calls", "ph": "C", "ts": now, "pid": pid, "args": counters})
+
+    with atomic_write(path, encoding='utf-8') as file:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
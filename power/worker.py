@@ -0,0 +1,132 @@
+import queue
+import sys
+import threading
+import traceback
+
+from power.trace import span
+
+
+class IOWorker:
+    """Runs repository loads and saves on a dedicated background thread.
+
+    ``submit`` queues a call for the worker; its result (or exception) is
+    handed to ``on_done``/``on_error`` back on the GUI thread. The GUI thread
+    picks results up by polling with ``root.after`` once ``attach(root)`` has
+    been called, so Tk is only ever touched from the thread that owns it.
+
+    ``save`` coalesces writes: records are buffered per mage id for
+    ``save_delay`` seconds, and everything buffered by then goes to storage in
+    one ``upsert_many``, so a burst of edits costs a single write. The delay
+    runs on a timer, so loads queued meanwhile are not held up; a failed
+    write is handed to ``on_save_error`` on the GUI thread, and its records
+    stay queued to go out with the next save (or ``close``).
+    """
+
+    POLL_MS = 20
+
+    def __init__(self, repository, save_delay=0.25, on_save_error=None):
+        self.repository = repository
+        self.save_delay = save_delay
+        self.on_save_error = on_save_error
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._pending_saves = {}
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._root = None
+        self._thread = threading.Thread(target=self._run, name="mage-io", daemon=True)
+        self._thread.start()
+
+    # GUI side
+
+    def attach(self, root):
+        """Start delivering results through ``root.after`` polling."""
+        if self._root is None:
+            self._root = root
+            self._poll()
+
+    def _poll(self):
+        self.drain()
+        if self._root is not None:
+            self._root.after(self.POLL_MS, self._poll)
+
+    def drain(self):
+        """Run every queued completion callback in the calling thread."""
+        while True:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
+
+    def call_soon(self, callback, *args):
+        """Schedule ``callback(*args)`` on the GUI thread; safe from any thread."""
+        self._results.put((callback, args))
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run ``func(*args)`` on the worker thread."""
+        self._tasks.put((func, args, on_done, on_error))
+
+    def save(self, mage_data):
+        """Queue a mage for saving, merging it with any unsaved edit of the same mage."""
+        with self._save_lock:
+            self._pending_saves[mage_data["id"]] = dict(mage_data)
+            if self._save_timer is not None:
+                return
+            # Give a burst of edits time to land before writing
+            self._save_timer = threading.Timer(self.save_delay, self.submit, (self._write_pending_saves,),
+                                               {"on_error": self._save_failed})
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_failed(self, error):
+        if self.on_save_error is not None:
+            self.on_save_error(error)
+        else:
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    # Worker side
+
+    def _write_pending_saves(self):
+        with self._save_lock:
+            records = self._pending_saves
+            self._pending_saves = {}
+            self._save_timer = None
+        if not records:
+            return
+        try:
+            with span("io.save"):
+                self.repository.upsert_many(list(records.values()))
+        except BaseException:
+            with self._save_lock:
+                records.update(self._pending_saves)  # Edits queued meanwhile are newer
+                self._pending_saves = records
+            raise
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            func, args, on_done, on_error = task
+            try:
+                with span("io." + getattr(func, "__qualname__", "task")):
+                    result = func(*args)
+            except Exception as error:
+                if on_error is not None:
+                    self.call_soon(on_error, error)
+                else:
+                    traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+            else:
+                if on_done is not None:
+                    self.call_soon(on_done, result)
+
+    def close(self):
+        """Write any pending saves, then stop the worker thread."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+        self._tasks.put(None)
+        self._thread.join()
+        self._root = None
+        self._write_pending_saves()
@@ -0,0 +1,13 @@
+import json
+
+import pytest
+
+from tests.test_repository import make_mage
+
+
+@pytest.fixture
+def roster_path(tmp_path):
+    """A five-mage cmd.json roster."""
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps([make_mage(number) for number in range(5)]))
+    return str(path)
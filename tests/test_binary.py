@@ -0,0 +1,112 @@
+import io
+import json
+import struct
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.binary import BinaryRoster, RosterFileError, binary_to_json, json_to_binary, write_binary
+from power.cli import main
+from power.formats import iter_records
+from power.formula import calculate_power, np
+from power.schema import STAT_FIELDS
+
+
+@pytest.fixture
+def roster():
+    roster = generate_roster(100, seed=14)
+    roster[0].update(id="not-a-uuid", name="Ünïcode ✨", health=120, speed=99.5)
+    roster[1].update(id=roster[1]["id"].upper(), age=31.0)  # Not canonical, so stored as text
+    return roster
+
+
+def test_round_trip_keeps_types_and_ids(roster, tmp_path):
+    path = str(tmp_path / "roster.mroster")
+    assert write_binary(roster, path) == len(roster)
+    with BinaryRoster(path) as binary:
+        assert len(binary) == len(roster)
+        assert list(binary) == roster
+        assert type(binary.record(0)["health"]) is int and type(binary.record(1)["age"]) is float
+    assert list(iter_records(path)) == roster
+
+
+def test_round_trip_keeps_versions(roster, tmp_path):
+    path = str(tmp_path / "roster.mroster")
+    versioned = [dict(mage, version=number) for number, mage in enumerate(roster[:50])] + roster[50:]
+    write_binary(versioned, path)
+    with BinaryRoster(path) as binary:
+        assert list(binary) == versioned
+        assert binary.get(roster[7]["id"])["version"] == 7 and "version" not in binary.record(60)
+    with pytest.raises(ValueError):
+        write_binary([dict(roster[2], version=-1)], path)
+
+
+def test_lookups_by_id(roster, tmp_path):
+    path = str(tmp_path / "roster.mroster")
+    write_binary(roster, path)
+    with BinaryRoster(path) as binary:
+        for row, mage in enumerate(roster):
+            assert binary.row_of(mage["id"]) == row
+        assert binary.get(roster[50]["id"]) == roster[50]
+        assert binary.get("00000000-0000-4000-8000-000000000000") is None
+        assert binary.get("missing", "default") == "default"
+
+
+def test_powers_score_the_mapped_records(roster, tmp_path):
+    path = str(tmp_path / "roster.mroster")
+    write_binary(roster, path)
+    expected = [calculate_power(*(mage[stat] for stat in STAT_FIELDS)) for mage in roster]
+    with BinaryRoster(path) as binary:
+        powers = binary.powers()
+        assert list(powers) == pytest.approx(expected, rel=1e-12)
+        if np is not None:
+            assert list(binary.stat_column("speed")) == [mage["speed"] for mage in roster]
+        del powers
+
+
+def test_json_conversion_is_byte_identical(roster, tmp_path):
+    source, binary, target = (str(tmp_path / name) for name in ("cmd.json", "roster.mroster", "back.json"))
+    with open(source, 'w') as file:
+        json.dump(roster, file)
+    assert json_to_binary(source, binary) == len(roster)
+    binary_to_json(binary, target)
+    with open(source, 'rb') as original, open(target, 'rb') as converted:
+        assert original.read() == converted.read()
+
+
+def test_cli_convert(roster, tmp_path):
+    source, binary = str(tmp_path / "cmd.json"), str(tmp_path / "roster.mroster")
+    with open(source, 'w') as file:
+        json.dump(roster, file)
+    out = io.StringIO()
+    assert main(["convert", source, binary], out) == 0
+    assert out.getvalue() == f"wrote {binary} ({len(roster)} mages)\n"
+    assert main(["convert", source, str(tmp_path / "copy.json")], io.StringIO()) == 1
+
+
+def test_unreadable_files_are_rejected(roster, tmp_path):
+    path = tmp_path / "roster.mroster"
+    path.write_bytes(b"")
+    with pytest.raises(RosterFileError):
+        BinaryRoster(str(path))
+    path.write_bytes(b"[]" * 40)
+    with pytest.raises(RosterFileError):
+        BinaryRoster(str(path))
+
+    write_binary(roster, str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 8, 99)  # Version field
+    path.write_bytes(data)
+    with pytest.raises(RosterFileError, match="version 99"):
+        BinaryRoster(str(path))
+    struct.pack_into("<H", data, 8, 1)  # Files from before records kept their version
+    path.write_bytes(data)
+    with pytest.raises(RosterFileError, match="version 1"):
+        BinaryRoster(str(path))
+
+
+def test_records_must_fit_the_format(roster, tmp_path):
+    with pytest.raises(ValueError):
+        write_binary([dict(roster[2], health="lots")], str(tmp_path / "roster.mroster"))
+    with pytest.raises(ValueError):
+        write_binary([dict(roster[2], rank=1)], str(tmp_path / "roster.mroster"))
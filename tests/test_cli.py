@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import statistics
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.cli import PowerStats, main
+from power.formula import calculate_power
+from power.schema import FIELDS, STAT_FIELDS
+
+ROSTER = generate_roster(300, seed=12)
+POWERS = {mage["id"]: calculate_power(*(mage[stat] for stat in STAT_FIELDS)) for mage in ROSTER}
+
+
+def write_roster(directory, fmt):
+    path = directory / f"roster.{fmt}"
+    with open(path, 'w', newline='') as file:
+        if fmt == "json":
+            json.dump(ROSTER, file)
+        elif fmt == "jsonl":
+            file.writelines(json.dumps(mage) + "\n" for mage in ROSTER)
+        else:
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            writer.writerows(ROSTER)
+    return str(path)
+
+
+def run(*argv):
+    out = io.StringIO()
+    assert main(list(argv), out) == 0
+    return json.loads(out.getvalue())
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "csv"])
+def test_rank_lists_the_strongest_first(tmp_path, fmt):
+    ranked = run("rank", write_roster(tmp_path, fmt), "--top", "5", "--json")
+    expected = sorted(POWERS, key=POWERS.get, reverse=True)[:5]
+    assert [entry["id"] for entry in ranked] == expected
+    assert [entry["rank"] for entry in ranked] == [1, 2, 3, 4, 5]
+    assert ranked[0]["power"] == pytest.approx(POWERS[expected[0]], rel=1e-12)
+
+
+def test_filters_apply_to_fields_and_power(tmp_path):
+    path = write_roster(tmp_path, "json")
+    ranked = run("rank", path, "--top", "1000", "--where", "intelligence>150", "--where", "power>=0", "--json")
+    expected = {mage["id"] for mage in ROSTER if mage["intelligence"] > 150 and POWERS[mage["id"]] >= 0}
+    assert {entry["id"] for entry in ranked} == expected
+
+    with pytest.raises(SystemExit):
+        main(["rank", path, "--where", "strength>1"], io.StringIO())
+
+
+def test_stats_summarize_the_distribution(tmp_path):
+    summary = run("stats", write_roster(tmp_path, "jsonl"), "--percentiles", "0,50,100", "--histogram", "--json")
+    powers = list(POWERS.values())
+    assert summary["count"] == len(powers)
+    assert summary["mean"] == pytest.approx(statistics.fmean(powers))
+    assert summary["stdev"] == pytest.approx(statistics.stdev(powers))
+    assert summary["percentiles"] == pytest.approx(
+        {"0.0": min(powers), "50.0": statistics.median(powers), "100.0": max(powers)}, rel=1e-12)
+    assert sum(count for _, _, count in summary["histogram"]) == len(powers)
+
+
+def test_power_stats_percentiles_come_from_the_reservoir():
+    stats = PowerStats(sample_size=10)
+    for power in range(1000):
+        stats.add(float(power))
+    assert len(stats.sample) == 10 and stats.count == 1000
+    assert (stats.min, stats.max, stats.mean) == (0.0, 999.0, 499.5)
+
+
+def test_unreadable_roster_is_an_error(tmp_path, capsys):
+    assert main(["rank", str(tmp_path / "missing.json")], io.StringIO()) == 1
+    assert capsys.readouterr().err.startswith("error:")
@@ -0,0 +1,47 @@
+import pytest
+
+from power.repository import open_repository
+from tests.test_repository import make_mage, unversioned
+
+BACKENDS = ("json", "journal", "sqlite")
+
+
+@pytest.fixture(params=BACKENDS)
+def repository(request, roster_path):
+    repository = open_repository(roster_path, request.param)
+    repository.all()  # The initial load publishes a "reload"
+    yield repository
+    repository.close()
+
+
+def test_every_write_publishes_one_change(repository):
+    changes = []
+    repository.subscribe(changes.append)
+    repository.insert(make_mage(5))
+    repository.update(make_mage(1, name="Renamed"))
+    repository.upsert(make_mage(6))
+    repository.upsert(make_mage(6, age=60))
+    repository.delete("mage-0")
+
+    assert [(change.kind, change.mage_id) for change in changes] == [
+        ("insert", "mage-5"), ("update", "mage-1"), ("insert", "mage-6"), ("update", "mage-6"), ("delete", "mage-0")]
+    assert unversioned([changes[1].record]) == [make_mage(1, name="Renamed")]
+    assert changes[-1].record is None
+
+
+def test_failed_writes_publish_nothing(repository):
+    changes = []
+    callback = repository.subscribe(changes.append)
+    with pytest.raises(KeyError):
+        repository.insert(make_mage(0))
+    repository.update(make_mage(9))
+    repository.delete("mage-9")
+    repository.unsubscribe(callback)
+    repository.delete("mage-0")
+    assert changes == []
+
+
+def test_iter_streams_what_all_returns(repository):
+    repository.insert(make_mage(5))
+    repository.delete("mage-1")
+    assert list(repository.iter()) == repository.all()
@@ -0,0 +1,78 @@
+import io
+import json
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.formats import RosterFormatError, iter_json_array, iter_records, load_json_roster
+from power.repository import MageRepository
+
+
+def parse(text, **options):
+    return list(iter_json_array(io.BytesIO(text.encode('utf-8')), **options))
+
+
+def test_streams_records_across_chunk_boundaries():
+    roster = generate_roster(50, seed=13)
+    roster[3]["name"] = "Ωmega ✨ mage"  # Multi-byte characters straddling chunks
+    text = json.dumps(roster, indent=1)
+    assert parse(text, chunk_size=7) == roster
+    assert parse(text) == roster
+
+
+@pytest.mark.parametrize("text", ["", "  \n", "[]", " [ ] "])
+def test_empty_rosters(text):
+    assert parse(text) == []
+
+
+@pytest.mark.parametrize("text, offset", [
+    ('{"id": "a"}', 0),
+    ('[{"id": "a"}, 3]', 14),
+    ('[{"id": "a"},]', 13),
+    ('[{"id": "a"} {"id": "b"}]', 13),
+    ('[{"id": "a", "name": }]', 1),
+    ('[{"id": "é"}, {"id": ', 15),
+    ('[{"id": "a"}] x', 14),
+])
+def test_malformed_input_reports_the_byte_offset(text, offset):
+    with pytest.raises(RosterFormatError) as raised:
+        parse(text, chunk_size=4)
+    assert raised.value.offset == offset
+    assert str(raised.value).endswith(f"at byte {offset}")
+
+
+def test_whole_roster_load_matches_streaming(tmp_path):
+    path = tmp_path / "cmd.json"
+    roster = generate_roster(20, seed=7)
+    path.write_text(json.dumps(roster))
+    assert load_json_roster(str(path)) == list(iter_records(str(path))) == roster
+    path.write_text("  \n")
+    assert load_json_roster(str(path)) == []
+
+
+@pytest.mark.parametrize("text, offset", [('{"id": "a"}', 0), ('[{"id": "a"}, 3]', 14), ('[{"id": "a"},]', 13)])
+def test_whole_roster_load_reports_the_byte_offset(tmp_path, text, offset):
+    path = tmp_path / "cmd.json"
+    path.write_text(text)
+    with pytest.raises(RosterFormatError) as raised:
+        load_json_roster(str(path))
+    assert raised.value.offset == offset
+
+
+def test_iter_records_reads_json_files_lazily(tmp_path):
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps(generate_roster(3, seed=1)) + "garbage")
+    records = iter_records(str(path))
+    assert next(records)["id"]  # The first record is yielded before the bad tail is seen
+    with pytest.raises(RosterFormatError):
+        list(records)
+
+
+def test_repository_reports_a_corrupt_roster_instead_of_emptying(tmp_path):
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps(generate_roster(3, seed=2)))
+    repository = MageRepository(str(path))
+    assert len(repository.all()) == 3
+    path.write_text("[{]")
+    with pytest.raises(RosterFormatError):
+        repository.all()
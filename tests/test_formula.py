@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from power.formula import PowerTable, calculate_power, calculate_power_batch, np
+from power.schema import STAT_FIELDS
+
+
+@pytest.fixture
+def rows():
+    rng = random.Random(4)
+    return [(rng.uniform(50, 500), rng.uniform(0, 300), rng.uniform(50, 300), rng.uniform(0, 60), rng.uniform(0, 40),
+             rng.uniform(0, 20), rng.uniform(50, 250), rng.uniform(60, 300)) for _ in range(500)]
+
+
+def test_batch_matches_scalar_for_rows_and_columns(rows):
+    expected = [calculate_power(*row) for row in rows]
+    columns = {stat: [row[index] for row in rows] for index, stat in enumerate(STAT_FIELDS)}
+    assert list(calculate_power_batch(rows)) == pytest.approx(expected, rel=1e-12)
+    assert list(calculate_power_batch(columns)) == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+def test_batch_matches_scalar_for_structured_arrays(rows):
+    array = np.array(rows, dtype=[(stat, "f8") for stat in STAT_FIELDS])
+    expected = [calculate_power(*row) for row in rows]
+    assert list(calculate_power_batch(array)) == pytest.approx(expected, rel=1e-12)
+
+
+def test_empty_batch():
+    assert len(calculate_power_batch([])) == 0
+
+
+def test_power_table_is_exact():
+    # A small table so lookups, growth and the fallback past max_limit all happen
+    table = PowerTable(limit=50, max_limit=256)
+    rng = random.Random(21)
+    rows = [(rng.randint(0, 300), 120.0, rng.choice([rng.randint(0, 300), rng.uniform(0, 300)]), 10, 4, 2,
+             rng.choice([rng.randint(0, 300), 150.5, -3.0]), float(rng.randint(0, 300))) for _ in range(500)]
+    expected = [calculate_power(*row) for row in rows]
+    assert [table.power(*row) for row in rows] == expected
+    assert list(table.batch(rows)) == expected
+    assert table.speed.limit <= 256
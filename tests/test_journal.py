@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from power.formats import RosterFormatError
+from power.journal import JournalRepository
+from power.locking import FileLock
+from tests.test_repository import make_mage, stored
+
+
+def journal_entries(repository):
+    with open(repository.journal_path) as file:
+        entries = [json.loads(line) for line in file]
+    for entry in entries:
+        entry.get("mage", {}).pop("version", None)
+    return entries
+
+
+def test_writes_append_to_the_journal(roster_path):
+    repository = JournalRepository(roster_path)
+    repository.update(make_mage(1, name="Renamed"))
+    repository.delete("mage-2")
+    repository.sync()
+
+    assert journal_entries(repository) == [{"op": "upsert", "mage": make_mage(1, name="Renamed")},
+                                           {"op": "delete", "id": "mage-2"}]
+    assert len(stored(roster_path)) == 5  # The snapshot is untouched until compaction
+
+    reopened = JournalRepository(roster_path)
+    assert reopened.get("mage-1")["name"] == "Renamed"
+    assert "mage-2" not in reopened
+
+
+def test_close_compacts_into_the_snapshot(roster_path):
+    repository = JournalRepository(roster_path, compact_every=3)
+    for number in range(5, 8):
+        repository.insert(make_mage(number))
+    assert len(stored(roster_path)) == 8  # The third append compacted
+
+    repository.delete("mage-0")
+    repository.close()
+    assert [mage["id"] for mage in stored(roster_path)] == [f"mage-{number}" for number in range(1, 8)]
+
+
+def test_torn_tail_is_discarded(roster_path):
+    repository = JournalRepository(roster_path)
+    repository.update(make_mage(1, health=1.0))
+    repository.sync()
+    torn = '{"op": "upsert", "mage": {"id": "mag'
+    with open(repository.journal_path, 'a') as file:
+        file.write(torn)
+
+    # Readers skip the partial line but leave the file to the lock holder
+    reader = JournalRepository(roster_path)
+    assert reader.get("mage-1")["health"] == 1.0
+    with open(reader.journal_path) as file:
+        assert file.read().endswith(torn)
+
+    reader.update(make_mage(1, health=3.0))  # Reloads under the lock, so it trims before appending
+    reader.sync()
+    assert journal_entries(reader) == [{"op": "upsert", "mage": make_mage(1, health=1.0)},
+                                       {"op": "upsert", "mage": make_mage(1, health=3.0)}]
+    assert JournalRepository(roster_path).get("mage-1")["health"] == 3.0
+
+
+def test_a_batch_is_one_commit(roster_path):
+    repository = JournalRepository(roster_path)
+    counter = FileLock(f"{roster_path}.lock")
+    before = counter.generation()
+    repository.upsert_many([make_mage(number, age=50) for number in range(3)])
+    assert counter.generation() == before + 1
+    repository.sync()
+    assert len(journal_entries(repository)) == 3
+    counter.close()
+
+
+@pytest.mark.parametrize("line", ["[1, 2]", '{"mage": {"id": "mage-1"}}', '{"op": "upsert"}', '{"op": "rename"}'])
+def test_malformed_entries_are_reported(roster_path, line):
+    repository = JournalRepository(roster_path)
+    repository.delete("mage-0")
+    repository.sync()
+    good_end = os.path.getsize(repository.journal_path)
+    with open(repository.journal_path, 'a') as file:
+        file.write(line + "\n")
+    with pytest.raises(RosterFormatError) as raised:
+        JournalRepository(roster_path).all()
+    assert raised.value.offset == good_end
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.formula import calculate_power
+from power.leaderboard import Leaderboard
+from power.repository import MageRepository
+from power.schema import STAT_FIELDS
+
+
+def power(mage):
+    return calculate_power(*(mage[stat] for stat in STAT_FIELDS))
+
+
+def ranking(records):
+    return sorted(((power(mage), mage["id"]) for mage in records), key=lambda pair: (-pair[0], pair[1]))
+
+
+def assert_ranked(pairs, expected):
+    assert [mage_id for _, mage_id in pairs] == [mage_id for _, mage_id in expected]
+    assert [power for power, _ in pairs] == pytest.approx([power for power, _ in expected], rel=1e-12)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps(generate_roster(300, seed=15)))
+    return MageRepository(str(path))
+
+
+def test_queries_agree_with_a_full_scan(repository):
+    board = Leaderboard.attach(repository)
+    expected = ranking(repository.all())
+    assert_ranked(board.top(10), expected[:10])
+    assert board.ids(100, 5) == [mage_id for _, mage_id in expected[100:105]]
+    assert [board.rank(mage_id) for _, mage_id in expected[:20]] == list(range(1, 21))
+    assert board.rank("missing") is None
+
+    low, high = expected[200][0], expected[50][0]
+    in_range = [pair for pair in expected if low <= pair[0] <= high]
+    assert_ranked(board.in_range(low, high), in_range)
+    assert board.count_range(low, high) == len(in_range) == 151
+
+
+def test_follows_repository_writes(repository):
+    board = Leaderboard.attach(repository)
+    weakest = board.slice(len(board) - 1, 1)[0][1]
+    repository.update(dict(repository.get(weakest), intelligence=400.0))
+    assert board.rank(weakest) == 1
+
+    strongest = repository.get(board.ids(1, 1)[0])
+    repository.delete(strongest["id"])
+    assert strongest["id"] not in board
+    repository.insert(dict(strongest, id="newcomer"))
+    assert board.rank("newcomer") == 2
+    assert_ranked(board.top(len(board)), ranking(repository.all()))
+
+
+def test_rebuilds_when_the_roster_is_rewritten(repository):
+    board = Leaderboard.attach(repository)
+    roster = generate_roster(20, seed=16)
+    with open(repository.path, 'w') as file:
+        json.dump(roster, file)
+    repository.reload()
+    assert len(board) == 20
+    assert_ranked(board.top(20), ranking(roster))
+
+
+def test_saved_board_is_reused_only_for_the_same_roster(repository):
+    board = Leaderboard.attach(repository)
+    board.close()
+    assert board.top(5) == Leaderboard.attach(repository).top(5)
+
+    reopened = Leaderboard(board.path)
+    assert reopened.load(repository.stamp())
+    assert reopened.top(300) == board.top(300)
+    assert not reopened.load(("some", "other", "stamp"))
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from power import locking
+from power.locking import FileLock
+
+
+@pytest.mark.skipif(locking.fcntl is None, reason="no fcntl, so no commit counter")
+def test_generation_counts_commits(tmp_path):
+    lock = FileLock(str(tmp_path / "cmd.json.lock"))
+    assert lock.generation() == 0
+    with lock:
+        lock.bump()
+        lock.bump()
+    assert lock.generation() == 2
+    assert FileLock(lock.path).generation() == 2
+    lock.close()
+
+
+def test_bump_survives_an_unreadable_counter(tmp_path, monkeypatch):
+    lock = FileLock(str(tmp_path / "cmd.json.lock"))
+
+    def unreadable(*args):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(os, "pread", unreadable)
+    with lock:
+        assert lock.generation() in (None, 0)
+        lock.bump()  # Readers fall back to file stats rather than the commit failing
+    lock.close()
@@ -0,0 +1,73 @@
+import itertools
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.formula import calculate_power, power_gradient
+from power.optimize import DEFAULT_BOUNDS, optimize, optimize_batch
+from power.schema import STAT_FIELDS
+
+
+def power(stats):
+    return calculate_power(*(stats[stat] for stat in STAT_FIELDS))
+
+
+def test_gradient_matches_finite_differences():
+    stats = [150.0, 80.0, 120.0, 30.0, 12.0, 7.0, 140.0, 110.0]
+    step = 1e-6
+    for i, slope in enumerate(power_gradient(*stats)):
+        moved = list(stats)
+        moved[i] += step
+        assert slope == pytest.approx((calculate_power(*moved) - calculate_power(*stats)) / step, rel=1e-4)
+
+
+@pytest.mark.parametrize("mage", generate_roster(5, seed=22))
+def test_keeps_the_budget_and_bounds(mage):
+    result = optimize(mage)
+    assert sum(result.stats.values()) == int(sum(mage[stat] for stat in STAT_FIELDS)) or all(
+        result.stats[stat] == DEFAULT_BOUNDS[stat][1] for stat in STAT_FIELDS)
+    assert all(DEFAULT_BOUNDS[stat][0] <= value <= DEFAULT_BOUNDS[stat][1] for stat, value in result.stats.items())
+    assert all(isinstance(value, int) for value in result.stats.values())
+    assert result.power == power(result.stats) >= power(mage) - 1e-9
+
+
+def test_finds_the_best_allocation_of_a_small_space():
+    mage = dict(zip(STAT_FIELDS, (100, 100, 100, 10, 4, 1, 100, 100)))
+    fixed = ("health", "mana", "stamina", "defense", "phys_atk")
+    bounds = {"mag_atk": (0, 20), "speed": (50, 150), "intelligence": (50, 150)}
+    # The budget covers every stat, the fixed ones included
+    result = optimize(mage, budget=sum(mage[stat] for stat in fixed) + 230, bounds=bounds, fixed=fixed)
+
+    best = max(power(dict(mage, mag_atk=m, speed=s, intelligence=230 - m - s))
+               for m, s in itertools.product(range(21), range(50, 151)) if 50 <= 230 - m - s <= 150)
+    assert result.power == pytest.approx(best, rel=1e-12)
+    assert all(result.stats[stat] == mage[stat] for stat in fixed)
+
+
+def test_batch_agrees_with_single_mages():
+    mages = generate_roster(4, seed=23)
+    budgets = [300, 400, 500, 600]
+    results = optimize_batch(mages, budget=budgets)
+    for mage, budget, result in zip(mages, budgets, results):
+        assert sum(result.stats.values()) == budget
+        assert result.power == pytest.approx(optimize(mage, budget=budget).power, rel=1e-9)
+    assert optimize_batch([]) == []
+    with pytest.raises(ValueError, match="3 budgets for 4 mages"):
+        optimize_batch(mages, budget=budgets[:3])
+
+
+def test_fractional_results_without_integer_rounding():
+    mage = generate_roster(1, seed=24)[0]
+    result = optimize(mage, budget=333.5, integer=False)
+    assert sum(result.stats.values()) == pytest.approx(333.5)
+    assert result.power >= optimize(mage, budget=333).power
+
+
+def test_invalid_requests():
+    mage = generate_roster(1, seed=25)[0]
+    with pytest.raises(ValueError, match="Unknown stats"):
+        optimize(mage, fixed=["strength"])
+    with pytest.raises(ValueError, match="below the minimum"):
+        optimize(mage, budget=10, bounds={"health": (50, 200)})
+    with pytest.raises(ValueError, match="Empty range"):
+        optimize(mage, bounds={"speed": (10.5, 10.7)})
@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.cli import PowerStats, main, parse_filter, scored, top_k
+from power.formats import iter_records
+from power.parallel import score_parallel, score_range, split_ranges
+
+ROSTER = generate_roster(400, seed=18)
+# Braces, commas and quotes inside strings must not be taken for record boundaries
+ROSTER[10]["description"] = 'tricky }, {"id": "fake"} text'
+ROSTER[11]["name"] = "Ωmega"
+
+
+@pytest.fixture(params=["json", "jsonl"])
+def roster_path(request, tmp_path):
+    path = tmp_path / f"roster.{request.param}"
+    with open(path, 'w') as file:
+        if request.param == "json":
+            json.dump(ROSTER, file, indent=1)
+        else:
+            file.writelines(json.dumps(mage) + "\n" for mage in ROSTER)
+    return str(path)
+
+
+def sequential(path, filters=()):
+    stats = PowerStats()
+    pairs = list(scored(iter_records(path), filters))
+    for power, _ in pairs:
+        stats.add(power)
+    return top_k(pairs, 25), stats
+
+
+def test_every_record_lands_in_exactly_one_range(roster_path):
+    fmt = roster_path.rsplit(".", 1)[1]
+    ranges = split_ranges(roster_path, 37, min_chunk=1)
+    assert len(ranges) == 37
+    ids = []
+    for index, (start, end) in enumerate(ranges):
+        best, stats = score_range(roster_path, fmt, start, end, index, top=len(ROSTER))
+        ids.extend(record["id"] for _, _, _, record in sorted(best, key=lambda item: (-item[1], -item[2])))
+    assert ids == [mage["id"] for mage in ROSTER]
+
+
+def test_parallel_matches_sequential(roster_path):
+    filters = [parse_filter("speed>=50")]
+    expected_ranked, expected_stats = sequential(roster_path, filters)
+    ranked, stats = score_parallel(roster_path, workers=2, filters=filters, top=25)
+    assert [record["id"] for _, record in ranked] == [record["id"] for _, record in expected_ranked]
+    assert stats.count == expected_stats.count
+    assert stats.mean == pytest.approx(expected_stats.mean)
+    assert stats.stdev == pytest.approx(expected_stats.stdev)
+    assert (stats.min, stats.max, stats.bins) == (expected_stats.min, expected_stats.max, expected_stats.bins)
+
+
+def test_merged_stats_agree_with_one_pass():
+    powers = [float(power * power % 977) for power in range(1000)]
+    whole, left, right = PowerStats(sample_size=100), PowerStats(sample_size=100), PowerStats(sample_size=100)
+    for power in powers:
+        whole.add(power)
+    for power in powers[:300]:
+        left.add(power)
+    for power in powers[300:]:
+        right.add(power)
+    left.merge(right)
+    assert left.count == 1000 and len(left.sample) == 100
+    assert left.mean == pytest.approx(whole.mean) and left.stdev == pytest.approx(whole.stdev)
+    assert left.bins == whole.bins
+
+
+def test_cli_workers(roster_path):
+    out = io.StringIO()
+    assert main(["rank", roster_path, "--top", "5", "--workers", "2", "--json"], out) == 0
+    expected, _ = sequential(roster_path)
+    assert [entry["id"] for entry in json.loads(out.getvalue())] == [record["id"] for _, record in expected[:5]]
+
+
+def test_only_json_and_jsonl_can_be_split(tmp_path):
+    with pytest.raises(ValueError):
+        score_parallel(str(tmp_path / "roster.csv"), workers=2)
+
+
+@pytest.mark.parametrize("text", ["", " \n", "[]"])
+def test_empty_rosters_agree_with_sequential(tmp_path, text):
+    path = tmp_path / "roster.json"
+    path.write_text(text)
+    assert list(iter_records(str(path))) == []
+    for workers in (1, 2):
+        ranked, stats = score_parallel(str(path), workers=workers)
+        assert ranked == [] and stats.count == 0
@@ -0,0 +1,130 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from power.repository import MageRepository, VersionConflict, open_repository
+
+
+def make_mage(number, **fields):
+    mage = {
+        "id": f"mage-{number}", "name": f"Mage {number}", "age": 20 + number, "description": "",
+        "years_practicing": number, "personality": "calm", "health": 100.0 + number, "mana": 100.0,
+        "stamina": 100.0, "defense": 10.0, "phys_atk": 4.0, "mag_atk": 1.0, "speed": 100.0, "intelligence": 100.0,
+    }
+    mage.update(fields)
+    return mage
+
+
+def stored(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def unversioned(records):
+    return [{field: value for field, value in record.items() if field != "version"} for record in records]
+
+
+def test_writes_reach_the_file(roster_path):
+    repository = MageRepository(roster_path)
+    repository.insert(make_mage(5))
+    assert repository.update(make_mage(1, name="Renamed"))
+    assert repository.delete("mage-2")
+    repository.upsert(make_mage(0, age=99))
+
+    assert unversioned(stored(roster_path)) == [make_mage(0, age=99), make_mage(1, name="Renamed"), make_mage(3), make_mage(4),
+                                   make_mage(5)]
+    assert repository.all() == stored(roster_path)
+
+
+def test_unknown_and_duplicate_ids(roster_path):
+    repository = MageRepository(roster_path)
+    with pytest.raises(KeyError):
+        repository.insert(make_mage(0))
+    assert not repository.update(make_mage(9))
+    assert not repository.delete("mage-9")
+    assert repository.get("mage-9") is None
+    assert "mage-3" in repository and len(repository) == 5
+
+
+def test_missing_file_is_an_empty_roster(tmp_path):
+    repository = MageRepository(str(tmp_path / "cmd.json"))
+    assert repository.all() == []
+    repository.insert(make_mage(0))
+    assert unversioned(stored(repository.path)) == [make_mage(0)]
+
+
+def test_rereads_a_file_changed_elsewhere(roster_path):
+    repository = MageRepository(roster_path)
+    assert repository.get("mage-7") is None
+    with open(roster_path, 'w') as file:
+        json.dump([make_mage(7)], file)
+    os.utime(roster_path, ns=(0, 0))  # A different mtime even within the clock tick
+    assert [mage["id"] for mage in repository.all()] == ["mage-7"]
+
+
+@pytest.mark.parametrize("backend", ["json", "journal"])
+def test_failed_writes_leave_memory_as_stored(roster_path, backend):
+    repository = open_repository(roster_path, backend)
+    before = repository.all()
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    for hook in ("_persist_upsert", "_persist_many", "_persist_delete"):
+        setattr(repository, hook, fail)
+    with pytest.raises(OSError):
+        repository.insert(make_mage(5))
+    with pytest.raises(OSError):
+        repository.update(make_mage(1, name="Renamed"))
+    with pytest.raises(OSError):
+        repository.upsert_many([make_mage(2, age=90), make_mage(6)])
+    with pytest.raises(OSError):
+        repository.delete("mage-0")
+    assert repository.all() == before
+    repository.close()
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_versions_refuse_stale_updates(roster_path, backend):
+    repository = open_repository(roster_path, backend)
+    read = repository.get("mage-1")
+    assert repository.update(dict(read, name="First"), expected_version=read["version"])
+    with pytest.raises(VersionConflict) as raised:
+        repository.update(dict(read, name="Second"), expected_version=read["version"])
+    assert raised.value.actual == read["version"] + 1
+    assert repository.get("mage-1")["name"] == "First"
+
+    assert repository.delete("mage-1")
+    assert not repository.update(dict(read, name="Third"), expected_version=read["version"] + 1)
+    assert "mage-1" not in repository
+    repository.close()
+
+
+def test_legacy_records_load_as_version_zero(roster_path):
+    repository = MageRepository(roster_path)
+    assert {mage["version"] for mage in repository.all()} == {0}
+    repository.update(make_mage(3))
+    assert [mage["version"] for mage in stored(roster_path)] == [0, 0, 0, 1, 0]
+
+
+def test_writes_from_another_process_are_not_lost(roster_path):
+    mine, theirs = MageRepository(roster_path), MageRepository(roster_path)
+    mine.all()
+    theirs.insert(make_mage(7))
+    mine.insert(make_mage(8))
+    assert {"mage-7", "mage-8"} <= {mage["id"] for mage in stored(roster_path)}
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_concurrent_writers_lose_nothing(tmp_path, backend):
+    from benchmarks.concurrent_writers import run
+    assert run(backend, writers=3, readers=1, updates=30, blind=False, directory=str(tmp_path))
+
+
+def test_package_exports_load_on_first_use():
+    code = ("import sys, power.formula; assert 'power.repository' not in sys.modules; "
+            "from power import MageRepository; assert MageRepository.__module__ == 'power.repository'")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
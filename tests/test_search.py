@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.repository import MageRepository
+from power.search import SearchIndex, record_matches, tokenize
+from tests.test_repository import make_mage
+
+
+@pytest.fixture
+def repository(tmp_path):
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps([
+        make_mage(0, name="Aldric Stormcaller", description="Calls lightning from clear skies"),
+        make_mage(1, name="Storm", description="A quiet apprentice", personality="shy"),
+        make_mage(2, name="Brenna", description="Studies stormglass lenses"),
+        make_mage(3, name="Cedric", description="Master of fire and ash", personality="fiery"),
+    ]))
+    return MageRepository(str(path))
+
+
+def test_tokenize():
+    assert tokenize("Fire-and ASH, 2nd") == ["fire", "and", "ash", "2nd"]
+
+
+def test_exact_matches_rank_before_prefixes_and_typos(repository):
+    index = SearchIndex.attach(repository)
+    assert index.search("storm") == ["mage-1", "mage-0", "mage-2"]  # The exact match, then prefixes in roster order
+    assert index.search("stor") == ["mage-0", "mage-1", "mage-2"]
+    assert index.search("cedirc") == ["mage-3"]  # Adjacent swap
+    assert index.search("cedirc", fuzzy=False) == []
+    assert index.search("fire ash") == ["mage-3"]
+    assert index.search("fire quiet") == []
+    assert index.search("  ") == []
+    assert index.search("s", limit=2) == index.search("s")[:2]
+
+
+def test_agrees_with_record_matches(tmp_path):
+    path = tmp_path / "cmd.json"
+    roster = generate_roster(300, seed=17)
+    path.write_text(json.dumps(roster))
+    index = SearchIndex.attach(MageRepository(str(path)))
+    for query in ("calm", "cur", "proud x", "stoci", "a b"):
+        assert sorted(index.search(query)) == sorted(mage["id"] for mage in roster if record_matches(mage, query))
+
+
+def test_follows_repository_writes(repository):
+    index = SearchIndex.attach(repository)
+    index.prepare_fuzzy()
+    repository.update(dict(repository.get("mage-3"), description="Now studies water"))
+    assert index.search("ash") == []
+    assert index.search("watr") == ["mage-3"]
+    repository.delete("mage-1")
+    assert index.search("storm") == ["mage-0", "mage-2"]
+    repository.insert(make_mage(9, name="Stormborn"))
+    assert index.search("stormborn") == ["mage-9"]
+    assert len(index) == 4
+
+
+def test_saved_index_is_reused_only_for_the_same_roster(repository):
+    index = SearchIndex.attach(repository)
+    repository.delete("mage-0")
+    index.close()
+
+    reopened = SearchIndex(index.path)
+    assert reopened.load(repository.stamp())
+    for query in ("storm", "fire", "cedirc", "lightning"):
+        assert reopened.search(query) == index.search(query)
+    assert not reopened.load(("some", "other", "stamp"))
+
+
+def test_deleted_mages_leave_no_slots_behind(repository):
+    index = SearchIndex.attach(repository)
+    repository.delete("mage-1")
+    repository.insert(make_mage(9, name="Stormborn"))
+    assert index.search("storm") == ["mage-0", "mage-2", "mage-9"]
+    index.close()
+    with open(index.path) as file:
+        assert json.load(file)["ids"] == ["mage-0", "mage-2", "mage-3", "mage-9"]
+
+    reopened = SearchIndex.attach(repository)
+    reopened.prepare_fuzzy()
+    for number in (0, 2, 3):  # Once gaps pass half of the documents they are compacted
+        repository.delete(f"mage-{number}")
+    repository.insert(make_mage(10, name="Stormcaller"))
+    for number in (9, 10):
+        repository.update(dict(repository.get(f"mage-{number}"), description="Storms"))
+    assert reopened.search("storms") == ["mage-9", "mage-10"]
+    assert reopened.search("stormcallr") == ["mage-10"]
+    assert len(reopened) == 2
@@ -0,0 +1,44 @@
+import random
+from bisect import bisect_left, bisect_right
+
+import pytest
+
+from power.sortedlist import SortedList
+
+
+def test_matches_a_sorted_list_under_random_updates():
+    rng = random.Random(15)
+    keys = SortedList(load=8)
+    expected = []
+    for _ in range(2000):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            keys.remove(key)
+            expected.remove(key)
+        else:
+            key = rng.random()
+            keys.add(key)
+            expected.append(key)
+            expected.sort()
+
+        probe = rng.random()
+        assert keys.bisect_left(probe) == bisect_left(expected, probe)
+        assert keys.bisect_right(probe) == bisect_right(expected, probe)
+    assert list(keys) == expected and len(keys) == len(expected)
+
+    for position, key in enumerate(expected):
+        assert keys.index(key) == position
+        assert keys[position] == key
+        assert key in keys
+    assert list(keys.islice(10, 50)) == expected[10:50]
+    assert keys[-1] == expected[-1]
+    with pytest.raises(IndexError):
+        keys[len(expected)]
+
+
+def test_presorted_ranges():
+    keys = SortedList(range(0, 1000, 2), load=16, presorted=True)
+    assert list(keys.irange(11, 21)) == [12, 14, 16, 18, 20]
+    assert list(keys.islice(495, 1000)) == [990, 992, 994, 996, 998]
+    assert list(keys.islice(5, 5)) == []
+    assert 7 not in keys and 2000 not in keys
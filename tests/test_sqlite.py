@@ -0,0 +1,92 @@
+import pytest
+
+from power.formula import calculate_power
+from power.schema import STAT_FIELDS
+from power.sqlite import SqliteRepository
+from tests.test_repository import make_mage, stored, unversioned
+
+
+@pytest.fixture
+def repository(roster_path):
+    repository = SqliteRepository(roster_path)
+    yield repository
+    repository.close()
+
+
+def power(mage):
+    return calculate_power(*(mage[stat] for stat in STAT_FIELDS))
+
+
+def test_seeds_from_the_json_roster(repository, roster_path):
+    assert unversioned(repository.all()) == stored(roster_path)
+    assert unversioned([repository.get("mage-3")]) == [make_mage(3)]
+    assert repository.db_path.endswith("cmd.db")
+
+
+def test_writes_and_reopen(repository, roster_path):
+    repository.insert(make_mage(5))
+    with pytest.raises(KeyError):
+        repository.insert(make_mage(5))
+    assert repository.update(make_mage(1, name="Renamed"))
+    assert not repository.update(make_mage(9))
+    repository.upsert(make_mage(6))
+    assert repository.delete("mage-0")
+    assert not repository.delete("mage-0")
+    repository.close()
+
+    reopened = SqliteRepository(roster_path)
+    assert [mage["id"] for mage in reopened] == ["mage-1", "mage-2", "mage-3", "mage-4", "mage-5", "mage-6"]
+    assert reopened.get("mage-1")["name"] == "Renamed"
+    reopened.close()
+
+
+def test_find_filters_and_orders_by_power(repository):
+    mages = [make_mage(number) for number in range(5)]
+    top = sorted(mages, key=power, reverse=True)[:2]
+    assert unversioned(repository.find(order_by="power", descending=True, limit=2)) == top
+    assert unversioned(repository.find([("age", ">=", 23)])) == mages[3:]
+    assert unversioned(repository.find([("health", "<", 103), ("name", "!=", "Mage 0")], offset=1)) == mages[2:3]
+
+    with pytest.raises(ValueError):
+        repository.find([("power; DROP TABLE mages", "=", 1)])
+    with pytest.raises(ValueError):
+        repository.find([("age", "LIKE", 1)])
+
+
+def test_export_round_trips(repository, tmp_path):
+    target = str(tmp_path / "export.json")
+    repository.export_json(target)
+    assert stored(target) == repository.all()
+
+
+def test_seeds_only_once(repository, roster_path):
+    for mage in repository.all():
+        repository.delete(mage["id"])
+    repository.close()
+
+    reopened = SqliteRepository(roster_path)
+    assert reopened.all() == []
+    reopened.close()
+
+
+def test_iter_pages_through_the_table(repository):
+    repository.delete("mage-2")
+    assert list(repository.iter(batch_size=2)) == repository.all()
+
+
+def test_commits_from_another_instance_publish_a_reload(repository, roster_path):
+    changes = []
+    repository.all()  # The initial load publishes a "reload"
+    repository.subscribe(changes.append)
+    repository.upsert(make_mage(6))
+    stamp = repository.stamp()
+    assert [change.kind for change in changes] == ["insert"]
+
+    other = SqliteRepository(roster_path)
+    other.update(make_mage(1, name="Elsewhere"))
+    other.close()
+    assert repository.get("mage-1")["name"] == "Elsewhere"
+    assert [change.kind for change in changes] == ["insert", "reload"]
+    assert repository.stamp() != stamp
+    repository.get("mage-1")
+    assert len(changes) == 2
@@ -0,0 +1,59 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.repository import MageRepository
+from power.statindex import Range, StatIndex, matches, merge, parse_predicates
+
+
+@pytest.fixture
+def repository(tmp_path):
+    path = tmp_path / "cmd.json"
+    path.write_text(json.dumps(generate_roster(400, seed=16)))
+    return MageRepository(str(path))
+
+
+def scan(records, predicates):
+    return [record["id"] for record in records if matches(record, predicates)]
+
+
+def test_parse_predicates():
+    assert parse_predicates("speed>=150, speed<=200; mag_atk>10  age=30") == [
+        Range("speed", low=150.0), Range("speed", high=200.0),
+        Range("mag_atk", low=10.0, include_low=False), Range("age", 30.0, 30.0)]
+    assert parse_predicates("  ") == []
+    with pytest.raises(ValueError, match="Cannot filter on 'name'"):
+        parse_predicates("name>3")
+    with pytest.raises(ValueError, match="Cannot parse"):
+        parse_predicates("speed>=150 and more")
+
+
+def test_merge_keeps_the_tightest_bounds():
+    merged = merge(parse_predicates("speed>100, speed>=120, speed<180, speed<=180"))
+    assert merged == [Range("speed", 120.0, 180.0, True, False)]
+
+
+@pytest.mark.parametrize("text", ["speed>=150", "speed>=50, speed<=60, mag_atk>10", "age=30", "health<0",
+                                  "intelligence>100, defense<50, years_practicing>=100"])
+def test_queries_agree_with_a_scan(repository, text):
+    index = StatIndex.attach(repository)
+    predicates = parse_predicates(text)
+    assert index.query(predicates) == scan(repository.all(), predicates)
+    assert index.count(predicates[0]) == len(scan(repository.all(), predicates[:1]))
+
+
+def test_follows_repository_writes(repository):
+    index = StatIndex.attach(repository)
+    rng = random.Random(16)
+    for mage in rng.sample(repository.all(), 40):
+        repository.update(dict(mage, speed=float(rng.randint(0, 200))))
+    for mage in rng.sample(repository.all(), 10):
+        repository.delete(mage["id"])
+    repository.insert(dict(generate_roster(1, seed=99)[0], speed=175.0))
+
+    predicates = parse_predicates("speed>=150, speed<=200")
+    assert index.query(predicates) == scan(repository.all(), predicates)
+    assert len(index) == len(repository.all()) == 391
+    index.close()
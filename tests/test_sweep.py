@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from power.formula import calculate_power
+from power.schema import STAT_FIELDS
+from power.sweep import SweepWorker, axis, sensitivities, sweep_1d, sweep_2d
+
+STATS = dict(zip(STAT_FIELDS, (120.0, 90.0, 110.0, 20.0, 8.0, 5.0, 130.0, 115.0)))
+
+
+def power_with(**changes):
+    stats = dict(STATS, **changes)
+    return calculate_power(*(stats[stat] for stat in STAT_FIELDS))
+
+
+def test_axis():
+    assert list(axis(0, 10, 5)) == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert list(axis(3, 3, 1)) == [3.0]
+
+
+def test_sweep_1d_holds_the_other_stats():
+    values, powers = sweep_1d(STATS, "speed", 0, 200, points=21)
+    assert len(values) == len(powers) == 21
+    assert list(powers) == pytest.approx([power_with(speed=value) for value in values], rel=1e-12)
+
+
+def test_sweep_2d_rows_follow_the_y_axis():
+    xs, ys, powers = sweep_2d(STATS, "mana", "intelligence", (0, 200), (50, 150), shape=(7, 5))
+    assert (len(xs), len(ys)) == (7, 5)
+    for j, y in enumerate(ys):
+        assert list(powers[j]) == pytest.approx([power_with(mana=x, intelligence=y) for x in xs], rel=1e-12)
+    with pytest.raises(ValueError):
+        sweep_2d(STATS, "mana", "mana", (0, 1), (0, 1))
+
+
+def test_sensitivities_are_the_slopes():
+    slopes = sensitivities(STATS)
+    for stat in STAT_FIELDS:
+        step = 1e-6
+        assert slopes[stat] == pytest.approx((power_with(**{stat: STATS[stat] + step}) - power_with()) / step,
+                                             rel=1e-4)
+
+
+class FakeRoot:
+    """Stands in for Tk: ``after`` callbacks run when the test calls ``tick``."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def tick(self):
+        callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+def test_sweep_worker_delivers_the_newest_results():
+    worker = SweepWorker()
+    root = FakeRoot()
+    worker.attach(root)
+    gate, done = threading.Event(), threading.Event()
+    delivered = []
+
+    def slow(label):
+        gate.wait(5)
+        yield f"{label} coarse"
+        yield f"{label} fine"
+
+    def fast(label):
+        yield label
+        done.set()
+
+    worker.request(slow, "first", on_result=delivered.append)
+    worker.request(slow, "replaced", on_result=delivered.append)  # Superseded before it starts
+    worker.request(fast, "last", on_result=delivered.append)
+    gate.set()
+    assert done.wait(5)
+    root.tick()
+    assert delivered[-1] == "last"
+    assert "replaced coarse" not in delivered
+    worker.close()
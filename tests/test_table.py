@@ -0,0 +1,64 @@
+import pytest
+
+from benchmarks.roster import generate_roster
+from power.formula import calculate_power
+from power.schema import STAT_FIELDS
+from power.table import MageTable
+
+
+@pytest.fixture
+def roster():
+    return generate_roster(200, seed=5)
+
+
+def test_records_round_trip(roster):
+    table = MageTable(roster)
+    assert len(table) == 200
+    assert table.records() == roster
+    assert [row.id for row in table] == [mage["id"] for mage in roster]
+
+
+def test_row_views_follow_the_mage_api(roster):
+    table = MageTable(roster)
+    row = table.row(roster[7]["id"])
+    row.set_name("Ünïcode name")
+    row.set_stat("intelligence", 150.0)
+    row.set_personality("stoic")
+
+    assert row.get_name() == "Ünïcode name" and row.get_stat("intelligence") == 150.0
+    assert row.power == calculate_power(*(row.get_stat(stat) for stat in STAT_FIELDS))
+    assert row.to_dict() == dict(roster[7], name="Ünïcode name", intelligence=150.0, personality="stoic")
+    with pytest.raises(KeyError):
+        table.row("missing")
+
+
+def test_delete_and_upsert(roster):
+    table = MageTable(roster)
+    table.delete(roster[0]["id"])
+    table.delete(roster[-1]["id"])
+    table.upsert(dict(roster[1], name="Changed"))
+    table.upsert(roster[0])
+    with pytest.raises(KeyError):
+        table.append(roster[0])
+
+    expected = {mage["id"]: mage for mage in roster[:-1]}
+    expected[roster[1]["id"]] = dict(roster[1], name="Changed")
+    assert {record["id"]: record for record in table.records()} == expected
+    assert roster[-1]["id"] not in table
+
+
+def test_powers_match_the_scalar_formula(roster):
+    table = MageTable(roster)
+    expected = [calculate_power(*(mage[stat] for stat in STAT_FIELDS)) for mage in roster]
+    assert list(table.powers()) == pytest.approx(expected, rel=1e-12)
+    assert list(table.stat_column("speed")) == [mage["speed"] for mage in roster]
+
+
+def test_numbers_keep_their_type(roster):
+    mage = dict(roster[0], age=30.5, years_practicing=12, health=150, speed=99.25)
+    table = MageTable([mage])
+    record = table.record(mage["id"])
+    assert record == mage
+    assert [type(record[field]) for field in ("age", "years_practicing", "health", "speed")] == [float, int, int, float]
+    with pytest.raises(ValueError):
+        table.upsert(dict(mage, mana="lots"))
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from power.repository import MageRepository
+from power.worker import IOWorker
+from tests.test_repository import make_mage, stored, unversioned
+
+
+class CountingRepository(MageRepository):
+    def __init__(self, path):
+        super().__init__(path)
+        self.batches = []
+
+    def upsert_many(self, records):
+        self.batches.append([record["id"] for record in records])
+        super().upsert_many(records)
+
+
+@pytest.fixture
+def repository(roster_path):
+    return CountingRepository(roster_path)
+
+
+def test_burst_of_saves_is_one_write(repository, roster_path):
+    worker = IOWorker(repository, save_delay=0.05)
+    for age in range(30, 40):
+        worker.save(make_mage(1, age=age))
+    worker.save(make_mage(7))
+    worker.close()
+
+    assert repository.batches == [["mage-1", "mage-7"]]
+    saved = {mage["id"]: mage for mage in stored(roster_path)}
+    assert saved["mage-1"]["age"] == 39 and "mage-7" in saved
+
+
+def test_results_are_delivered_by_drain(repository):
+    worker = IOWorker(repository)
+    done = threading.Event()
+    results, errors = [], []
+    worker.submit(repository.get, "mage-2", on_done=results.append)
+    worker.submit(repository.insert, make_mage(2), on_error=errors.append)
+    worker.submit(done.set)
+    assert done.wait(5)
+
+    assert results == errors == []  # Nothing runs on the calling thread until it drains
+    worker.drain()
+    assert unversioned(results) == [make_mage(2)]
+    assert isinstance(errors[0], KeyError)
+    worker.close()
+
+
+def test_failed_save_is_reported_and_kept(roster_path):
+    class FailOnceRepository(MageRepository):
+        failures = 1
+
+        def upsert_many(self, records):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            super().upsert_many(records)
+
+    errors = []
+    worker = IOWorker(FailOnceRepository(roster_path), save_delay=0.01, on_save_error=errors.append)
+    worker.save(make_mage(1, age=50))
+    deadline = time.monotonic() + 5
+    while not errors and time.monotonic() < deadline:
+        time.sleep(0.01)
+        worker.drain()  # Errors are delivered on the draining (GUI) thread
+    assert isinstance(errors[0], OSError)
+
+    worker.save(make_mage(2, age=60))
+    worker.close()
+    saved = {mage["id"]: mage for mage in stored(roster_path)}
+    assert saved["mage-1"]["age"] == 50 and saved["mage-2"]["age"] == 60